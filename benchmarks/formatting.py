@@ -0,0 +1,75 @@
+"""Benchmark of formatting time
+
+Measures the time of formatting (without parsing) of code which exercises
+single parts of the formatter. Every input is measured at given size and
+twice as big, so that the time is expected to double as well.
+
+Usage:
+  formatting.py [options]
+
+Options:
+  --depth=<int>      Depth of nested array expressions [default: 25]
+  --comments=<int>   Number of inline and standalone comments [default: 10000]
+  --functions=<int>  Number of functions ending nested blocks [default: 1500]
+  --runs=<int>       How many times to format every input [default: 3]
+"""
+import time
+
+from docopt import docopt
+
+from gdtoolkit.formatter import format_code
+from gdtoolkit.parser import parser
+
+
+def main():
+    arguments = docopt(__doc__)
+    runs = int(arguments["--runs"])
+    _report("nested expressions", _nested_arrays, int(arguments["--depth"]), runs)
+    _report(
+        "comments",
+        lambda n: "func f():\n" + "\tpass  # inline\n\t# standalone\n" * n,
+        int(arguments["--comments"]),
+        runs,
+    )
+    _report(
+        "block ends",
+        lambda n: "".join(
+            "func f{}():\n\tif x:\n\t\tif y:\n\t\t\tpass\n{}".format(i, "\n" * 20)
+            for i in range(n)
+        ),
+        int(arguments["--functions"]),
+        runs,
+    )
+
+
+def _nested_arrays(depth: int) -> str:
+    # every level is broken as it contains the long elements
+    expression = "x"
+    for _ in range(depth):
+        expression = "[{0}, {0}, {0}, {1}]".format("a" * 80, expression)
+    return "var v = {}\n".format(expression)
+
+
+def _report(name, code_of_size, size, runs):
+    timings = [_measure(code_of_size(n), runs) for n in [size, 2 * size]]
+    print(
+        "{:<20} n={} {:.3f}s, 2n {:.3f}s (x{:.2f})".format(
+            name, size, timings[0], timings[1], timings[1] / timings[0]
+        )
+    )
+
+
+def _measure(code: str, runs: int) -> float:
+    parse_tree, comment_parse_tree = parser.parse_with_comments(code)
+    timings = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        format_code(
+            code, 100, parse_tree=parse_tree, comment_parse_tree=comment_parse_tree
+        )
+        timings.append(time.perf_counter() - begin)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark of command line tools import time
+
+Measures the time of importing the module of every console script
+in fresh interpreter processes (using python -X importtime) and reports
+the scripts exceeding the budget.
+
+Usage:
+  import_time.py [options]
+
+Options:
+  --runs=<int>       How many times to import every module [default: 10]
+  --budget-us=<int>  Import time budget in microseconds [default: 400000]
+"""
+import os
+import re
+import sys
+import statistics
+import subprocess
+
+from docopt import docopt
+
+SETUP_PY_FILEPATH = os.path.join(os.path.dirname(__file__), "..", "setup.py")
+
+
+def main():
+    arguments = docopt(__doc__)
+    runs = int(arguments["--runs"])
+    budget_us = int(arguments["--budget-us"])
+    over_budget = False
+    for script_name, module_name in _console_scripts():
+        timings = [_import_time_us(module_name) for _ in range(runs)]
+        median = statistics.median(timings)
+        over_budget = over_budget or median > budget_us
+        print(
+            "{:<12} median {:>8.0f}us, min {:>8}us{}".format(
+                script_name,
+                median,
+                min(timings),
+                " (over budget)" if median > budget_us else "",
+            )
+        )
+    sys.exit(1 if over_budget else 0)
+
+
+def _console_scripts():
+    with open(SETUP_PY_FILEPATH, "r", encoding="utf-8") as handle:
+        return re.findall(r'"([\w-]+) = ([\w.]+):\w+"', handle.read())
+
+
+def _import_time_us(module_name: str) -> int:
+    outcome = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module_name)],
+        check=True,
+        capture_output=True,
+    )
+    for line in outcome.stderr.decode().splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)", line)
+        if match is not None and match.group(2) == module_name:
+            return int(match.group(1))
+    raise RuntimeError("No import time of {} found".format(module_name))
+
+
+if __name__ == "__main__":
+    main()
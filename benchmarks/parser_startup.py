@@ -0,0 +1,86 @@
+"""Benchmark of parser startup time
+
+Measures the time from importing the parser to the end of the first parse
+in fresh interpreter processes for every way parsing tables can be obtained:
+from generated standalone modules, from the prebuilt grammar caches and by
+building them from the grammars.
+
+Usage:
+  parser_startup.py [options]
+
+Options:
+  --runs=<int>  How many times to start the parser in every mode [default: 10]
+"""
+import os
+import sys
+import glob
+import statistics
+import subprocess
+import importlib.util
+
+from docopt import docopt
+
+import gdtoolkit.parser
+
+PARSER_DIRPATH = os.path.dirname(gdtoolkit.parser.__file__)
+STARTUP_SNIPPET = """
+import time
+begin = time.perf_counter()
+from gdtoolkit.parser import parser
+{setup}
+parser.parse("var x = 1\\n")
+parser.parse_with_comments("var x = 1\\n")
+print(time.perf_counter() - begin)
+"""
+NO_PREBUILT_CACHES_SETUP = """
+import importlib
+importlib.import_module("gdtoolkit.parser.parser").PREBUILT_GRAMMAR_CACHE_DIRPATH = ""
+parser.disable_grammar_caching()
+"""
+
+
+def main():
+    arguments = docopt(__doc__)
+    runs = int(arguments["--runs"])
+    standalone_modules = glob.glob(os.path.join(PARSER_DIRPATH, "standalone_*.py"))
+    if len(standalone_modules) > 0:
+        print("Remove {} first".format(standalone_modules), file=sys.stderr)
+        sys.exit(1)
+
+    _report("grammar", _measure(NO_PREBUILT_CACHES_SETUP, min(runs, 3)))
+    _report("prebuilt grammar cache", _measure("", runs))
+    gdtoolkit.parser.parser.generate_standalone_parsers()
+    try:
+        _report("standalone modules", _measure("", runs))
+    finally:
+        for module_filepath in glob.glob(
+            os.path.join(PARSER_DIRPATH, "standalone_*.py")
+        ):
+            os.remove(module_filepath)
+            os.remove(importlib.util.cache_from_source(module_filepath))
+
+
+def _measure(setup: str, runs: int):
+    snippet = STARTUP_SNIPPET.format(setup=setup)
+    return [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", snippet],
+                check=True,
+                capture_output=True,
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+
+
+def _report(mode: str, timings):
+    print(
+        "{:<24} median {:.3f}s, min {:.3f}s".format(
+            mode, statistics.median(timings), min(timings)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
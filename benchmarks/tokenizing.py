@@ -0,0 +1,69 @@
+"""Benchmark of tokenizing time
+
+Measures the time of tokenizing (lexing along with the indenter) code
+whose every newline in brackets is checked for following a lambda header
+(a multiline array literal and deeply nested parentheses) and code full
+of comments, which are queued aside of the indenter. Every input is
+measured at given size and twice as big, so that the time is expected
+to double as well.
+
+Usage:
+  tokenizing.py [options]
+
+Options:
+  --elements=<int>  Number of array elements [default: 100000]
+  --depth=<int>     Depth of nested parentheses [default: 10000]
+  --comments=<int>  Number of lines with comments [default: 20000]
+  --runs=<int>      How many times to tokenize every input [default: 3]
+"""
+import time
+
+from docopt import docopt
+
+from gdtoolkit.parser import parser
+
+
+def main():
+    arguments = docopt(__doc__)
+    runs = int(arguments["--runs"])
+    _report(
+        "multiline array",
+        lambda n: "var x = [\n" + "\t1,\n" * n + "]\n",
+        int(arguments["--elements"]),
+        runs,
+    )
+    _report(
+        "nested parentheses",
+        lambda n: "var x = [\n" + "\t(\n" * n + "\t):\n" * n + "]\n",
+        int(arguments["--depth"]),
+        runs,
+    )
+    _report(
+        "comments",
+        lambda n: "var x = 1  # inline\n# standalone\n" * n,
+        int(arguments["--comments"]),
+        runs,
+    )
+
+
+def _report(name, code_of_size, size, runs):
+    timings = [_measure(code_of_size(n), runs) for n in [size, 2 * size]]
+    print(
+        "{:<20} n={} {:.3f}s, 2n {:.3f}s (x{:.2f})".format(
+            name, size, timings[0], timings[1], timings[1] / timings[0]
+        )
+    )
+
+
+def _measure(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        for _ in parser.tokenize(code):
+            pass
+        timings.append(time.perf_counter() - begin)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,18 @@
 ;;; This module is a part of gdtoolkit, see https://github.com/Scony/godot-gdscript-toolkit
 ;;;
 
+(require 'url)
+
+(defgroup gdformat nil
+  "Reformat GDScript buffers using the 'gdformat' formatter"
+  :group 'tools)
+
+(defcustom gdformat-daemon-url nil
+  "URL of running 'gdformatd' daemon e.g. \"http://localhost:45484/\".
+When nil, new 'gdformat' process is spawned every time a buffer is formatted."
+  :type '(choice (const :tag "None" nil) string)
+  :group 'gdformat)
+
 (defun gdformat-call-bin (input-buffer output-buffer error-buffer)
   "Call gdformat process"
   (with-current-buffer input-buffer
@@ -27,6 +39,51 @@
     )
   )
 
+(defun gdformat-call-daemon (input-buffer output-buffer error-buffer)
+  "Call gdformatd daemon, return process-like exit status.
+The daemon looks 'gdformatrc' up from the directory of INPUT-BUFFER, so the
+settings are the same as when 'gdformat' process is spawned there."
+  (let* ((url-request-method "POST")
+         (config-directory (with-current-buffer input-buffer
+                             (expand-file-name default-directory)))
+         (url-request-extra-headers `(("Content-Type" . "text/plain; charset=utf-8")
+                                      ("X-Protocol-Version" . "1")
+                                      ("X-Config-Directory"
+                                       . ,(url-hexify-string config-directory))))
+         (url-request-data (with-current-buffer input-buffer
+                             (save-restriction
+                               (widen)
+                               (encode-coding-string (buffer-string) 'utf-8))))
+         (response-buffer (url-retrieve-synchronously gdformat-daemon-url t)))
+    (if (not response-buffer)
+        (progn
+          (with-current-buffer error-buffer
+            (insert (format "gdformatd: no response from %s" gdformat-daemon-url)))
+          1)
+      (unwind-protect
+          (with-current-buffer response-buffer
+            (goto-char (point-min))
+            (let* ((status (if (looking-at "^HTTP/[0-9.]+ \\([0-9]+\\)")
+                               (string-to-number (match-string 1))
+                             0))
+                   (body (if (re-search-forward "\r?\n\r?\n" nil t)
+                             (decode-coding-string
+                              (buffer-substring-no-properties (point) (point-max))
+                              'utf-8)
+                           "")))
+              (cond ((= status 200)
+                     (with-current-buffer output-buffer (insert body))
+                     0)
+                    ((= status 204)
+                     (with-current-buffer output-buffer
+                       (insert-buffer-substring input-buffer))
+                     0)
+                    (t
+                     (with-current-buffer error-buffer
+                       (insert (format "gdformatd: HTTP %d\n%s" status body)))
+                     1))))
+        (kill-buffer response-buffer)))))
+
 (defun gdformat-buffer ()
   "Formats current buffer using 'gdformat'"
   (interactive)
@@ -38,7 +95,9 @@
     (dolist (buf (list tmpbuf errbuf))
       (with-current-buffer buf (erase-buffer)))
     (condition-case err
-        (if (not (zerop (gdformat-call-bin original-buffer tmpbuf errbuf)))
+        (if (not (zerop (if gdformat-daemon-url
+                             (gdformat-call-daemon original-buffer tmpbuf errbuf)
+                           (gdformat-call-bin original-buffer tmpbuf errbuf))))
             (error "gdformat: failed, see %s buffer for details" (buffer-name errbuf))
           (if (not (eq (compare-buffer-substrings tmpbuf nil nil original-buffer nil nil) 0))
               (progn
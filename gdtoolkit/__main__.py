@@ -0,0 +1,267 @@
+"""GDScript toolkit
+
+Runs both linter and formatter checks on GDScript files parsing every file
+only once. Equivalent to running 'gdlint' and 'gdformat --check' one after
+another, but faster. Configuration is read from 'gdlintrc' and 'gdformatrc'
+files the same way the respective tools do.
+
+Usage:
+  gdtoolkit check <path>... [options]
+
+Options:
+  -d --diff                  Suggest formatting changes.
+  -f --fast                  Skip formatting safety checks.
+  -l --line-length=<int>     How many characters per line to allow
+                             when formatting.
+  -s --use-spaces=<int>      Use spaces for indent instead of tabs
+                             when formatting.
+  -j --jobs=<int>            How many files to process in parallel
+                             (defaults to the number of CPUs).
+  -h --help                  Show this screen.
+  --version                  Show version.
+"""
+import difflib
+import sys
+from functools import partial
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from types import MappingProxyType
+
+from docopt import docopt
+
+from gdtoolkit.common.config import load_config
+from gdtoolkit.common.version import ToolVersion
+
+if TYPE_CHECKING:
+    from gdtoolkit.common.parsed_file import ParsedFile
+
+LINTER_CONFIG_FILE_NAME = "gdlintrc"
+FORMATTER_CONFIG_FILE_NAME = "gdformatrc"
+
+
+def main():
+    sys.stdout.reconfigure(encoding="utf-8")
+    arguments = docopt(__doc__, version=ToolVersion("gdtoolkit"))
+
+    # the linter, the formatter and the parser (lark) are imported only once
+    # arguments are parsed
+    # pylint: disable=import-outside-toplevel
+    from gdtoolkit.common.utils import find_gd_files_from_paths
+    from gdtoolkit.common.parallel import map_files, parse_jobs_num
+    from gdtoolkit.formatter import DEFAULT_CONFIG as DEFAULT_FORMATTER_CONFIG
+    from gdtoolkit.linter import DEFAULT_CONFIG as DEFAULT_LINTER_CONFIG
+
+    linter_config = load_config(LINTER_CONFIG_FILE_NAME, DEFAULT_LINTER_CONFIG)
+    formatter_config = load_config(FORMATTER_CONFIG_FILE_NAME, DEFAULT_FORMATTER_CONFIG)
+
+    files: List[str] = find_gd_files_from_paths(
+        arguments["<path>"],
+        excluded_directories=set(linter_config["excluded_directories"])
+        | set(formatter_config["excluded_directories"]),
+    )
+
+    line_length = (
+        int(arguments["--line-length"])
+        if arguments["--line-length"]
+        else formatter_config["line_length"]
+    )
+    spaces_for_indent = (
+        int(arguments["--use-spaces"])
+        if arguments["--use-spaces"]
+        else formatter_config["use_spaces"]
+    )
+    safety_checks = False if arguments["--fast"] else formatter_config["safety_checks"]
+
+    outcomes = list(
+        map_files(
+            partial(
+                _check_file,
+                linter_config=linter_config,
+                line_length=line_length,
+                spaces_for_indent=spaces_for_indent,
+                print_diff=arguments["--diff"],
+                safety_checks=safety_checks,
+            ),
+            files,
+            parse_jobs_num(arguments["--jobs"]),
+        )
+    )
+    problems_total = sum(problems for problems, _ in outcomes)
+    formattable_num = sum(1 for _, formattable in outcomes if formattable)
+
+    if problems_total > 0 or formattable_num > 0:
+        print(
+            "Failure: {} problem{} found, {} file{} would be reformatted".format(
+                problems_total,
+                "" if problems_total == 1 else "s",
+                formattable_num,
+                "" if formattable_num == 1 else "s",
+            ),
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    print("Success: no problems found, no files would be reformatted")
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def _check_file(
+    file_path: str,
+    linter_config: dict,
+    line_length: int,
+    spaces_for_indent: Optional[int],
+    print_diff: bool,
+    safety_checks: bool,
+) -> Tuple[int, bool]:
+    """Lints the file and checks its formatting, returns the number of problems
+    found and whether the file would be reformatted"""
+    # pylint: disable=import-outside-toplevel
+    from gdtoolkit.formatter import format_code
+    from gdtoolkit.linter import lint_parsed_file
+    from gdtoolkit.linter.problem_printer import print_problem
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as handle:
+            code = handle.read()
+    except OSError as exception:
+        print(
+            "Cannot open file '{}': {}".format(file_path, exception.strerror),
+            file=sys.stderr,
+        )
+        return 1, False
+    parsed_file = _parse_file(code, file_path)
+    if parsed_file is None:
+        return 1, False
+
+    problems = lint_parsed_file(parsed_file, MappingProxyType(linter_config))
+    for problem in problems:
+        print_problem(problem, file_path)
+
+    formatted_code = format_code(
+        gdscript_code=code,
+        max_line_length=line_length,
+        spaces_for_indent=spaces_for_indent,
+        parse_tree=parsed_file.parse_tree,
+        comment_parse_tree=parsed_file.comment_parse_tree,
+    )
+    if formatted_code == code:
+        return len(problems), False
+    if safety_checks and not _is_formatting_safe(
+        parsed_file, formatted_code, line_length, spaces_for_indent, file_path
+    ):
+        return len(problems) + 1, False
+    print(f"would reformat {file_path}", file=sys.stderr)
+    if print_diff:
+        print(
+            "\n".join(
+                difflib.unified_diff(
+                    code.splitlines(),
+                    formatted_code.splitlines(),
+                    file_path,
+                    file_path,
+                    lineterm="",
+                )
+            ),
+            file=sys.stderr,
+        )
+    return len(problems), True
+
+
+def _parse_file(code: str, file_path: str) -> Optional["ParsedFile"]:
+    # pylint: disable=import-outside-toplevel
+    import lark
+
+    from gdtoolkit.common.exceptions import (
+        lark_unexpected_token_to_str,
+        lark_unexpected_input_to_str,
+    )
+    from gdtoolkit.common.parsed_file import ParsedFile
+
+    try:
+        return ParsedFile(code)
+    except lark.exceptions.UnexpectedToken as exception:
+        print(
+            f"{file_path}:\n",
+            lark_unexpected_token_to_str(exception, code),
+            sep="\n",
+            file=sys.stderr,
+        )
+    except lark.exceptions.UnexpectedInput as exception:
+        print(
+            f"{file_path}:\n",
+            lark_unexpected_input_to_str(exception),
+            sep="\n",
+            file=sys.stderr,
+        )
+    except lark.indenter.DedentError as exception:
+        print(f"{file_path}:\n", str(exception), sep="\n", file=sys.stderr)
+    return None
+
+
+def _is_formatting_safe(
+    parsed_file: "ParsedFile",
+    formatted_code: str,
+    line_length: int,
+    spaces_for_indent: Optional[int],
+    file_path: str,
+) -> bool:
+    # pylint: disable=import-outside-toplevel
+    import lark
+
+    from gdtoolkit.common.exceptions import lark_unexpected_input_to_str
+    from gdtoolkit.formatter import check_formatting_safety
+    from gdtoolkit.formatter.exceptions import (
+        TreeInvariantViolation,
+        FormattingStabilityViolation,
+        CommentPersistenceViolation,
+    )
+
+    try:
+        check_formatting_safety(
+            parsed_file.code,
+            formatted_code,
+            max_line_length=line_length,
+            spaces_for_indent=spaces_for_indent,
+            given_code_parse_tree=parsed_file.parse_tree,
+            given_code_comment_parse_tree=parsed_file.comment_parse_tree,
+        )
+    except lark.exceptions.UnexpectedInput as exception:
+        print(
+            f"{file_path}: Failed to format, formatted code cannot be parsed:\n",
+            lark_unexpected_input_to_str(exception),
+            sep="\n",
+            file=sys.stderr,
+        )
+        return False
+    except lark.indenter.DedentError as exception:
+        print(
+            f"{file_path}: Failed to format, formatted code cannot be parsed:\n",
+            str(exception),
+            sep="\n",
+            file=sys.stderr,
+        )
+        return False
+    except TreeInvariantViolation:
+        print(
+            f"{file_path}: Failed to format, formatted code parse tree differs",
+            file=sys.stderr,
+        )
+        return False
+    except FormattingStabilityViolation:
+        print(
+            f"{file_path}: Failed to format, formatted code is unstable",
+            file=sys.stderr,
+        )
+        return False
+    except CommentPersistenceViolation:
+        print(
+            f"{file_path}: Failed to format,",
+            "some comments are missing in formatted code",
+            sep="",
+            file=sys.stderr,
+        )
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Mapping, Optional
+from importlib.metadata import version as pkg_version
+
+from ..parser.parser import get_gdtoolkit_cache_directory
+
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class ResultCache:
+    """Persistent cache of results of processing GDScript files.
+    Entries are keyed by the hash of file content, gdtoolkit version and the
+    configuration used to process the file. Every entry is stored in a separate
+    file written atomically, so concurrent writers never corrupt the cache.
+    When the number of entries exceeds the limit, the least recently used ones
+    are evicted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: Mapping,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_dirpath: Optional[str] = None,
+    ):
+        version: str = pkg_version("gdtoolkit")
+        self._dirpath: str = os.path.join(
+            (
+                cache_dirpath
+                if cache_dirpath is not None
+                else get_gdtoolkit_cache_directory()
+            ),
+            version,
+            name,
+        )
+        self._max_entries = max_entries
+        self._salt = json.dumps(
+            [version, dict(config)], sort_keys=True, default=sorted
+        ).encode("utf-8")
+
+    def get(self, content: str) -> Optional[str]:
+        entry_filepath = self._entry_filepath(content)
+        try:
+            with open(entry_filepath, "r", encoding="utf-8") as handle:
+                value = handle.read()
+            os.utime(entry_filepath)
+            return value
+        except OSError:
+            return None
+
+    def put(self, content: str, value: str = "") -> None:
+        try:
+            os.makedirs(self._dirpath, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self._dirpath, suffix=".tmp", delete=False
+            ) as handle:
+                handle.write(value)
+            os.replace(handle.name, self._entry_filepath(content))
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        """Evicts least recently used entries exceeding the limit"""
+        try:
+            entry_filepaths = [
+                os.path.join(self._dirpath, entry_name)
+                for entry_name in os.listdir(self._dirpath)
+                if not entry_name.endswith(".tmp")
+            ]
+        except OSError:
+            return
+        excess = len(entry_filepaths) - self._max_entries
+        if excess <= 0:
+            return
+        entries_w_mtimes = []
+        for entry_filepath in entry_filepaths:
+            try:
+                entries_w_mtimes.append(
+                    (os.path.getmtime(entry_filepath), entry_filepath)
+                )
+            except OSError:
+                pass
+        entries_w_mtimes.sort()
+        for _, entry_filepath in entries_w_mtimes[:excess]:
+            try:
+                os.remove(entry_filepath)
+            except OSError:
+                pass
+
+    def _entry_filepath(self, content: str) -> str:
+        digest = hashlib.sha256(self._salt)
+        digest.update(content.encode("utf-8"))
+        return os.path.join(self._dirpath, digest.hexdigest())
@@ -0,0 +1,56 @@
+import os
+import logging
+import pathlib
+from typing import Mapping, Optional
+
+
+def find_config_file(
+    config_file_name: str, search_dirpath: Optional[str] = None
+) -> Optional[str]:
+    """Returns the path of the config file (or of its hidden variant)
+    found in the search directory (current one by default) or the closest
+    parent one"""
+    search_dir = pathlib.Path(os.path.abspath(search_dirpath or os.getcwd()))
+    while search_dir != pathlib.Path(os.path.abspath(os.sep)):
+        for file_name in [config_file_name, ".{}".format(config_file_name)]:
+            file_path = os.path.join(search_dir, file_name)
+            if os.path.isfile(file_path):
+                return file_path
+        search_dir = search_dir.parent
+    return None
+
+
+def load_config(
+    config_file_name: str,
+    default_config: Mapping,
+    search_dirpath: Optional[str] = None,
+) -> dict:
+    """Loads the config file found by find_config_file and completes it
+    with the entries of the default config it lacks"""
+    # TODO: error handling
+    config_file_path = find_config_file(config_file_name, search_dirpath)
+    if config_file_path is not None:
+        # importing yaml is slow, it is not needed if there is no config file
+        # pylint: disable-next=import-outside-toplevel
+        import yaml
+
+        logging.info("Config file found: '%s'", config_file_path)
+        with open(config_file_path, "r", encoding="utf-8") as handle:
+            config = yaml.load(handle.read(), Loader=yaml.Loader) or {}
+    else:
+        logging.info(
+            "No '%s' nor '.%s' found. Using default config...",
+            config_file_name,
+            config_file_name,
+        )
+        config = dict(default_config)
+    logging.info("Loaded config:")
+    for entry in config.items():
+        logging.info(entry)
+    for key in default_config:
+        if key not in config:
+            logging.info(
+                "Adding missing entry from defaults: %s", (key, default_config[key])
+            )
+            config[key] = default_config[key]
+    return config
@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+Path = str
+Outcome = TypeVar("Outcome")
+
+
+def get_default_jobs_num() -> int:
+    return os.cpu_count() or 1
+
+
+def parse_jobs_num(jobs_argument: Optional[str]) -> int:
+    """Converts value of -j/--jobs option to the number of worker processes"""
+    if jobs_argument is None:
+        return get_default_jobs_num()
+    if not jobs_argument.isdigit() or int(jobs_argument) < 1:
+        print(
+            f"Invalid number of jobs {jobs_argument!r}, expected a positive integer",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return int(jobs_argument)
+
+
+def map_files(
+    function: Callable[[Path], Outcome], files: List[Path], jobs: int = 1
+) -> Iterator[Outcome]:
+    """Applies function to every file and yields outcomes in the order of files.
+    If more than one job is requested, files are processed by a pool of worker
+    processes. Whatever given function prints is captured in the worker and
+    replayed by the calling process as soon as the outcome for a given file is
+    ready, so the output is the same as in the sequential mode."""
+    jobs = min(jobs, len(files))
+    if jobs <= 1:
+        for file_path in files:
+            yield function(file_path)
+        return
+    with multiprocessing.Pool(jobs) as pool:
+        for outcome, stdout, stderr in pool.imap(
+            partial(_call_w_captured_output, function), files
+        ):
+            print(stdout, end="")
+            print(stderr, end="", file=sys.stderr)
+            yield outcome
+
+
+def _call_w_captured_output(
+    function: Callable[[Path], Outcome], file_path: Path
+) -> Tuple[Outcome, str, str]:
+    with io.StringIO() as stdout, io.StringIO() as stderr:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            outcome = function(file_path)
+        return outcome, stdout.getvalue(), stderr.getvalue()
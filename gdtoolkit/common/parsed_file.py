@@ -0,0 +1,35 @@
+from typing import List, Optional
+
+from lark import Tree
+
+from ..parser import parser
+from ..parser.parser import CachedProperty
+from .ast import AbstractSyntaxTree
+
+
+class ParsedFile:
+    """GDScript code along with the outcomes of parsing it.
+    Meant to be shared by tools processing the same code (like linter and
+    formatter) so that the code is parsed only once. The abstract syntax tree
+    is built upon first use.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        parse_tree: Optional[Tree] = None,
+        comment_parse_tree: Optional[Tree] = None,
+    ):
+        if parse_tree is None or comment_parse_tree is None:
+            parse_tree, comment_parse_tree = parser.parse_with_comments(code)
+        self.code = code
+        self.parse_tree = parse_tree
+        self.comment_parse_tree = comment_parse_tree
+
+    @CachedProperty
+    def lines(self) -> List[str]:
+        return self.code.splitlines()
+
+    @CachedProperty
+    def ast(self) -> AbstractSyntaxTree:
+        return AbstractSyntaxTree(self.parse_tree)
@@ -0,0 +1,15 @@
+# pylint: disable-next=too-few-public-methods
+class ToolVersion:
+    """Version of a gdtoolkit tool to be passed to docopt. The package metadata
+    is only read (and importlib.metadata imported, which is slow) when the version
+    is actually printed, i.e. when the tool is run with --version.
+    """
+
+    def __init__(self, tool_name: str):
+        self._tool_name = tool_name
+
+    def __str__(self) -> str:
+        # pylint: disable-next=import-outside-toplevel
+        from importlib.metadata import version as pkg_version
+
+        return "{} {}".format(self._tool_name, pkg_version("gdtoolkit"))
@@ -1,10 +1,19 @@
-from typing import Optional
+import difflib
+from typing import List, Optional
 
 from types import MappingProxyType
 from lark import Tree
 
 from ..parser import parser
-from .formatter import format_code  # noqa: F401
+from .formatter import format_code, format_code_in_line_ranges  # noqa: F401
+from .expression_to_str import expression_to_str_cache  # noqa: F401
+from .exceptions import FormattingStabilityViolation
+from .line_ranges import (  # noqa: F401
+    FormattedFragment,
+    LineRange,
+    find_statements_in_line_ranges,
+    map_line_ranges,
+)
 from .safety_checks import (  # noqa: F401
     check_tree_invariant,
     check_formatting_stability,
@@ -32,27 +41,85 @@ def check_formatting_safety(
     given_code_parse_tree: Optional[Tree] = None,
     given_code_comment_parse_tree: Optional[Tree] = None,
     spaces_for_indent: Optional[int] = None,
+    line_ranges: Optional[List[LineRange]] = None,
+    formatted_fragments: Optional[List[FormattedFragment]] = None,
 ) -> None:
+    """Checks if formatting is safe. If line_ranges are given, only the fragments
+    formatted by format_code_in_line_ranges are checked - either the ones it
+    returned (formatted_fragments) or the ones formatted again here."""
     if given_code == formatted_code:
         return
-    formatted_code_parse_tree = parser.parse(formatted_code, gather_metadata=True)
-    formatted_code_comment_parse_tree = parser.parse_comments(formatted_code)
-    check_comment_persistence(
-        given_code,
-        formatted_code,
-        given_code_comment_parse_tree=given_code_comment_parse_tree,
-        formatted_code_comment_parse_tree=formatted_code_comment_parse_tree,
-    )
-    check_tree_invariant(
+    if line_ranges is not None:
+        if formatted_fragments is None:
+            _, formatted_fragments = format_code_in_line_ranges(
+                given_code, max_line_length, line_ranges, spaces_for_indent
+            )
+        _check_formatting_safety_in_line_ranges(
+            given_code,
+            formatted_code,
+            max_line_length,
+            spaces_for_indent,
+            line_ranges,
+            formatted_fragments,
+        )
+        return
+    # expressions of the given code are converted to strings once again while
+    # checking the tree invariant, so the enclosing cache is reused if any
+    with expression_to_str_cache():
+        (
+            formatted_code_parse_tree,
+            formatted_code_comment_parse_tree,
+        ) = parser.parse_with_comments(formatted_code)
+        check_comment_persistence(
+            given_code,
+            formatted_code,
+            given_code_comment_parse_tree=given_code_comment_parse_tree,
+            formatted_code_comment_parse_tree=formatted_code_comment_parse_tree,
+        )
+        check_tree_invariant(
+            given_code,
+            formatted_code,
+            given_code_parse_tree=given_code_parse_tree,
+            formatted_code_parse_tree=formatted_code_parse_tree,
+        )
+        check_formatting_stability(
+            formatted_code,
+            max_line_length,
+            parse_tree=formatted_code_parse_tree,
+            comment_parse_tree=formatted_code_comment_parse_tree,
+            spaces_for_indent=spaces_for_indent,
+        )
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _check_formatting_safety_in_line_ranges(
+    given_code: str,
+    formatted_code: str,
+    max_line_length: int,
+    spaces_for_indent: Optional[int],
+    line_ranges: List[LineRange],
+    formatted_fragments: List[FormattedFragment],
+) -> None:
+    """Checks the formatted fragments and whether the rest of the code
+    is left intact"""
+    for fragment, formatted_fragment in formatted_fragments:
+        check_formatting_safety(
+            fragment,
+            formatted_fragment,
+            max_line_length,
+            spaces_for_indent=spaces_for_indent,
+        )
+    # equal fragments are formatted equally
+    fragment_formatting = dict(formatted_fragments)
+    expected_formatted_code = map_line_ranges(
         given_code,
-        formatted_code,
-        given_code_parse_tree=given_code_parse_tree,
-        formatted_code_parse_tree=formatted_code_parse_tree,
-    )
-    check_formatting_stability(
-        formatted_code,
-        max_line_length,
-        parse_tree=formatted_code_parse_tree,
-        comment_parse_tree=formatted_code_comment_parse_tree,
-        spaces_for_indent=spaces_for_indent,
+        find_statements_in_line_ranges(given_code, line_ranges),
+        lambda fragment: fragment_formatting.get(fragment, fragment),
     )
+    if formatted_code != expected_formatted_code:
+        diff = "\n".join(
+            difflib.unified_diff(
+                formatted_code.splitlines(), expected_formatted_code.splitlines()
+            )
+        )
+        raise FormattingStabilityViolation(diff)
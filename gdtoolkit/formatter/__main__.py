@@ -17,49 +17,62 @@ Options:
   -f --fast                  Skip safety checks.
   -l --line-length=<int>     How many characters per line to allow.
   -s --use-spaces=<int>      Use spaces for indent instead of tabs.
+  -j --jobs=<int>            How many files to process in parallel
+                             (defaults to the number of CPUs).
+  --no-cache                 Don't use the cache of already formatted files.
+  --lines=<start:end>        Format only the top-level statements intersecting
+                             given range of lines (e.g. 10:20) leaving the rest
+                             of the code intact (single file or STDIN only).
   -h --help                  Show this screen.
   --version                  Show version.
   --dump-default-config      Dump default config to 'gdformatrc' file.
 
 Examples:
   echo 'pass' | gdformat -   # reads from STDIN
+  gdformat --lines=10:20 script.gd
 """
 
 import sys
 import os
 import logging
-import pathlib
 import difflib
-from typing import List, Tuple, Optional
-from types import MappingProxyType
-from importlib.metadata import version as pkg_version
+from functools import partial
+from typing import TYPE_CHECKING, List, Tuple, Optional
 
 from docopt import docopt
 import lark
-import yaml
 
-from gdtoolkit.formatter import format_code, check_formatting_safety, DEFAULT_CONFIG
+from gdtoolkit.formatter import (
+    format_code,
+    format_code_in_line_ranges,
+    check_formatting_safety,
+    expression_to_str_cache,
+    DEFAULT_CONFIG,
+)
 from gdtoolkit.formatter.exceptions import (
     TreeInvariantViolation,
     FormattingStabilityViolation,
     CommentPersistenceViolation,
 )
 from gdtoolkit.parser import parser
+from gdtoolkit.common.config import load_config
 from gdtoolkit.common.utils import find_gd_files_from_paths
+from gdtoolkit.common.parallel import map_files, parse_jobs_num
 from gdtoolkit.common.exceptions import (
     lark_unexpected_token_to_str,
     lark_unexpected_input_to_str,
 )
+from gdtoolkit.common.version import ToolVersion
+
+if TYPE_CHECKING:
+    from gdtoolkit.common.cache import ResultCache
 
 CONFIG_FILE_NAME = "gdformatrc"
 
 
 def main():
     sys.stdout.reconfigure(encoding="utf-8")
-    arguments = docopt(
-        __doc__,
-        version="gdformat {}".format(pkg_version("gdtoolkit")),
-    )
+    arguments = docopt(__doc__, version=ToolVersion("gdformat"))
 
     if arguments["--dump-default-config"]:
         _dump_default_config()
@@ -67,10 +80,7 @@ def main():
     if arguments["--diff"]:
         arguments["--check"] = True
 
-    config_file_path = _find_config_file()
-    config = _load_config_file_or_default(config_file_path)
-    _log_config_entries(config)
-    _update_config_with_missing_entries_inplace(config)
+    config = load_config(CONFIG_FILE_NAME, DEFAULT_CONFIG)
 
     files: List[str] = find_gd_files_from_paths(
         arguments["<path>"], excluded_directories=set(config["excluded_directories"])
@@ -94,119 +104,137 @@ def main():
         else config.get("safety_checks", DEFAULT_CONFIG["safety_checks"])
     )
 
+    line_ranges = (
+        [_parse_line_range(arguments["--lines"])] if arguments["--lines"] else None
+    )
+    # line numbers refer to a single file
+    if line_ranges is not None and (
+        len(arguments["<path>"]) != 1 or os.path.isdir(arguments["<path>"][0])
+    ):
+        print("--lines can be used with a single file or STDIN only", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = parse_jobs_num(arguments["--jobs"])
+
+    # cached verdicts apply to whole files only
+    cache = (
+        _create_cache(line_length, spaces_for_indent, safety_checks)
+        if not arguments["--no-cache"] and line_ranges is None
+        else None
+    )
+
     if files == ["-"]:
-        _format_stdin(line_length, spaces_for_indent, safety_checks)
+        _format_stdin(line_length, spaces_for_indent, safety_checks, line_ranges)
     elif arguments["--check"]:
         _check_files_formatting(
-            files, line_length, spaces_for_indent, arguments["--diff"], safety_checks
+            files,
+            line_length,
+            spaces_for_indent,
+            arguments["--diff"],
+            safety_checks,
+            jobs,
+            cache,
+            line_ranges,
         )
     else:
-        _format_files(files, line_length, spaces_for_indent, safety_checks)
+        _format_files(
+            files,
+            line_length,
+            spaces_for_indent,
+            safety_checks,
+            jobs,
+            cache,
+            line_ranges,
+        )
 
 
-def _dump_default_config() -> None:
-    # TODO: error handling
-    assert not os.path.isfile(CONFIG_FILE_NAME)
-    with open(CONFIG_FILE_NAME, "w", encoding="utf-8") as handle:
-        handle.write(yaml.dump(DEFAULT_CONFIG.copy()))
-    sys.exit(0)
+def _parse_line_range(line_range: str) -> Tuple[int, int]:
+    begin, _, end = line_range.partition(":")
+    if not begin.isdigit() or not end.isdigit() or not 1 <= int(begin) <= int(end):
+        print(
+            f"Invalid line range {line_range!r}, expected <start:end>",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return int(begin), int(end)
 
 
-def _find_config_file() -> Optional[str]:
-    search_dir = pathlib.Path(os.getcwd())
-    config_file_path = None
-    while search_dir != pathlib.Path(os.path.abspath(os.sep)):
-        file_path = os.path.join(search_dir, CONFIG_FILE_NAME)
-        if os.path.isfile(file_path):
-            config_file_path = file_path
-            break
-        file_path = os.path.join(search_dir, ".{}".format(CONFIG_FILE_NAME))
-        if os.path.isfile(file_path):
-            config_file_path = file_path
-            break
-        search_dir = search_dir.parent
-    return config_file_path
+def _create_cache(
+    line_length: int, spaces_for_indent: Optional[int], safety_checks: bool
+) -> "ResultCache":
+    # the cache (keyed by gdtoolkit version) imports importlib.metadata
+    # pylint: disable-next=import-outside-toplevel
+    from gdtoolkit.common.cache import ResultCache
+
+    return ResultCache(
+        "gdformat",
+        {
+            "line_length": line_length,
+            "use_spaces": spaces_for_indent,
+            "safety_checks": safety_checks,
+        },
+    )
 
 
-def _load_config_file_or_default(config_file_path: Optional[str]) -> MappingProxyType:
+def _dump_default_config() -> None:
     # TODO: error handling
-    if config_file_path is not None:
-        logging.info("Config file found: '%s'", config_file_path)
-        with open(config_file_path, "r", encoding="utf-8") as handle:
-            return yaml.load(handle.read(), Loader=yaml.Loader)
-
-    logging.info("""No 'gdformatrc' nor '.gdformatrc' found. Using default config...""")
-    return DEFAULT_CONFIG
-
-
-def _log_config_entries(config: MappingProxyType) -> None:
-    logging.info("Loaded config:")
-    for entry in config.items():
-        logging.info(entry)
-
+    # pylint: disable-next=import-outside-toplevel
+    import yaml
 
-def _update_config_with_missing_entries_inplace(config: dict) -> None:
-    for key in DEFAULT_CONFIG:
-        if key not in config:
-            logging.info(
-                "Adding missing entry from defaults: %s", (key, DEFAULT_CONFIG[key])
-            )
-            config[key] = DEFAULT_CONFIG[key]
+    assert not os.path.isfile(CONFIG_FILE_NAME)
+    with open(CONFIG_FILE_NAME, "w", encoding="utf-8") as handle:
+        handle.write(yaml.dump(DEFAULT_CONFIG.copy()))
+    sys.exit(0)
 
 
 def _format_stdin(
-    line_length: int, spaces_for_indent: Optional[int], safety_checks: bool
+    line_length: int,
+    spaces_for_indent: Optional[int],
+    safety_checks: bool,
+    line_ranges: Optional[List[Tuple[int, int]]] = None,
 ) -> None:
     code = sys.stdin.read()
     success, _, formatted_code = _format_code(
-        code, line_length, spaces_for_indent, "STDIN", safety_checks
+        code, line_length, spaces_for_indent, "STDIN", safety_checks, line_ranges
     )
     if not success:
         sys.exit(1)
     print(formatted_code, end="")
 
 
-# pylint: disable-next=too-many-locals
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
 def _check_files_formatting(
     files: List[str],
     line_length: int,
     spaces_for_indent: Optional[int],
     print_diff: bool,
     safety_checks: bool,
+    jobs: int = 1,
+    cache: Optional["ResultCache"] = None,
+    line_ranges: Optional[List[Tuple[int, int]]] = None,
 ) -> None:
     formattable_files = set()
     failed_files = set()
-    for file_path in files:
-        try:
-            with open(file_path, "r", encoding="utf-8") as handle:
-                code = handle.read()
-                success, actually_formatted, formatted_code = _format_code(
-                    code, line_length, spaces_for_indent, file_path, safety_checks
-                )
-                if success and actually_formatted:
-                    print(f"would reformat {file_path}", file=sys.stderr)
-                    if print_diff:
-                        print(
-                            "\n".join(
-                                difflib.unified_diff(
-                                    code.splitlines(),
-                                    formatted_code.splitlines(),
-                                    file_path,
-                                    file_path,
-                                    lineterm="",
-                                )
-                            ),
-                            file=sys.stderr,
-                        )
-                    formattable_files.add(file_path)
-                elif not success:
-                    failed_files.add(file_path)
-        except OSError as exceptions:
-            print(
-                f"Cannot open file {file_path!r}: {exceptions.strerror}",
-                file=sys.stderr,
-            )
+    outcomes = map_files(
+        partial(
+            _check_file_formatting,
+            line_length=line_length,
+            spaces_for_indent=spaces_for_indent,
+            print_diff=print_diff,
+            safety_checks=safety_checks,
+            cache=cache,
+            line_ranges=line_ranges,
+        ),
+        files,
+        jobs,
+    )
+    for file_path, (success, actually_formatted) in zip(files, outcomes):
+        if success and actually_formatted:
+            formattable_files.add(file_path)
+        elif not success:
             failed_files.add(file_path)
+    if cache is not None:
+        cache.prune()
     if len(formattable_files) == 0:
         print(
             "{} file{} would be left unchanged".format(
@@ -228,35 +256,86 @@ def _check_files_formatting(
     sys.exit(1)
 
 
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _check_file_formatting(
+    file_path: str,
+    line_length: int,
+    spaces_for_indent: Optional[int],
+    print_diff: bool,
+    safety_checks: bool,
+    cache: Optional["ResultCache"] = None,
+    line_ranges: Optional[List[Tuple[int, int]]] = None,
+) -> Tuple[bool, bool]:
+    try:
+        with open(file_path, "r", encoding="utf-8") as handle:
+            code = handle.read()
+            if cache is not None and cache.get(code) is not None:
+                return True, False
+            success, actually_formatted, formatted_code = _format_code(
+                code,
+                line_length,
+                spaces_for_indent,
+                file_path,
+                safety_checks,
+                line_ranges,
+            )
+            if cache is not None and success and not actually_formatted:
+                cache.put(code)
+            if success and actually_formatted:
+                print(f"would reformat {file_path}", file=sys.stderr)
+                if print_diff:
+                    print(
+                        "\n".join(
+                            difflib.unified_diff(
+                                code.splitlines(),
+                                formatted_code.splitlines(),
+                                file_path,
+                                file_path,
+                                lineterm="",
+                            )
+                        ),
+                        file=sys.stderr,
+                    )
+            return success, actually_formatted
+    except OSError as exceptions:
+        print(
+            f"Cannot open file {file_path!r}: {exceptions.strerror}",
+            file=sys.stderr,
+        )
+        return False, False
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
 def _format_files(
     files: List[str],
     line_length: int,
     spaces_for_indent: Optional[int],
     safety_checks: bool,
+    jobs: int = 1,
+    cache: Optional["ResultCache"] = None,
+    line_ranges: Optional[List[Tuple[int, int]]] = None,
 ) -> None:
     formatted_files = set()
     failed_files = set()
-    for file_path in files:
-        try:
-            with open(file_path, "r+", encoding="utf-8") as handle:
-                code = handle.read()
-                success, actually_formatted, formatted_code = _format_code(
-                    code, line_length, spaces_for_indent, file_path, safety_checks
-                )
-                if success and actually_formatted:
-                    print(f"reformatted {file_path}")
-                    formatted_files.add(file_path)
-                    handle.seek(0)
-                    handle.truncate(0)
-                    handle.write(formatted_code)
-                elif not success:
-                    failed_files.add(file_path)
-        except OSError as exceptions:
-            print(
-                f"Cannot open file {file_path!r}: {exceptions.strerror}",
-                file=sys.stderr,
-            )
+    outcomes = map_files(
+        partial(
+            _format_file,
+            line_length=line_length,
+            spaces_for_indent=spaces_for_indent,
+            safety_checks=safety_checks,
+            cache=cache,
+            line_ranges=line_ranges,
+        ),
+        files,
+        jobs,
+    )
+    for file_path, (success, actually_formatted) in zip(files, outcomes):
+        if success and actually_formatted:
+            formatted_files.add(file_path)
+        elif not success:
             failed_files.add(file_path)
+    if cache is not None:
+        cache.prune()
     reformatted_num = len(formatted_files)
     left_unchanged_num = len(files) - reformatted_num
     print(
@@ -270,38 +349,101 @@ def _format_files(
     sys.exit(0 if len(failed_files) == 0 else 1)
 
 
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _format_file(
+    file_path: str,
+    line_length: int,
+    spaces_for_indent: Optional[int],
+    safety_checks: bool,
+    cache: Optional["ResultCache"] = None,
+    line_ranges: Optional[List[Tuple[int, int]]] = None,
+) -> Tuple[bool, bool]:
+    try:
+        with open(file_path, "r+", encoding="utf-8") as handle:
+            code = handle.read()
+            if cache is not None and cache.get(code) is not None:
+                return True, False
+            success, actually_formatted, formatted_code = _format_code(
+                code,
+                line_length,
+                spaces_for_indent,
+                file_path,
+                safety_checks,
+                line_ranges,
+            )
+            if success and actually_formatted:
+                print(f"reformatted {file_path}")
+                handle.seek(0)
+                handle.truncate(0)
+                handle.write(formatted_code)
+            if (
+                cache is not None
+                and success
+                and (safety_checks or not actually_formatted)
+            ):
+                # with safety checks on, formatted code is known to be stable
+                cache.put(formatted_code)
+            return success, actually_formatted
+    except OSError as exceptions:
+        print(
+            f"Cannot open file {file_path!r}: {exceptions.strerror}",
+            file=sys.stderr,
+        )
+        return False, False
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
 def _format_code(
     code: str,
     line_length: int,
     spaces_for_indent: Optional[int],
     file_path: str,
     safety_checks: bool,
+    line_ranges: Optional[List[Tuple[int, int]]] = None,
 ) -> Tuple[bool, bool, str]:
     success = True
     actually_formatted = False
     formatted_code = code
 
     try:
-        code_parse_tree = parser.parse(code, gather_metadata=True)
-        comment_parse_tree = parser.parse_comments(code)
-        formatted_code = format_code(
-            gdscript_code=code,
-            max_line_length=line_length,
-            spaces_for_indent=spaces_for_indent,
-            parse_tree=code_parse_tree,
-            comment_parse_tree=comment_parse_tree,
+        # only the statements in line ranges are parsed while formatting them
+        code_parse_tree, comment_parse_tree = (
+            parser.parse_with_comments(code) if line_ranges is None else (None, None)
         )
-        if formatted_code != code:
-            actually_formatted = True
-            if safety_checks:
-                check_formatting_safety(
-                    code,
-                    formatted_code,
+        formatted_fragments = None
+        with expression_to_str_cache() as cache:
+            if line_ranges is None:
+                formatted_code = format_code(
+                    gdscript_code=code,
                     max_line_length=line_length,
                     spaces_for_indent=spaces_for_indent,
-                    given_code_parse_tree=code_parse_tree,
-                    given_code_comment_parse_tree=comment_parse_tree,
+                    parse_tree=code_parse_tree,
+                    comment_parse_tree=comment_parse_tree,
                 )
+            else:
+                formatted_code, formatted_fragments = format_code_in_line_ranges(
+                    code, line_length, line_ranges, spaces_for_indent
+                )
+            if formatted_code != code:
+                actually_formatted = True
+                if safety_checks:
+                    check_formatting_safety(
+                        code,
+                        formatted_code,
+                        max_line_length=line_length,
+                        spaces_for_indent=spaces_for_indent,
+                        given_code_parse_tree=code_parse_tree,
+                        given_code_comment_parse_tree=comment_parse_tree,
+                        line_ranges=line_ranges,
+                        formatted_fragments=formatted_fragments,
+                    )
+        logging.debug(
+            "%s: expression to string cache hits: %d, misses: %d (hit rate %.2f)",
+            file_path,
+            cache.hits,
+            cache.misses,
+            cache.hit_rate,
+        )
     except lark.exceptions.UnexpectedToken as exception:
         success = False
         print(
@@ -1,4 +1,3 @@
-import re
 from types import MappingProxyType
 from typing import List, Callable
 
@@ -8,7 +7,6 @@ from ..common.utils import get_line
 from .types import Outcome, FormattedLines
 from .context import Context
 from .constants import (
-    TAB_INDENT_SIZE,
     DEFAULT_SURROUNDING_EMPTY_LINES_TABLE as DEFAULT_SURROUNDINGS_TABLE,
 )
 from .annotation import (
@@ -89,8 +87,9 @@ def format_block(
         previous_statement_name = statement.data
 
     # Handle end of block
-    dedent_line_number = _find_dedent_line_number(
-        previously_processed_line_number, context
+    # TODO: indent detection & refactoring
+    dedent_line_number = context.indentation_index.find_dedent_line_number(
+        previously_processed_line_number, context.indent
     )
     formatted_lines += _remove_empty_strings_from_end(
         reconstruct_blank_lines_in_range(
@@ -119,46 +118,6 @@ def reconstruct_blank_lines_in_range(
     return list(zip([None for _ in range(begin + 1, end)], reconstructed_lines))
 
 
-# TODO: indent detection & refactoring
-def _find_dedent_line_number(
-    previously_processed_line_number: int, context: Context
-) -> int:
-    if (
-        previously_processed_line_number == len(context.gdscript_code_lines) - 1
-        or context.indent == 0
-    ):
-        return len(context.gdscript_code_lines)
-    line_no = previously_processed_line_number + 1
-    for line in context.gdscript_code_lines[previously_processed_line_number + 1 :]:
-        if (
-            line.startswith(" ")
-            and re.search(r"^ {0,%d}[^ ]+" % (context.indent - 1), line) is not None
-        ):
-            break
-        if (
-            line.startswith("\t")
-            and re.search(
-                r"^\t{0,%d}[^\t]+" % ((context.indent / TAB_INDENT_SIZE) - 1), line
-            )
-            is not None
-        ):
-            break
-        if (
-            context.indent > 0
-            and len(line) > 0
-            and not line.startswith(" ")
-            and not line.startswith("\t")
-        ):
-            break
-        line_no += 1
-    for line in context.gdscript_code_lines[line_no - 1 :: -1]:
-        if line.strip() == "":
-            line_no -= 1
-        else:
-            break
-    return line_no
-
-
 def _add_extra_blanks_due_to_previous_statement(
     blank_lines: FormattedLines,
     previous_statement_name: str,
@@ -1,9 +1,11 @@
-import re
 from typing import List, Optional
 from dataclasses import dataclass
 
 from lark import Tree
 
+from .expression_layout import ExpressionLayout
+from .indentation_index import IndentationIndex
+
 
 # pylint: disable=too-many-arguments
 # pylint: disable=too-many-instance-attributes
@@ -20,6 +22,8 @@ class Context:
         standalone_comments: List[Optional[str]],
         inline_comments: List[Optional[str]],
         indent: int = 0,
+        expression_layout: Optional[ExpressionLayout] = None,
+        indentation_index: Optional[IndentationIndex] = None,
     ):
         self.single_indent = single_indent_size
         self.single_indent_string = single_indent_string
@@ -27,13 +31,22 @@ class Context:
         self.indent_string = self.single_indent_string * (
             self.indent // self.single_indent
         )
-        self.indent_regex = re.compile(f"^{self.single_indent_string[0]}+")
         self.previously_processed_line_number = previously_processed_line_number
         self.max_line_length = max_line_length
         self.gdscript_code_lines = gdscript_code_lines
         self.standalone_comments = standalone_comments
         self.inline_comments = inline_comments
         self.annotations = []  # type: List[Tree]
+        self.expression_layout = (
+            expression_layout
+            if expression_layout is not None
+            else ExpressionLayout(standalone_comments)
+        )
+        self.indentation_index = (
+            indentation_index
+            if indentation_index is not None
+            else IndentationIndex(gdscript_code_lines)
+        )
 
     def create_child_context(self, previously_processed_line_number: int):
         return Context(
@@ -45,6 +58,8 @@ class Context:
             standalone_comments=self.standalone_comments,
             inline_comments=self.inline_comments,
             indent=self.indent + self.single_indent,
+            expression_layout=self.expression_layout,
+            indentation_index=self.indentation_index,
         )
 
 
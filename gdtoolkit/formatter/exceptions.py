@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
 from ..common.exceptions import GDToolkitError
 
@@ -22,8 +23,10 @@ class FormattingStabilityViolation(GDToolkitError):
 @dataclass
 class CommentPersistenceViolation(GDToolkitError):
     missing_comment: str
+    missing_comments: List[str] = field(default_factory=list)
 
     def __str__(self):
-        return '{}(missing_comment="{}")'.format(
-            "CommentPersistenceViolation", self.missing_comment
+        return '{}(missing_comments="{}")'.format(
+            "CommentPersistenceViolation",
+            "\n".join(self.missing_comments or [self.missing_comment]),
         )
@@ -11,13 +11,11 @@ from .types import Outcome, FormattedLines
 from .expression_utils import (
     remove_outer_parentheses,
     is_foldable,
-    is_expression_forcing_multiple_lines,
     expression_contains_lambda,
     is_any_comma,
     is_trailing_comma,
 )
-from .expression_to_str import expression_to_str
-from .constants import TAB_INDENT_SIZE
+from .expression_to_str import expression_to_str, text_width
 
 
 def format_expression(
@@ -66,7 +64,7 @@ def _format_concrete_expression_to_single_line(
             "{}{}{}{}".format(
                 context.indent_string,
                 expression_context.prefix_string,
-                expression_to_str(expression),
+                context.expression_layout.flat_string(expression),
                 expression_context.suffix_string,
             ),
         )
@@ -86,16 +84,22 @@ def _format_comma_separated_list(
 def _format_foldable(
     expression: Tree, expression_context: ExpressionContext, context: Context
 ) -> FormattedLines:
-    if is_expression_forcing_multiple_lines(expression, context.standalone_comments):
+    layout = context.expression_layout
+    if layout.forces_multiple_lines(expression):
         return _format_foldable_to_multiple_lines(
             expression, expression_context, context
         )
-    single_line_number, single_line = _format_concrete_expression_to_single_line(
-        expression, expression_context, context
-    )[0]
-    single_line_length = len(single_line.replace("\t", " " * TAB_INDENT_SIZE))
+    single_line_length = layout.flat_width(expression) + text_width(
+        "{}{}{}".format(
+            context.indent_string,
+            expression_context.prefix_string,
+            expression_context.suffix_string,
+        )
+    )
     if single_line_length <= context.max_line_length:
-        return [(single_line_number, single_line)]
+        return _format_concrete_expression_to_single_line(
+            expression, expression_context, context
+        )
     return _format_foldable_to_multiple_lines(expression, expression_context, context)
 
 
@@ -726,7 +730,7 @@ def _format_dot_chain_to_multiple_lines(
         return _format_dot_chain_to_multiple_lines_bottom_up(
             dot_chain, expression_context, context
         )
-    if is_expression_forcing_multiple_lines(dot_chain, context.standalone_comments):
+    if context.expression_layout.forces_multiple_lines(dot_chain):
         return _format_operator_chain_based_expression_to_multiple_lines(
             dot_chain, expression_context, context
         )
@@ -734,7 +738,7 @@ def _format_dot_chain_to_multiple_lines(
         dot_chain, expression_context, context
     )
     if all(
-        len(line.replace("\t", " " * TAB_INDENT_SIZE)) <= context.max_line_length
+        text_width(line) <= context.max_line_length
         for line_number, line in lines_formatted_bottom_up
     ):
         return lines_formatted_bottom_up
@@ -0,0 +1,62 @@
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+from lark import Tree
+
+from ..common.types import Node
+from ..common.utils import get_line, get_end_line
+from .expression_to_str import expression_to_str, expression_width
+from .expression_utils import is_expression_forcing_multiple_lines_by_itself
+
+
+class ExpressionLayout:
+    """Per formatting run memo of the properties deciding whether expressions
+    fit in a single line: the flat width and string (as of expression_to_str,
+    which memoizes them per node within expression_to_str_cache) and whether
+    an expression forces multiple lines on its own, by its subexpressions or by
+    standalone comments in between. Every property is computed once per node,
+    so checking whether an expression fits takes constant time.
+    """
+
+    def __init__(self, standalone_comments: List[Optional[str]]):
+        self._standalone_comments_num = len(standalone_comments)
+        self._standalone_comments_before = [0] + list(
+            accumulate(int(comment is not None) for comment in standalone_comments)
+        )
+        # nodes are kept along with the values so that ids are not reused
+        self._forcing: Dict[int, Tuple[Node, bool]] = {}
+
+    def flat_width(self, expression: Node) -> int:
+        """Returns the width (with tabs expanded) of expression in a single line"""
+        return expression_width(expression)
+
+    def flat_string(self, expression: Node) -> str:
+        return expression_to_str(expression)
+
+    def forces_multiple_lines(self, expression: Node) -> bool:
+        """Checks if expression has to be split into multiple lines
+        because of itself, its subexpressions or standalone comments inside"""
+        memoized = self._forcing.get(id(expression))
+        if memoized is not None:
+            return memoized[1]
+        forcing = is_expression_forcing_multiple_lines_by_itself(expression) or (
+            isinstance(expression, Tree)
+            and (
+                self._has_standalone_comments(expression)
+                or any(
+                    self.forces_multiple_lines(child) for child in expression.children
+                )
+            )
+        )
+        self._forcing[id(expression)] = (expression, forcing)
+        return forcing
+
+    def _has_standalone_comments(self, expression: Tree) -> bool:
+        begin, end, _ = slice(get_line(expression), get_end_line(expression)).indices(
+            self._standalone_comments_num
+        )
+        return (
+            end > begin
+            and self._standalone_comments_before[end]
+            > self._standalone_comments_before[begin]
+        )
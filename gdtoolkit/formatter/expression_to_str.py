@@ -1,8 +1,11 @@
-from typing import List
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from lark import Tree, Token
 
 from ..common.types import Node
+from .constants import TAB_INDENT_SIZE
 from .expression_utils import (
     is_any_comma,
     is_any_parentheses,
@@ -12,156 +15,95 @@ from .expression_utils import (
 from .function_statement_to_str import function_statement_to_str
 
 
+class ExpressionToStrCache:
+    """Memo of expressions converted to strings keyed by node identity.
+    It is meant to live for a single formatting run (see expression_to_str_cache)
+    as trees are not modified meanwhile - every node is then converted to string
+    at most once no matter how many times the formatter asks for it.
+    """
+
+    def __init__(self):
+        # nodes are kept along with the strings so that ids are not reused
+        self._strings: Dict[int, Tuple[Node, str]] = {}
+        self._widths: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def string(self, expression: Node) -> str:
+        memoized = self._strings.get(id(expression))
+        if memoized is not None:
+            self.hits += 1
+            return memoized[1]
+        self.misses += 1
+        string = _expression_to_str(expression)
+        self._strings[id(expression)] = (expression, string)
+        return string
+
+    def width(self, expression: Node) -> int:
+        string = self.string(expression)
+        width = self._widths.get(id(expression))
+        if width is None:
+            width = text_width(string)
+            self._widths[id(expression)] = width
+        return width
+
+
+_ACTIVE_CACHE: ContextVar[Optional[ExpressionToStrCache]] = ContextVar(
+    "expression_to_str_cache", default=None
+)
+
+
+@contextmanager
+def expression_to_str_cache() -> Iterator[ExpressionToStrCache]:
+    """Memoizes expression_to_str calls within the block,
+    the enclosing block's cache is reused if there is any"""
+    cache = _ACTIVE_CACHE.get()
+    if cache is not None:
+        yield cache
+        return
+    cache = ExpressionToStrCache()
+    reset_token = _ACTIVE_CACHE.set(cache)
+    try:
+        yield cache
+    finally:
+        _ACTIVE_CACHE.reset(reset_token)
+
+
+def text_width(text: str) -> int:
+    return len(text) + text.count("\t") * (TAB_INDENT_SIZE - 1)
+
+
 def standalone_expression_to_str(expression: Node) -> str:
     expression = remove_outer_parentheses(expression)
     return expression_to_str(expression)
 
 
 def expression_to_str(expression: Node) -> str:
+    cache = _ACTIVE_CACHE.get()
+    if cache is not None:
+        return cache.string(expression)
+    return _expression_to_str(expression)
+
+
+def expression_width(expression: Node) -> int:
+    """Returns the width (with tabs expanded) of expression_to_str(expression)"""
+    cache = _ACTIVE_CACHE.get()
+    if cache is not None:
+        return cache.width(expression)
+    return text_width(_expression_to_str(expression))
+
+
+def _expression_to_str(expression: Node) -> str:
     if isinstance(expression, Token):
-        token_handlers = {
-            "LONG_STRING": _long_string_to_str,
-            "LONG_RSTRING": _long_rstring_to_str,
-            "REGULAR_STRING": _regular_string_to_str,
-            "REGULAR_RSTRING": _regular_rstring_to_str,
-        }
-        if expression.type in token_handlers:
-            return token_handlers[expression.type](expression)
+        if expression.type in _TOKEN_HANDLERS:
+            return _TOKEN_HANDLERS[expression.type](expression)
         return expression.value
-    return {
-        "expr": lambda e: standalone_expression_to_str(e.children[0]),
-        "assnmnt_expr": _operator_chain_based_expression_to_str,
-        "test_expr": _operator_chain_based_expression_to_str,
-        "asless_test_expr": _operator_chain_based_expression_to_str,
-        "or_test": _operator_chain_based_expression_to_str,
-        "asless_or_test": _operator_chain_based_expression_to_str,
-        "and_test": _operator_chain_based_expression_to_str,
-        "asless_and_test": _operator_chain_based_expression_to_str,
-        "asless_actual_not_test": lambda e: "{}{}{}".format(
-            expression_to_str(e.children[0]),
-            "" if e.children[0].value == "!" else " ",
-            expression_to_str(e.children[1]),
-        ),
-        "not_in_op": lambda _: "not in",
-        "content_test": _operator_chain_based_expression_to_str,
-        "asless_content_test": _operator_chain_based_expression_to_str,
-        "comparison": _operator_chain_based_expression_to_str,
-        "asless_comparison": _operator_chain_based_expression_to_str,
-        "bitw_or": _operator_chain_based_expression_to_str,
-        "asless_bitw_or": _operator_chain_based_expression_to_str,
-        "bitw_xor": _operator_chain_based_expression_to_str,
-        "asless_bitw_xor": _operator_chain_based_expression_to_str,
-        "bitw_and": _operator_chain_based_expression_to_str,
-        "asless_bitw_and": _operator_chain_based_expression_to_str,
-        "shift_expr": _operator_chain_based_expression_to_str,
-        "asless_shift_expr": _operator_chain_based_expression_to_str,
-        "arith_expr": _operator_chain_based_expression_to_str,
-        "asless_arith_expr": _operator_chain_based_expression_to_str,
-        "mdr_expr": _operator_chain_based_expression_to_str,
-        "asless_mdr_expr": _operator_chain_based_expression_to_str,
-        "asless_actual_neg_expr": lambda e: f"-{expression_to_str(e.children[1])}",
-        "asless_actual_bitw_not": lambda e: f"~{expression_to_str(e.children[1])}",
-        "pow_expr": _operator_chain_based_expression_to_str,
-        "asless_pow_expr": _operator_chain_based_expression_to_str,
-        "type_test": _operator_chain_based_expression_to_str,
-        "asless_type_test": _operator_chain_based_expression_to_str,
-        "actual_type_cast": _operator_chain_based_expression_to_str,
-        "await_expr": lambda e: "{} {}".format(
-            " ".join(t.value for t in e.children[:-1]),
-            expression_to_str(e.children[-1]),
-        ),
-        "standalone_call": _standalone_call_to_str,
-        "getattr_call": _getattr_call_to_str,
-        "getattr": lambda e: "".join(map(expression_to_str, e.children)),
-        "subscr_expr": _subscription_to_str,
-        "par_expr": lambda e: f"({standalone_expression_to_str(e.children[0])})",
-        "array": _array_to_str,
-        "dict": _dict_to_str,
-        "c_dict_element": _dict_element_to_str,
-        "eq_dict_element": _dict_element_to_str,
-        "string": lambda e: expression_to_str(e.children[0]),
-        "rstring": lambda e: f"r{expression_to_str(e.children[0])}",
-        "get_node": lambda e: f"${expression_to_str(e.children[0])}",
-        "path": lambda e: "".join([name_token.value for name_token in e.children]),
-        "node_path": lambda e: f"^{expression_to_str(e.children[0])}",
-        "unique_node_path": lambda e: "".join(
-            [expression_to_str(n) for n in e.children]
-        ),
-        "string_name": lambda e: f"&{expression_to_str(e.children[0])}",
-        "lambda": _lambda_to_str,
-        "lambda_header": _lambda_header_to_str,
-        # fake expressions:
-        "func_args": _args_to_str,
-        "func_arg_variadic": lambda e: f"...{expression_to_str(e.children[0])}",
-        "func_arg_regular": lambda e: "{}{}".format(
-            e.children[0].value,
-            " = {}".format(standalone_expression_to_str(e.children[1]))
-            if len(e.children) > 1
-            else "",
-        ),
-        "func_arg_inf": lambda e: "{} := {}".format(
-            e.children[0].value, standalone_expression_to_str(e.children[1])
-        ),
-        "func_arg_typed": lambda e: "{}: {}{}".format(
-            e.children[0].value,
-            e.children[1].value,
-            f" = {standalone_expression_to_str(e.children[2])}"
-            if len(e.children) > 2
-            else "",
-        ),
-        "enum_body": _enum_body_to_str,
-        "enum_element": _enum_element_to_str,
-        "signal_args": _args_to_str,
-        "signal_arg_regular": lambda e: e.children[0].value,
-        "signal_arg_typed": lambda e: "{}: {}".format(
-            e.children[0].value,
-            e.children[1].value,
-        ),
-        "comma_separated_list": lambda e: _arguments_to_str(e.children),
-        "contextless_comma_separated_list": lambda e: _arguments_to_str(e.children),
-        "contextless_operator_chain_based_expression": (
-            _operator_chain_based_expression_to_str
-        ),
-        "trailing_comma": lambda _: "",
-        "annotation": _annotation_to_str,
-        "annotation_args": _annotation_args_to_str,
-        "non_foldable_dot_chain": lambda e: "".join(map(expression_to_str, e.children)),
-        "actual_getattr_call": _getattr_call_to_str,
-        "actual_subscr_expr": _subscription_to_str,
-        "property_custom_getter_args": lambda _: "()",
-        # patterns (fake expressions):
-        "list_pattern": lambda e: ", ".join(map(expression_to_str, e.children)),
-        "test_pattern": _operator_chain_based_expression_to_str,
-        "or_pattern": _operator_chain_based_expression_to_str,
-        "and_pattern": _operator_chain_based_expression_to_str,
-        "not_pattern": lambda e: "{}{}{}".format(
-            expression_to_str(e.children[0]),
-            "" if e.children[0].value == "!" else " ",
-            expression_to_str(e.children[1]),
-        ),
-        "comp_pattern": _operator_chain_based_expression_to_str,
-        "bitw_or_pattern": _operator_chain_based_expression_to_str,
-        "bitw_xor_pattern": _operator_chain_based_expression_to_str,
-        "bitw_and_pattern": _operator_chain_based_expression_to_str,
-        "shift_pattern": _operator_chain_based_expression_to_str,
-        "arith_pattern": _operator_chain_based_expression_to_str,
-        "mdr_pattern": _operator_chain_based_expression_to_str,
-        "neg_pattern": lambda e: f"-{expression_to_str(e.children[1])}",
-        "bitw_not_pattern": lambda e: f"~{expression_to_str(e.children[1])}",
-        "attr_pattern": lambda e: ".".join(map(expression_to_str, e.children[::2])),
-        "call_pattern": lambda e: "{}({})".format(
-            expression_to_str(e.children[0]), expression_to_str(e.children[1])
-        ),
-        "par_pattern": lambda e: f"({expression_to_str(e.children[0])})",
-        "var_capture_pattern": lambda e: f"var {expression_to_str(e.children[0])}",
-        "etc_pattern": lambda _: "..",
-        "wildcard_pattern": lambda _: "_",
-        "array_pattern": _array_to_str,
-        "dict_pattern": _dict_to_str,
-        "kv_pair_pattern": lambda e: "{}: {}".format(
-            expression_to_str(e.children[0]), expression_to_str(e.children[1])
-        ),
-    }[expression.data](expression)
+    return _TREE_HANDLERS[expression.data](expression)
 
 
 def _operator_chain_based_expression_to_str(expression: Tree) -> str:
@@ -324,3 +266,145 @@ def _regular_string_to_str(string: Token) -> str:
 def _regular_rstring_to_str(rstring: Token) -> str:
     actual_string = rstring.value
     return _regular_string_to_str(Token("REGULAR_STRING", actual_string[1:]))
+
+
+_TOKEN_HANDLERS: Dict[str, Callable[[Token], str]] = {
+    "LONG_STRING": _long_string_to_str,
+    "LONG_RSTRING": _long_rstring_to_str,
+    "REGULAR_STRING": _regular_string_to_str,
+    "REGULAR_RSTRING": _regular_rstring_to_str,
+}
+
+
+_TREE_HANDLERS: Dict[str, Callable[[Tree], str]] = {
+    "expr": lambda e: standalone_expression_to_str(e.children[0]),
+    "assnmnt_expr": _operator_chain_based_expression_to_str,
+    "test_expr": _operator_chain_based_expression_to_str,
+    "asless_test_expr": _operator_chain_based_expression_to_str,
+    "or_test": _operator_chain_based_expression_to_str,
+    "asless_or_test": _operator_chain_based_expression_to_str,
+    "and_test": _operator_chain_based_expression_to_str,
+    "asless_and_test": _operator_chain_based_expression_to_str,
+    "asless_actual_not_test": lambda e: "{}{}{}".format(
+        expression_to_str(e.children[0]),
+        "" if e.children[0].value == "!" else " ",
+        expression_to_str(e.children[1]),
+    ),
+    "not_in_op": lambda _: "not in",
+    "content_test": _operator_chain_based_expression_to_str,
+    "asless_content_test": _operator_chain_based_expression_to_str,
+    "comparison": _operator_chain_based_expression_to_str,
+    "asless_comparison": _operator_chain_based_expression_to_str,
+    "bitw_or": _operator_chain_based_expression_to_str,
+    "asless_bitw_or": _operator_chain_based_expression_to_str,
+    "bitw_xor": _operator_chain_based_expression_to_str,
+    "asless_bitw_xor": _operator_chain_based_expression_to_str,
+    "bitw_and": _operator_chain_based_expression_to_str,
+    "asless_bitw_and": _operator_chain_based_expression_to_str,
+    "shift_expr": _operator_chain_based_expression_to_str,
+    "asless_shift_expr": _operator_chain_based_expression_to_str,
+    "arith_expr": _operator_chain_based_expression_to_str,
+    "asless_arith_expr": _operator_chain_based_expression_to_str,
+    "mdr_expr": _operator_chain_based_expression_to_str,
+    "asless_mdr_expr": _operator_chain_based_expression_to_str,
+    "asless_actual_neg_expr": lambda e: f"-{expression_to_str(e.children[1])}",
+    "asless_actual_bitw_not": lambda e: f"~{expression_to_str(e.children[1])}",
+    "pow_expr": _operator_chain_based_expression_to_str,
+    "asless_pow_expr": _operator_chain_based_expression_to_str,
+    "type_test": _operator_chain_based_expression_to_str,
+    "asless_type_test": _operator_chain_based_expression_to_str,
+    "actual_type_cast": _operator_chain_based_expression_to_str,
+    "await_expr": lambda e: "{} {}".format(
+        " ".join(t.value for t in e.children[:-1]),
+        expression_to_str(e.children[-1]),
+    ),
+    "standalone_call": _standalone_call_to_str,
+    "getattr_call": _getattr_call_to_str,
+    "getattr": lambda e: "".join(map(expression_to_str, e.children)),
+    "subscr_expr": _subscription_to_str,
+    "par_expr": lambda e: f"({standalone_expression_to_str(e.children[0])})",
+    "array": _array_to_str,
+    "dict": _dict_to_str,
+    "c_dict_element": _dict_element_to_str,
+    "eq_dict_element": _dict_element_to_str,
+    "string": lambda e: expression_to_str(e.children[0]),
+    "rstring": lambda e: f"r{expression_to_str(e.children[0])}",
+    "get_node": lambda e: f"${expression_to_str(e.children[0])}",
+    "path": lambda e: "".join([name_token.value for name_token in e.children]),
+    "node_path": lambda e: f"^{expression_to_str(e.children[0])}",
+    "unique_node_path": lambda e: "".join([expression_to_str(n) for n in e.children]),
+    "string_name": lambda e: f"&{expression_to_str(e.children[0])}",
+    "lambda": _lambda_to_str,
+    "lambda_header": _lambda_header_to_str,
+    # fake expressions:
+    "func_args": _args_to_str,
+    "func_arg_variadic": lambda e: f"...{expression_to_str(e.children[0])}",
+    "func_arg_regular": lambda e: "{}{}".format(
+        e.children[0].value,
+        " = {}".format(standalone_expression_to_str(e.children[1]))
+        if len(e.children) > 1
+        else "",
+    ),
+    "func_arg_inf": lambda e: "{} := {}".format(
+        e.children[0].value, standalone_expression_to_str(e.children[1])
+    ),
+    "func_arg_typed": lambda e: "{}: {}{}".format(
+        e.children[0].value,
+        e.children[1].value,
+        f" = {standalone_expression_to_str(e.children[2])}"
+        if len(e.children) > 2
+        else "",
+    ),
+    "enum_body": _enum_body_to_str,
+    "enum_element": _enum_element_to_str,
+    "signal_args": _args_to_str,
+    "signal_arg_regular": lambda e: e.children[0].value,
+    "signal_arg_typed": lambda e: "{}: {}".format(
+        e.children[0].value,
+        e.children[1].value,
+    ),
+    "comma_separated_list": lambda e: _arguments_to_str(e.children),
+    "contextless_comma_separated_list": lambda e: _arguments_to_str(e.children),
+    "contextless_operator_chain_based_expression": (
+        _operator_chain_based_expression_to_str
+    ),
+    "trailing_comma": lambda _: "",
+    "annotation": _annotation_to_str,
+    "annotation_args": _annotation_args_to_str,
+    "non_foldable_dot_chain": lambda e: "".join(map(expression_to_str, e.children)),
+    "actual_getattr_call": _getattr_call_to_str,
+    "actual_subscr_expr": _subscription_to_str,
+    "property_custom_getter_args": lambda _: "()",
+    # patterns (fake expressions):
+    "list_pattern": lambda e: ", ".join(map(expression_to_str, e.children)),
+    "test_pattern": _operator_chain_based_expression_to_str,
+    "or_pattern": _operator_chain_based_expression_to_str,
+    "and_pattern": _operator_chain_based_expression_to_str,
+    "not_pattern": lambda e: "{}{}{}".format(
+        expression_to_str(e.children[0]),
+        "" if e.children[0].value == "!" else " ",
+        expression_to_str(e.children[1]),
+    ),
+    "comp_pattern": _operator_chain_based_expression_to_str,
+    "bitw_or_pattern": _operator_chain_based_expression_to_str,
+    "bitw_xor_pattern": _operator_chain_based_expression_to_str,
+    "bitw_and_pattern": _operator_chain_based_expression_to_str,
+    "shift_pattern": _operator_chain_based_expression_to_str,
+    "arith_pattern": _operator_chain_based_expression_to_str,
+    "mdr_pattern": _operator_chain_based_expression_to_str,
+    "neg_pattern": lambda e: f"-{expression_to_str(e.children[1])}",
+    "bitw_not_pattern": lambda e: f"~{expression_to_str(e.children[1])}",
+    "attr_pattern": lambda e: ".".join(map(expression_to_str, e.children[::2])),
+    "call_pattern": lambda e: "{}({})".format(
+        expression_to_str(e.children[0]), expression_to_str(e.children[1])
+    ),
+    "par_pattern": lambda e: f"({expression_to_str(e.children[0])})",
+    "var_capture_pattern": lambda e: f"var {expression_to_str(e.children[0])}",
+    "etc_pattern": lambda _: "..",
+    "wildcard_pattern": lambda _: "_",
+    "array_pattern": _array_to_str,
+    "dict_pattern": _dict_to_str,
+    "kv_pair_pattern": lambda e: "{}: {}".format(
+        expression_to_str(e.children[0]), expression_to_str(e.children[1])
+    ),
+}
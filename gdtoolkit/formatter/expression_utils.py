@@ -1,8 +1,5 @@
-from typing import List, Optional
-
 from lark import Tree, Token
 
-from ..common.utils import get_line, get_end_line
 from ..common.types import Node
 
 
@@ -44,23 +41,15 @@ def is_trailing_comma(expression: Node) -> bool:
     return isinstance(expression, Tree) and expression.data == "trailing_comma"
 
 
-def is_expression_forcing_multiple_lines(
-    expression: Node, standalone_comments: List[Optional[str]]
-) -> bool:
-    if has_trailing_comma(expression) or _is_multiline_string(expression):
-        return True
-    if isinstance(expression, Token):
-        return False
-    if (
-        _has_standalone_comments(expression, standalone_comments)
+def is_expression_forcing_multiple_lines_by_itself(expression: Node) -> bool:
+    """Checks if expression forces multiple lines regardless of the comments
+    and its subexpressions (see ExpressionLayout.forces_multiple_lines)"""
+    return (
+        has_trailing_comma(expression)
+        or _is_multiline_string(expression)
         or _is_multistatement_lambda(expression)
         or _is_unistatement_lambda_with_compoud_statement(expression)
-    ):
-        return True
-    for child in expression.children:
-        if is_expression_forcing_multiple_lines(child, standalone_comments):
-            return True
-    return False
+    )
 
 
 def expression_contains_lambda(expression: Node):
@@ -93,18 +82,7 @@ def _is_multiline_string(expression: Node) -> bool:
     )
 
 
-def _has_standalone_comments(
-    expression: Tree, standalone_comments: List[Optional[str]]
-) -> bool:
-    return any(
-        comment is not None
-        for comment in standalone_comments[
-            get_line(expression) : get_end_line(expression)
-        ]
-    )
-
-
-def _is_multistatement_lambda(expression: Tree) -> bool:
+def _is_multistatement_lambda(expression: Node) -> bool:
     return (
         isinstance(expression, Tree)
         and expression.data == "lambda"
@@ -113,7 +91,7 @@ def _is_multistatement_lambda(expression: Tree) -> bool:
 
 
 # TODO: remove once such statements are supported
-def _is_unistatement_lambda_with_compoud_statement(expression: Tree) -> bool:
+def _is_unistatement_lambda_with_compoud_statement(expression: Node) -> bool:
     return (
         isinstance(expression, Tree)
         and expression.data == "lambda"
@@ -1,5 +1,4 @@
-import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from lark import Tree
 
@@ -12,6 +11,13 @@ from .constants import (
 )
 from .types import FormattedLines
 from .block import format_block
+from .expression_to_str import expression_to_str_cache
+from .line_ranges import (
+    FormattedFragment,
+    LineRange,
+    find_statements_in_line_ranges,
+    map_line_ranges,
+)
 from .class_statement import format_class_statement
 from .comments import (
     gather_standalone_comments,
@@ -19,13 +25,26 @@ from .comments import (
 )
 
 
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
 def format_code(
     gdscript_code: str,
     max_line_length: int,
     spaces_for_indent: Optional[int] = None,
     parse_tree: Optional[Tree] = None,
     comment_parse_tree: Optional[Tree] = None,
+    line_ranges: Optional[List[LineRange]] = None,
 ) -> str:
+    """Formats GDScript code. If line_ranges are given, only the top-level
+    statements intersecting them are formatted (one by one, without parsing
+    the whole code, so the parse trees are not used) and the rest of the code
+    is left intact."""
+    if line_ranges is not None:
+        formatted_code, _ = format_code_in_line_ranges(
+            gdscript_code, max_line_length, line_ranges, spaces_for_indent
+        )
+        return formatted_code
+    if parse_tree is None and comment_parse_tree is None:
+        parse_tree, comment_parse_tree = parser.parse_with_comments(gdscript_code)
     parse_tree = (
         parse_tree
         if parse_tree is not None
@@ -58,80 +77,143 @@ def format_code(
         ),
         inline_comments=gather_inline_comments(gdscript_code, comment_parse_tree),
     )
-    formatted_lines, _ = format_block(
-        parse_tree.children,
-        format_class_statement,
-        context,
-        GLOBAL_SCOPE_SURROUNDING_EMPTY_LINES_TABLE,
-    )
+    with expression_to_str_cache():
+        formatted_lines, _ = format_block(
+            parse_tree.children,
+            format_class_statement,
+            context,
+            GLOBAL_SCOPE_SURROUNDING_EMPTY_LINES_TABLE,
+        )
     formatted_lines.append((None, ""))
     formatted_lines = _add_inline_comments(formatted_lines, context.inline_comments)
     formatted_lines = _add_standalone_comments(
-        formatted_lines, context.standalone_comments, context.indent_regex
+        formatted_lines,
+        context.standalone_comments,
+        context.single_indent_string[0],
     )
     return "\n".join([line for _, line in formatted_lines])
 
 
+def format_code_in_line_ranges(
+    gdscript_code: str,
+    max_line_length: int,
+    line_ranges: List[LineRange],
+    spaces_for_indent: Optional[int] = None,
+) -> Tuple[str, List[FormattedFragment]]:
+    """Formats the top-level statements intersecting line_ranges and returns
+    the code along with the fragments formatted, so that they can be checked
+    for safety without formatting them again"""
+    formatted_fragments = []  # type: List[FormattedFragment]
+
+    def format_fragment(fragment: str) -> str:
+        formatted_fragment = format_code(fragment, max_line_length, spaces_for_indent)
+        formatted_fragments.append((fragment, formatted_fragment))
+        return formatted_fragment
+
+    formatted_code = map_line_ranges(
+        gdscript_code,
+        find_statements_in_line_ranges(gdscript_code, line_ranges),
+        format_fragment,
+    )
+    return formatted_code, formatted_fragments
+
+
 def _add_inline_comments(
     formatted_lines: FormattedLines, comments: List[Optional[str]]
 ) -> FormattedLines:
-    remaining_comments = comments[:]
-    postprocessed_lines = []  # type: FormattedLines
+    remaining_comments = _RemainingComments(comments)
+    postprocessed_lines = formatted_lines[:]
     comment_offset = " " * INLINE_COMMENT_OFFSET
 
-    for line_no, line in reversed(formatted_lines):
+    for i in range(len(formatted_lines) - 1, -1, -1):
+        line_no, line = formatted_lines[i]
         if line_no is None:
-            postprocessed_lines.append((line_no, line))
             continue
-        comments = remaining_comments[line_no:]
-        remaining_comments = remaining_comments[:line_no]
-        if comments != []:
-            new_line = comment_offset.join(
-                [line] + [c for c in comments if c is not None]
+        line_comments = remaining_comments.pop(line_no)
+        if line_comments != []:
+            postprocessed_lines[i] = (
+                line_no,
+                comment_offset.join([line] + line_comments),
             )
-            postprocessed_lines.append((line_no, new_line))
-        else:
-            postprocessed_lines.append((line_no, line))
 
-    return list(reversed(postprocessed_lines))
+    return postprocessed_lines
 
 
 def _add_standalone_comments(
     formatted_lines: FormattedLines,
     standalone_comments: List[Optional[str]],
-    indent_regex: re.Pattern,
+    indent_character: str,
 ) -> FormattedLines:
-    remaining_comments = standalone_comments[:]
+    remaining_comments = _RemainingComments(standalone_comments)
     postprocessed_lines = []  # type: FormattedLines
     currently_inside_expression = False
     last_experssion_line_no = None
+    next_line_indent = ""
 
     for line_no, line in reversed(formatted_lines):
         if line_no is None:
             postprocessed_lines.append((line_no, line))
             currently_inside_expression = False
             continue
+        indent = _get_indent(line, indent_character)
         if not currently_inside_expression:
             postprocessed_lines.append((line_no, line))
             currently_inside_expression = True
             last_experssion_line_no = line_no
+            next_line_indent = indent
             continue
-        comments = remaining_comments[line_no:last_experssion_line_no]
-        remaining_comments = remaining_comments[:line_no]
-        indent = _get_greater_indent(line, postprocessed_lines[-1][1], indent_regex)
+        comments = remaining_comments.pop(line_no, last_experssion_line_no)
+        greater_indent = (
+            indent if len(indent) > len(next_line_indent) else next_line_indent
+        )
         postprocessed_lines += [
-            (None, f"{indent}{comment}")
-            for comment in reversed(comments)
-            if comment is not None
+            (None, f"{greater_indent}{comment}") for comment in reversed(comments)
         ]
         postprocessed_lines.append((line_no, line))
+        next_line_indent = indent
+
+    postprocessed_lines.reverse()
+    return postprocessed_lines
+
 
-    return list(reversed(postprocessed_lines))
+def _get_indent(line: str, indent_character: str) -> str:
+    return line[: len(line) - len(line.lstrip(indent_character))]
 
 
-def _get_greater_indent(line_a: str, line_b: str, indent_regex: re.Pattern):
-    line_a_match = indent_regex.search(line_a)
-    line_b_match = indent_regex.search(line_b)
-    line_a_indent = "" if line_a_match is None else line_a_match.group(0)
-    line_b_indent = "" if line_b_match is None else line_b_match.group(0)
-    return line_a_indent if len(line_a_indent) > len(line_b_indent) else line_b_indent
+# pylint: disable-next=too-few-public-methods
+class _RemainingComments:
+    """Comments indexed by line number (as gathered) which can be popped from
+    the end like slices of a list but in time proportional to the number of actual
+    comments popped instead of the number of lines.
+    """
+
+    def __init__(self, comments: List[Optional[str]]):
+        self._comment_table = [
+            (line_no, comment)
+            for line_no, comment in enumerate(comments)
+            if comment is not None
+        ]
+        # comments from this index on are popped already
+        self._comment_table_end = len(self._comment_table)
+        self._lines_num = len(comments)
+
+    def pop(self, line_no: int, end_line_no: Optional[int] = None) -> List[str]:
+        """Equivalent of taking non-None comments[line_no:end_line_no] and then
+        truncating the comments to comments[:line_no]"""
+        begin, end, _ = slice(line_no, end_line_no).indices(self._lines_num)
+        new_comment_table_end = self._comment_table_end
+        while (
+            new_comment_table_end > 0
+            and self._comment_table[new_comment_table_end - 1][0] >= begin
+        ):
+            new_comment_table_end -= 1
+        comments = [
+            comment
+            for comment_line_no, comment in self._comment_table[
+                new_comment_table_end : self._comment_table_end
+            ]
+            if comment_line_no < end
+        ]
+        self._comment_table_end = new_comment_table_end
+        self._lines_num = begin
+        return comments
@@ -0,0 +1,63 @@
+from math import inf
+from typing import List
+
+from .constants import TAB_INDENT_SIZE
+
+
+# pylint: disable-next=too-few-public-methods
+class IndentationIndex:
+    """Index of the original code lines answering where a block of given indent
+    ends. Every line gets the smallest indent at which it ends a block (its
+    dedent threshold) along with a pointer to the next line of a lower threshold.
+    Looking for the block end follows those pointers, so it takes at most as many
+    steps as there are distinct indentation levels instead of scanning the lines.
+    """
+
+    def __init__(self, gdscript_code_lines: List[str]):
+        self._lines_num = len(gdscript_code_lines)
+        self._dedent_thresholds = [
+            _dedent_threshold(line) for line in gdscript_code_lines
+        ]
+        self._next_lower_threshold_line = [self._lines_num] * self._lines_num
+        stack = []  # type: List[int]
+        for line_no in range(self._lines_num - 1, -1, -1):
+            while (
+                len(stack) > 0
+                and self._dedent_thresholds[stack[-1]]
+                >= self._dedent_thresholds[line_no]
+            ):
+                stack.pop()
+            if len(stack) > 0:
+                self._next_lower_threshold_line[line_no] = stack[-1]
+            stack.append(line_no)
+        # 1 + the number of the last non-blank line before a given line (0 if none)
+        self._non_blank_end = [0] * (self._lines_num + 1)
+        for line_no, line in enumerate(gdscript_code_lines):
+            self._non_blank_end[line_no + 1] = (
+                line_no + 1 if line.strip() != "" else self._non_blank_end[line_no]
+            )
+
+    def find_dedent_line_number(
+        self, previously_processed_line_number: int, indent: int
+    ) -> int:
+        """Returns the number of the line right after the block of given indent
+        (excluding trailing blank lines) which contains given line"""
+        if previously_processed_line_number == self._lines_num - 1 or indent == 0:
+            return self._lines_num
+        line_no = previously_processed_line_number + 1
+        while line_no < self._lines_num and self._dedent_thresholds[line_no] > indent:
+            line_no = self._next_lower_threshold_line[line_no]
+        return self._non_blank_end[line_no]
+
+
+def _dedent_threshold(line: str) -> float:
+    """Returns the smallest block indent which the line ends"""
+    if line == "":
+        return inf
+    if line.startswith(" "):
+        spaces_num = len(line) - len(line.lstrip(" "))
+        return spaces_num + 1 if spaces_num < len(line) else inf
+    if line.startswith("\t"):
+        tabs_num = len(line) - len(line.lstrip("\t"))
+        return TAB_INDENT_SIZE * (tabs_num + 1) if tabs_num < len(line) else inf
+    return 1
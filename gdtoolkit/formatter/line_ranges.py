@@ -0,0 +1,48 @@
+from typing import Callable, List, Tuple
+
+from ..parser.outline import find_top_level_statements
+
+# first and last line (inclusive, numbered from 1)
+LineRange = Tuple[int, int]
+# code fragment along with its formatted version
+FormattedFragment = Tuple[str, str]
+
+
+def find_statements_in_line_ranges(
+    gdscript_code: str, line_ranges: List[LineRange]
+) -> List[LineRange]:
+    """Returns line ranges of the top-level statements intersecting given line
+    ranges. Ranges of statements not separated by any line are merged, so that
+    the empty lines required between such statements are added while formatting."""
+    statement_line_ranges = []  # type: List[LineRange]
+    for begin, end in find_top_level_statements(gdscript_code):
+        if not any(
+            range_begin <= end and begin <= range_end
+            for range_begin, range_end in line_ranges
+        ):
+            continue
+        if len(statement_line_ranges) > 0 and statement_line_ranges[-1][1] + 1 >= begin:
+            statement_line_ranges[-1] = (statement_line_ranges[-1][0], end)
+        else:
+            statement_line_ranges.append((begin, end))
+    return statement_line_ranges
+
+
+def map_line_ranges(
+    gdscript_code: str,
+    line_ranges: List[LineRange],
+    function: Callable[[str], str],
+) -> str:
+    """Replaces code lines in every line range with the outcome of function
+    called on them, the other lines are left intact except for the line endings
+    which are normalized to LF as in the formatted code"""
+    code_lines = gdscript_code.replace("\r\n", "\n").split("\n")
+    mapped_lines = []  # type: List[str]
+    previous_end = 0
+    for begin, end in line_ranges:
+        mapped_lines += code_lines[previous_end : begin - 1]
+        fragment = "\n".join(code_lines[begin - 1 : end]) + "\n"
+        mapped_lines += function(fragment).split("\n")[:-1]
+        previous_end = end
+    mapped_lines += code_lines[previous_end:]
+    return "\n".join(mapped_lines)
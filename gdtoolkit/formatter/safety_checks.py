@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import re
 import difflib
 
 from lark import Tree, Transformer, Token
 
+from ..common.types import Node
 from ..parser import parser
 from .formatter import format_code
 from .comments import gather_comments
@@ -13,6 +15,8 @@ from .exceptions import (
     CommentPersistenceViolation,
 )
 
+_MERGED_COMMENT_BEGIN_REGEX = re.compile(r"(^|(?<=\s))#")
+
 
 # pylint: disable-next=too-many-public-methods
 class LoosenTreeTransformer(Transformer):
@@ -123,17 +127,14 @@ def check_tree_invariant(
         if formatted_code_parse_tree is not None
         else parser.parse(formatted_code)
     )
-    loosen_tree_transformer = LoosenTreeTransformer()
-    given_code_parse_tree = loosen_tree_transformer.transform(given_code_parse_tree)
-    formatted_code_parse_tree = loosen_tree_transformer.transform(
-        formatted_code_parse_tree
+    subtree_hashes = {}  # type: Dict[int, int]
+    mismatches = _find_mismatching_subtrees(
+        [given_code_parse_tree], [formatted_code_parse_tree], subtree_hashes
     )
-    if given_code_parse_tree != formatted_code_parse_tree:
+    if len(mismatches) > 0:
         diff = "\n".join(
-            difflib.unified_diff(
-                str(given_code_parse_tree.pretty()).splitlines(),
-                str(formatted_code_parse_tree.pretty()).splitlines(),
-            )
+            _mismatching_subtrees_to_diff(given_nodes, formatted_nodes)
+            for given_nodes, formatted_nodes in mismatches
         )
         raise TreeInvariantViolation(diff)
 
@@ -161,7 +162,6 @@ def check_formatting_stability(
         raise FormattingStabilityViolation(diff)
 
 
-# TODO: boost algorithm
 def check_comment_persistence(
     given_code: str,
     formatted_code: str,
@@ -172,9 +172,203 @@ def check_comment_persistence(
     comments_after_formatting = gather_comments(
         formatted_code, formatted_code_comment_parse_tree
     )
-    for original_comment in original_comments:
+    comment_pieces_after_formatting = _CommentPieces(comments_after_formatting)
+    missing_comments = [
+        original_comment
+        for original_comment in original_comments
+        if original_comment not in comment_pieces_after_formatting
+    ]
+    # fallback for comments which were merged/split in an unforeseen way
+    missing_comments = [
+        missing_comment
+        for missing_comment in missing_comments
         if not any(
-            original_comment in comment_after_formatting
+            missing_comment in comment_after_formatting
             for comment_after_formatting in comments_after_formatting
-        ):
-            raise CommentPersistenceViolation(original_comment)
+        )
+    ]
+    if len(missing_comments) > 0:
+        raise CommentPersistenceViolation(missing_comments[0], missing_comments)
+
+
+# pylint: disable-next=too-few-public-methods
+class _CommentPieces:
+    """Index of the pieces the comments consist of - a piece begins with '#'
+    which is not preceded by anything but whitespace. A comment is contained
+    if it consists of consecutive pieces of any indexed comment e.g. when multiple
+    inline comments land on the same line"""
+
+    def __init__(self, comments: List[str]):
+        self._comments = comments
+        self._first_pieces: Dict[str, List[Tuple[int, int]]] = {}
+        self._piece_ends: Set[Tuple[int, int]] = set()
+        for comment_no, comment in enumerate(comments):
+            for begin, end in _comment_piece_spans(comment):
+                self._first_pieces.setdefault(comment[begin:end], []).append(
+                    (comment_no, begin)
+                )
+                self._piece_ends.add((comment_no, end))
+
+    def __contains__(self, comment: str) -> bool:
+        spans = _comment_piece_spans(comment)
+        if len(spans) == 0 or spans[0][0] != 0:
+            return False
+        first_piece = comment[: spans[0][1]]
+        return any(
+            self._comments[comment_no].startswith(comment, begin)
+            and (comment_no, begin + len(comment)) in self._piece_ends
+            for comment_no, begin in self._first_pieces.get(first_piece, [])
+        )
+
+
+def _comment_piece_spans(comment: str) -> List[Tuple[int, int]]:
+    piece_begins = [m.start() for m in _MERGED_COMMENT_BEGIN_REGEX.finditer(comment)]
+    return [
+        (begin, len(comment[begin:end].rstrip()) + begin)
+        for begin, end in zip(piece_begins, piece_begins[1:] + [len(comment)])
+    ]
+
+
+_RULES_RENAMED_BY_LOOSENING = {
+    "asless_{}".format(rule): rule
+    for rule in [
+        "comparison",
+        "and_test",
+        "or_test",
+        "bitw_or",
+        "bitw_xor",
+        "bitw_and",
+        "shift_expr",
+        "type_test",
+        "content_test",
+        "test_expr",
+        "arith_expr",
+        "mdr_expr",
+        "pow_expr",
+    ]
+}
+
+
+def _loosen_node(node: Node) -> Tuple[Hashable, List[Node]]:
+    """Returns label and children of the node as if it was transformed
+    by the LoosenTreeTransformer, without building any intermediate tree"""
+    if isinstance(node, Token):
+        return ("token", node.type, node.value), []
+    children = node.children
+    if node.data in ["par_expr", "par_pattern"] and len(children) > 0:
+        return _loosen_node(children[0])
+    if node.data in ["string", "rstring"]:
+        return ("str", expression_to_str(children[0])), []
+    if node.data == "asless_actual_neg_expr":
+        operand_label, _ = _loosen_node(children[1])
+        if operand_label[0] == "token" and operand_label[1] == "NUMBER":  # type: ignore
+            return ("token", "NUMBER", f"-{operand_label[2]}"), []  # type: ignore
+    if node.data in ["start", "class_def"]:
+        children = [
+            child
+            for child in children
+            if not isinstance(child, Tree)
+            or child.data not in ["annotation", "property_body_def"]
+        ]
+    elif node.data == "signal_stmt":
+        if len(children) > 1 and len(children[1].children) == 0:
+            children = children[:-1]
+    elif node.data == "inline_property_body":
+        children = []
+    return ("tree", _RULES_RENAMED_BY_LOOSENING.get(node.data, node.data)), children
+
+
+def _hash_loosened_subtree(node: Node, subtree_hashes: Dict[int, int]) -> int:
+    node_hash = subtree_hashes.get(id(node))
+    if node_hash is None:
+        label, children = _loosen_node(node)
+        node_hash = hash(
+            (label, tuple(_hash_loosened_subtree(c, subtree_hashes) for c in children))
+        )
+        subtree_hashes[id(node)] = node_hash
+    return node_hash
+
+
+def _find_mismatching_subtrees(
+    given_nodes: List[Node],
+    formatted_nodes: List[Node],
+    subtree_hashes: Dict[int, int],
+) -> List[Tuple[List[Node], List[Node]]]:
+    """Compares sequences of sibling subtrees using their hashes and descends
+    only into the mismatching ones to find the smallest differing subtrees"""
+    given_hashes = [_hash_loosened_subtree(n, subtree_hashes) for n in given_nodes]
+    formatted_hashes = [
+        _hash_loosened_subtree(n, subtree_hashes) for n in formatted_nodes
+    ]
+    if given_hashes == formatted_hashes:
+        return []
+    mismatches = []
+    sequence_matcher = difflib.SequenceMatcher(
+        None, given_hashes, formatted_hashes, autojunk=False
+    )
+    for tag, i1, i2, j1, j2 in sequence_matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            for given_node, formatted_node in zip(
+                given_nodes[i1:i2], formatted_nodes[j1:j2]
+            ):
+                mismatches += _find_mismatching_subtree(
+                    given_node, formatted_node, subtree_hashes
+                )
+        else:
+            mismatches.append((given_nodes[i1:i2], formatted_nodes[j1:j2]))
+    return mismatches
+
+
+def _find_mismatching_subtree(
+    given_node: Node, formatted_node: Node, subtree_hashes: Dict[int, int]
+) -> List[Tuple[List[Node], List[Node]]]:
+    given_label, given_children = _loosen_node(given_node)
+    formatted_label, formatted_children = _loosen_node(formatted_node)
+    if given_label != formatted_label or given_label[0] != "tree":  # type: ignore
+        return [([given_node], [formatted_node])]
+    return _find_mismatching_subtrees(
+        given_children, formatted_children, subtree_hashes
+    )
+
+
+def _mismatching_subtrees_to_diff(
+    given_nodes: List[Node], formatted_nodes: List[Node]
+) -> str:
+    return "\n".join(
+        difflib.unified_diff(
+            _loosened_subtrees_to_str(given_nodes).splitlines(),
+            _loosened_subtrees_to_str(formatted_nodes).splitlines(),
+            "given code{}".format(_line_info(given_nodes)),
+            "formatted code{}".format(_line_info(formatted_nodes)),
+            lineterm="",
+        )
+    )
+
+
+def _loosened_subtrees_to_str(nodes: List[Node]) -> str:
+    loosen_tree_transformer = LoosenTreeTransformer()
+    strings = []
+    for node in nodes:
+        loosened_node = (
+            loosen_tree_transformer.transform(node) if isinstance(node, Tree) else node
+        )
+        strings.append(
+            loosened_node.pretty()
+            if isinstance(loosened_node, Tree)
+            else "{}\n".format(loosened_node)
+        )
+    return "".join(strings)
+
+
+def _line_info(nodes: List[Node]) -> str:
+    if len(nodes) == 0:
+        return ""
+    first_node = nodes[0]
+    line = (
+        getattr(first_node.meta, "line", None)
+        if isinstance(first_node, Tree)
+        else first_node.line
+    )
+    return "" if line is None else " (line {})".format(line)
@@ -17,18 +17,15 @@ Examples:
   gd2py ./addons/gut/gut.gd | radon cc -s -
 """
 import sys
-from importlib.metadata import version as pkg_version
 
 from docopt import docopt
 
 from . import convert_code
+from ..common.version import ToolVersion
 
 
 def main():
     sys.stdout.reconfigure(encoding="utf-8")
-    arguments = docopt(
-        __doc__,
-        version="gd2py {}".format(pkg_version("gdtoolkit")),
-    )
+    arguments = docopt(__doc__, version=ToolVersion("gd2py"))
     with open(arguments["<path>"], "r", encoding="utf-8") as handle:
         print(convert_code(handle.read()))
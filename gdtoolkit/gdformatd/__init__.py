@@ -0,0 +1,224 @@
+import json
+import os
+import stat
+import socketserver
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Mapping, Optional, Tuple, cast
+from urllib.parse import unquote
+
+import lark
+
+from ..common.config import load_config
+from ..common.exceptions import (
+    lark_unexpected_token_to_str,
+    lark_unexpected_input_to_str,
+)
+from ..formatter import format_code, check_formatting_safety, DEFAULT_CONFIG
+from ..parser import parser
+
+PROTOCOL_VERSION = "1"
+PROTOCOL_VERSION_HEADER = "X-Protocol-Version"
+LINE_LENGTH_HEADER = "X-Line-Length"
+USE_SPACES_HEADER = "X-Use-Spaces"
+SAFETY_CHECKS_HEADER = "X-Safety-Checks"
+CONFIG_DIRECTORY_HEADER = "X-Config-Directory"
+CONFIG_FILE_NAME = "gdformatrc"
+
+DEFAULT_LINE_LENGTH = cast(int, DEFAULT_CONFIG["line_length"])
+
+Response = Tuple[int, str]
+
+
+def format_request(
+    code: str,
+    line_length: int,
+    spaces_for_indent: Optional[int],
+    safety_checks: bool,
+) -> Response:
+    """Formats the code and returns HTTP status along with response body which is
+    either formatted code or JSON-encoded error"""
+    try:
+        parse_tree, comment_parse_tree = parser.parse_with_comments(code)
+    except lark.exceptions.UnexpectedToken as exception:
+        return _error_response(
+            HTTPStatus.BAD_REQUEST,
+            "UnexpectedToken",
+            lark_unexpected_token_to_str(exception, code),
+            exception.line,
+            exception.column,
+        )
+    except lark.exceptions.UnexpectedInput as exception:
+        return _error_response(
+            HTTPStatus.BAD_REQUEST,
+            "UnexpectedInput",
+            lark_unexpected_input_to_str(exception),
+            exception.line,
+            exception.column,
+        )
+    except lark.indenter.DedentError as exception:
+        return _error_response(HTTPStatus.BAD_REQUEST, "DedentError", str(exception))
+    try:
+        formatted_code = format_code(
+            gdscript_code=code,
+            max_line_length=line_length,
+            spaces_for_indent=spaces_for_indent,
+            parse_tree=parse_tree,
+            comment_parse_tree=comment_parse_tree,
+        )
+        if formatted_code == code:
+            return HTTPStatus.NO_CONTENT, ""
+        if safety_checks:
+            check_formatting_safety(
+                code,
+                formatted_code,
+                max_line_length=line_length,
+                spaces_for_indent=spaces_for_indent,
+                given_code_parse_tree=parse_tree,
+                given_code_comment_parse_tree=comment_parse_tree,
+            )
+    except Exception as exception:  # pylint: disable=broad-exception-caught
+        # any failure is reported to the client instead of dropping the connection
+        return _error_response(
+            HTTPStatus.INTERNAL_SERVER_ERROR, type(exception).__name__, str(exception)
+        )
+    return HTTPStatus.OK, formatted_code
+
+
+def create_executor(jobs: int) -> Executor:
+    """Creates a pool of worker processes with parsers ready to use"""
+    return ProcessPoolExecutor(max_workers=jobs, initializer=_warm_up)
+
+
+def create_server(
+    executor: Executor,
+    host: str = "localhost",
+    port: int = 0,
+    unix_socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """Creates HTTP server which listens either on TCP port or on Unix socket
+    and delegates formatting to the executor. Both process pools (see
+    create_executor) and thread pools are supported as formatting functions
+    can be called from many threads at once. A stale Unix socket is replaced,
+    but any other file existing at given path is left intact and FileExistsError
+    is raised."""
+    request_handler = partial(_RequestHandler, executor=executor)
+    if unix_socket_path is not None:
+        if os.path.lexists(unix_socket_path):
+            if not stat.S_ISSOCK(os.lstat(unix_socket_path).st_mode):
+                raise FileExistsError(
+                    "Cannot listen on {!r} as it exists and is not a socket".format(
+                        unix_socket_path
+                    )
+                )
+            os.remove(unix_socket_path)
+        return _ThreadingUnixHTTPServer(unix_socket_path, request_handler)
+    return ThreadingHTTPServer((host, port), request_handler)
+
+
+class _ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "gdformatd"
+
+    def __init__(self, *args, executor: Executor, **kwargs):
+        self.executor = executor
+        super().__init__(*args, **kwargs)
+
+    # pylint: disable-next=invalid-name
+    def do_POST(self) -> None:
+        protocol_version = self.headers.get(PROTOCOL_VERSION_HEADER, PROTOCOL_VERSION)
+        if protocol_version != PROTOCOL_VERSION:
+            self._respond(
+                *_error_response(
+                    HTTPStatus.NOT_IMPLEMENTED,
+                    "UnsupportedProtocolVersion",
+                    "Unsupported protocol version: {}".format(protocol_version),
+                )
+            )
+            return
+        try:
+            config = self._load_config()
+            line_length = int(
+                self.headers.get(LINE_LENGTH_HEADER, str(config["line_length"]))
+            )
+            use_spaces = self.headers.get(USE_SPACES_HEADER)
+            spaces_for_indent = int(use_spaces) if use_spaces else config["use_spaces"]
+            safety_checks = (
+                self.headers[SAFETY_CHECKS_HEADER] not in ["0", ""]
+                if SAFETY_CHECKS_HEADER in self.headers
+                else bool(config["safety_checks"])
+            )
+            content_length = int(self.headers.get("Content-Length", 0))
+            code = self.rfile.read(content_length).decode("utf-8")
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            # e.g. invalid header value or config file
+            self._respond(
+                *_error_response(
+                    HTTPStatus.BAD_REQUEST, "InvalidRequest", str(exception)
+                )
+            )
+            return
+        try:
+            response = self.executor.submit(
+                format_request, code, line_length, spaces_for_indent, safety_checks
+            ).result()
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            # e.g. worker process terminated abruptly
+            response = _error_response(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                type(exception).__name__,
+                str(exception),
+            )
+        self._respond(*response)
+
+    def _load_config(self) -> Mapping:
+        # settings are looked up the way gdformat run in given directory does
+        config_directory = self.headers.get(CONFIG_DIRECTORY_HEADER)
+        if not config_directory:
+            return DEFAULT_CONFIG
+        return load_config(CONFIG_FILE_NAME, DEFAULT_CONFIG, unquote(config_directory))
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address
+        if isinstance(self.client_address, str):
+            return self.client_address or "unix-socket"
+        return super().address_string()
+
+    def _respond(self, status: int, body: str) -> None:
+        encoded_body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header(
+            "Content-Type",
+            (
+                "application/json"
+                if status >= HTTPStatus.BAD_REQUEST
+                else "text/plain; charset=utf-8"
+            ),
+        )
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _error_response(
+    status: int,
+    error: str,
+    message: str,
+    line: Optional[int] = None,
+    column: Optional[int] = None,
+) -> Response:
+    return status, json.dumps(
+        {"error": error, "message": message, "line": line, "column": column}
+    )
+
+
+def _warm_up() -> None:
+    format_request("pass\n", DEFAULT_LINE_LENGTH, None, True)
@@ -0,0 +1,75 @@
+"""GDScript formatter daemon
+
+HTTP server which keeps gdformat warm and formats code sent by editors
+or other tools, avoiding interpreter and parser startup on every request.
+
+The code to be formatted shall be sent as a body of POST request.
+The following request headers are supported:
+  X-Line-Length       How many characters per line to allow.
+  X-Use-Spaces        Use given number of spaces for indent instead of tabs.
+  X-Safety-Checks     Run safety checks if set to 1.
+  X-Config-Directory  Percent-encoded directory to look 'gdformatrc' up from,
+                      the way gdformat run in that directory does. Settings
+                      given in the other headers take precedence.
+  X-Protocol-Version  Protocol version, currently 1.
+The response status is:
+  200  Code was reformatted, the body contains formatted code.
+  204  Code is already formatted.
+  400  Code or request is invalid, the body contains JSON-encoded error.
+  500  Code cannot be formatted, the body contains JSON-encoded error.
+
+Usage:
+  gdformatd [options]
+
+Options:
+  --bind-host=<host>         Address to listen on [default: localhost].
+  --bind-port=<port>         Port to listen on [default: 45484].
+  --bind-unix-socket=<path>  Listen on given Unix socket instead of TCP port.
+  -j --jobs=<int>            How many requests to format in parallel
+                             (defaults to the number of CPUs).
+  -h --help                  Show this screen.
+  --version                  Show version.
+
+Examples:
+  gdformatd --bind-port=45484 &
+  curl -s --data-binary @script.gd -H 'X-Line-Length: 80' localhost:45484
+"""
+import sys
+
+from docopt import docopt
+
+from gdtoolkit.common.parallel import parse_jobs_num
+from gdtoolkit.common.version import ToolVersion
+from gdtoolkit.gdformatd import create_executor, create_server
+
+
+def main():
+    arguments = docopt(__doc__, version=ToolVersion("gdformatd"))
+    with create_executor(parse_jobs_num(arguments["--jobs"])) as executor:
+        try:
+            server = create_server(
+                executor,
+                host=arguments["--bind-host"],
+                port=int(arguments["--bind-port"]),
+                unix_socket_path=arguments["--bind-unix-socket"],
+            )
+        except OSError as exception:
+            print(exception, file=sys.stderr)
+            sys.exit(1)
+        print(
+            "gdformatd listening on {}".format(
+                arguments["--bind-unix-socket"]
+                or "http://{}:{}/".format(*server.server_address[:2])  # type: ignore
+            ),
+            file=sys.stderr,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
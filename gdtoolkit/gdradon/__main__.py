@@ -14,25 +14,22 @@ Examples:
 """
 import sys
 from typing import List
-from importlib.metadata import version as pkg_version
 
 from docopt import docopt
-from radon.complexity import cc_rank, cc_visit
-from radon.visitors import Function
-from radon.cli.colors import LETTERS_COLORS, RANKS_COLORS, RESET
 
-from gdtoolkit.common.utils import find_gd_files_from_paths
-from gdtoolkit.gd2py import convert_code
+from gdtoolkit.common.version import ToolVersion
 
 Path = str
 
 
 def main():
     sys.stdout.reconfigure(encoding="utf-8")
-    arguments = docopt(
-        __doc__,
-        version="gdradon {}".format(pkg_version("gdtoolkit")),
-    )
+    arguments = docopt(__doc__, version=ToolVersion("gdradon"))
+
+    # radon and the parser (lark) are imported only once arguments are parsed
+    # so that e.g. '--help' and '--version' are instant
+    # pylint: disable-next=import-outside-toplevel
+    from gdtoolkit.common.utils import find_gd_files_from_paths
 
     files: List[Path] = find_gd_files_from_paths(arguments["<path>"])
     for file_path in files:
@@ -40,6 +37,13 @@ def main():
 
 
 def _cc(file_path: str) -> None:
+    # pylint: disable=import-outside-toplevel
+    from radon.complexity import cc_rank, cc_visit
+    from radon.visitors import Function
+    from radon.cli.colors import LETTERS_COLORS, RANKS_COLORS, RESET
+
+    from gdtoolkit.gd2py import convert_code
+
     try:
         with open(file_path, "r", encoding="utf-8") as handle:
             python_code = convert_code(handle.read())
@@ -1,11 +1,14 @@
 import re
+from bisect import bisect_left
 from collections import defaultdict
 from types import MappingProxyType
-from typing import List, Dict, Set
+from typing import List, Dict, Optional
 
 from .problem import Problem
-from ..parser import parser
+from ..common.parsed_file import ParsedFile
 from .types import Range
+from .range_index import RangeIndex
+from .registry import CheckRegistry
 from . import (
     basic_checks,
     class_checks,
@@ -21,6 +24,10 @@ PRIVATE_SNAKE_CASE = r"_?{}".format(SNAKE_CASE)
 UPPER_SNAKE_CASE = r"[A-Z][A-Z0-9]*(_[A-Z0-9]+)*"
 PRIVATE_UPPER_SNAKE_CASE = f"_?{UPPER_SNAKE_CASE}"
 
+DIRECTIVE_REGEX = re.compile(
+    r"#\s*gdlint\s*:\s*(ignore|disable|enable)\s*=\s*([^,]+(,[^,]+)*)"
+)
+
 DEFAULT_CONFIG = MappingProxyType(
     {
         # check control
@@ -114,16 +121,26 @@ DEFAULT_CONFIG = MappingProxyType(
 def lint_code(
     gdscript_code: str, config: MappingProxyType = DEFAULT_CONFIG
 ) -> List[Problem]:
-    parse_tree = parser.parse(gdscript_code, gather_metadata=True)
-    problems = design_checks.lint(parse_tree, config)
-    problems += format_checks.lint(gdscript_code, config)
-    problems += name_checks.lint(parse_tree, config)
-    problems += class_checks.lint(parse_tree, config)
-    problems += basic_checks.lint(parse_tree, config)
-    problems += misc_checks.lint(parse_tree, config)
+    return lint_parsed_file(ParsedFile(gdscript_code), config)
+
+
+def lint_parsed_file(
+    parsed_file: ParsedFile, config: MappingProxyType = DEFAULT_CONFIG
+) -> List[Problem]:
+    """Lints the code which has already been parsed e.g. by another tool"""
+    registry = CheckRegistry(config)
+    design_checks.register(registry, config)
+    format_checks.register(registry, config)
+    name_checks.register(registry, config)
+    class_checks.register(registry, config)
+    basic_checks.register(registry, config)
+    misc_checks.register(registry, config)
+    problems = registry.run(parsed_file)
+    if len(problems) == 0:
+        return problems
 
     problems_to_lines_where_they_are_inactive = _fetch_problem_inactivity_lines(
-        gdscript_code
+        parsed_file
     )
     problems = [
         problem
@@ -135,82 +152,56 @@ def lint_code(
     return problems
 
 
-def _fetch_problem_inactivity_lines(gdscript_code: str) -> Dict[str, Set[int]]:
-    problem_inactivity_lines = defaultdict(set)
-    lines_to_ignored_problems = _fetch_ignored_problems_per_lines(gdscript_code)
-    for line, problems in lines_to_ignored_problems.items():
-        for problem in problems:
-            problem_inactivity_lines[problem].add(line)
-            problem_inactivity_lines[problem].add(line + 1)
-    problem_inactivity_ranges = _fetch_problem_inactivity_ranges(gdscript_code)
-    # TODO: use interval trees if to speed up
-    for problem, inactivity_ranges in problem_inactivity_ranges.items():
-        for a_range in inactivity_ranges:
-            problem_inactivity_lines[problem].update(
-                range(a_range.begin, a_range.end + 1)
-            )
-    return problem_inactivity_lines
-
-
-def _fetch_ignored_problems_per_lines(gdscript_code: str) -> Dict[int, Set[str]]:
-    lines = gdscript_code.splitlines()
-    compiled_regex = re.compile(r"#\s*gdlint\s*:\s*ignore\s*=\s*([^,]+(,[^,]+)*)")
-    lines_to_ignored_problems: Dict[int, Set[str]] = defaultdict(set)
-    for line_no, line in enumerate(lines, start=1):
-        pattern_matching_outcome = compiled_regex.search(line)
-        if pattern_matching_outcome is not None:
-            ignored_problems = [
-                p.strip() for p in pattern_matching_outcome.group(1).split(",")
-            ]
-            lines_to_ignored_problems[line_no].update(ignored_problems)
-    return lines_to_ignored_problems
+def _fetch_problem_inactivity_lines(parsed_file: ParsedFile) -> Dict[str, RangeIndex]:
+    directives = _fetch_directives(parsed_file)
+    problem_inactivity_ranges = _fetch_problem_inactivity_ranges(
+        directives["disable"], directives["enable"], len(parsed_file.lines)
+    )
+    for problem, ignoring_lines in directives["ignore"].items():
+        for line in ignoring_lines:
+            problem_inactivity_ranges[problem].append(Range(line, line + 1))
+    return {
+        problem: RangeIndex(inactivity_ranges)
+        for problem, inactivity_ranges in problem_inactivity_ranges.items()
+    }
 
 
-def _fetch_problem_inactivity_ranges(gdscript_code: str) -> Dict[str, List[Range]]:
+def _fetch_directives(parsed_file: ParsedFile) -> Dict[str, Dict[str, List[int]]]:
+    """Scans comments for 'gdlint: <directive>=<problems>' directives and returns
+    lines they affect per problem per directive.
+    'disable' placed after a statement affects lines starting from the next one"""
+    directives: Dict[str, Dict[str, List[int]]] = {
+        directive: defaultdict(list) for directive in ["ignore", "disable", "enable"]
+    }
+    for comment in parsed_file.comment_parse_tree.children:
+        pattern_matching_outcome = DIRECTIVE_REGEX.search(comment.value)
+        if pattern_matching_outcome is None:
+            continue
+        directive = pattern_matching_outcome.group(1)
+        line = comment.line
+        if directive == "disable":
+            line_prefix = parsed_file.lines[comment.line - 1][: comment.column - 1]
+            line += 1 if line_prefix.strip() != "" else 0
+        for problem in pattern_matching_outcome.group(2).split(","):
+            directives[directive][problem.strip()].append(line)
+    return directives
+
+
+def _fetch_problem_inactivity_ranges(
+    problem_range_begins: Dict[str, List[int]],
+    problem_range_ends: Dict[str, List[int]],
+    last_line_no: int,
+) -> Dict[str, List[Range]]:
     problem_inactivity_ranges = defaultdict(list)
-    lines = gdscript_code.splitlines()
-    last_line_no = len(lines)
-
-    problem_range_begins = _fetch_problem_disabling_lines(lines)
     for problem, range_begins in problem_range_begins.items():
+        range_ends = sorted(problem_range_ends.get(problem, []))
         for range_begin in range_begins:
-            problem_inactivity_ranges[problem].append(Range(range_begin, last_line_no))
-
-    problem_range_ends = _fetch_problem_enabling_lines(lines)
-    for problem, range_ends in problem_range_ends.items():
-        for range_end in range_ends:
-            for a_range in problem_inactivity_ranges[problem]:
-                a_range.end = min(a_range.end, range_end)
-
+            # range lasts until the first enabling line following it
+            range_end_index = bisect_left(range_ends, range_begin)
+            range_end = (
+                range_ends[range_end_index]
+                if range_end_index < len(range_ends)
+                else last_line_no
+            )
+            problem_inactivity_ranges[problem].append(Range(range_begin, range_end))
     return problem_inactivity_ranges
-
-
-def _fetch_problem_disabling_lines(lines: List[str]) -> Dict[str, List[int]]:
-    compiled_regex = re.compile(r"#\s*gdlint\s*:\s*disable\s*=\s*([^,]+(,[^,]+)*)")
-    problem_to_disabling_lines = defaultdict(list)
-    for line_no, line in enumerate(lines, start=1):
-        pattern_matching_outcome = compiled_regex.search(line)
-        if pattern_matching_outcome is not None:
-            ignored_problems = [
-                p.strip() for p in pattern_matching_outcome.group(1).split(",")
-            ]
-            for problem in ignored_problems:
-                disable_from_next_line = not line.strip().startswith("#")
-                problem_to_disabling_lines[problem].append(
-                    line_no + (1 if disable_from_next_line else 0)
-                )
-    return problem_to_disabling_lines
-
-
-def _fetch_problem_enabling_lines(lines: List[str]) -> Dict[str, List[int]]:
-    compiled_regex = re.compile(r"#\s*gdlint\s*:\s*enable\s*=\s*([^,]+(,[^,]+)*)")
-    problem_to_enabling_lines = defaultdict(list)
-    for line_no, line in enumerate(lines, start=1):
-        pattern_matching_outcome = compiled_regex.search(line)
-        if pattern_matching_outcome is not None:
-            ignored_problems = [
-                p.strip() for p in pattern_matching_outcome.group(1).split(",")
-            ]
-            for problem in ignored_problems:
-                problem_to_enabling_lines[problem].append(line_no)
-    return problem_to_enabling_lines
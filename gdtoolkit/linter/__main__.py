@@ -11,29 +11,38 @@ Usage:
 Options:
   -d --dump-default-config   Dump default config to 'gdlintrc' file
   -v --verbose               Show extra prints
+  -j --jobs=<int>            How many files to lint in parallel
+                             (defaults to the number of CPUs).
+  --no-cache                 Don't use the cache of linting results.
   -h --help                  Show this screen.
   --version                  Show version.
 """
 import sys
 import os
+import json
 import logging
-import pathlib
-from typing import List, Optional
+from functools import partial
+from dataclasses import asdict
+from typing import TYPE_CHECKING, List, Optional
 from types import MappingProxyType
-from importlib.metadata import version as pkg_version
 
 import lark
-import yaml
 from docopt import docopt
 
 from gdtoolkit.linter import lint_code, DEFAULT_CONFIG
+from gdtoolkit.linter.problem import Problem
 from gdtoolkit.linter.problem_printer import print_problem
 from gdtoolkit.common.exceptions import (
     lark_unexpected_token_to_str,
     lark_unexpected_input_to_str,
 )
+from gdtoolkit.common.config import load_config
 from gdtoolkit.common.utils import find_gd_files_from_paths
+from gdtoolkit.common.parallel import map_files, parse_jobs_num
+from gdtoolkit.common.version import ToolVersion
 
+if TYPE_CHECKING:
+    from gdtoolkit.common.cache import ResultCache
 
 Path = str
 
@@ -41,10 +50,7 @@ CONFIG_FILE_NAME = "gdlintrc"
 
 
 def main():
-    arguments = docopt(
-        __doc__,
-        version="gdlint {}".format(pkg_version("gdtoolkit")),
-    )
+    arguments = docopt(__doc__, version=ToolVersion("gdlint"))
 
     if arguments["--verbose"]:
         logging.basicConfig(stream=sys.stdout, level=logging.INFO)
@@ -52,18 +58,21 @@ def main():
     if arguments["--dump-default-config"]:
         _dump_default_config()
 
-    config_file_path = _find_config_file()
-    config = _load_config_file_or_default(config_file_path)
-    _log_config_entries(config)
-    _update_config_with_missing_entries_inplace(config)
-
-    problems_total = 0
+    config = load_config(CONFIG_FILE_NAME, DEFAULT_CONFIG)
 
     files: List[Path] = find_gd_files_from_paths(
         arguments["<path>"], excluded_directories=set(config["excluded_directories"])
     )
-    for file_path in files:
-        problems_total += _lint_file(file_path, config)
+    cache = _create_cache(config) if not arguments["--no-cache"] else None
+    problems_total = sum(
+        map_files(
+            partial(_lint_file, config=dict(config), cache=cache),
+            files,
+            parse_jobs_num(arguments["--jobs"]),
+        )
+    )
+    if cache is not None:
+        cache.prune()
 
     if problems_total > 0:
         print(
@@ -77,61 +86,32 @@ def main():
     print("Success: no problems found")
 
 
+def _create_cache(config: dict) -> "ResultCache":
+    # the cache (keyed by gdtoolkit version) imports importlib.metadata
+    # pylint: disable-next=import-outside-toplevel
+    from gdtoolkit.common.cache import ResultCache
+
+    return ResultCache("gdlint", config)
+
+
 def _dump_default_config() -> None:
     # TODO: error handling
+    # pylint: disable-next=import-outside-toplevel
+    import yaml
+
     assert not os.path.isfile(CONFIG_FILE_NAME)
     with open(CONFIG_FILE_NAME, "w", encoding="utf-8") as handle:
         handle.write(yaml.dump(DEFAULT_CONFIG.copy()))
     sys.exit(0)
 
 
-def _find_config_file() -> Optional[str]:
-    search_dir = pathlib.Path(os.getcwd())
-    config_file_path = None
-    while search_dir != pathlib.Path(os.path.abspath(os.sep)):
-        file_path = os.path.join(search_dir, CONFIG_FILE_NAME)
-        if os.path.isfile(file_path):
-            config_file_path = file_path
-            break
-        file_path = os.path.join(search_dir, ".{}".format(CONFIG_FILE_NAME))
-        if os.path.isfile(file_path):
-            config_file_path = file_path
-            break
-        search_dir = search_dir.parent
-    return config_file_path
-
-
-def _load_config_file_or_default(config_file_path: Optional[str]) -> MappingProxyType:
-    # TODO: error handling
-    if config_file_path is not None:
-        logging.info("Config file found: '%s'", config_file_path)
-        with open(config_file_path, "r", encoding="utf-8") as handle:
-            return yaml.load(handle.read(), Loader=yaml.Loader)
-
-    logging.info("""No 'gdlintrc' nor '.gdlintrc' found. Using default config...""")
-    return DEFAULT_CONFIG
-
-
-def _log_config_entries(config: MappingProxyType) -> None:
-    logging.info("Loaded config:")
-    for entry in config.items():
-        logging.info(entry)
-
-
-def _update_config_with_missing_entries_inplace(config: dict) -> None:
-    for key in DEFAULT_CONFIG:
-        if key not in config:
-            logging.info(
-                "Adding missing entry from defaults: %s", (key, DEFAULT_CONFIG[key])
-            )
-            config[key] = DEFAULT_CONFIG[key]
-
-
-def _lint_file(file_path: str, config: MappingProxyType) -> int:
+def _lint_file(
+    file_path: str, config: MappingProxyType, cache: Optional["ResultCache"] = None
+) -> int:
     try:
         with open(file_path, "r", encoding="utf-8") as handle:
             content = handle.read()
-            problems = lint_code(content, config)
+            problems = _lint_code(content, config, cache)
             if len(problems) > 0:  # TODO: friendly frontend like in halint
                 for problem in problems:
                     print_problem(problem, file_path)
@@ -168,5 +148,18 @@ def _lint_file(file_path: str, config: MappingProxyType) -> int:
         return 1
 
 
+def _lint_code(
+    content: str, config: MappingProxyType, cache: Optional["ResultCache"]
+) -> List[Problem]:
+    if cache is None:
+        return lint_code(content, config)
+    cached_problems = cache.get(content)
+    if cached_problems is not None:
+        return [Problem(**problem) for problem in json.loads(cached_problems)]
+    problems = lint_code(content, config)
+    cache.put(content, json.dumps([asdict(problem) for problem in problems]))
+    return problems
+
+
 if __name__ == "__main__":
     main()
@@ -9,22 +9,18 @@ from ..common.utils import find_name_token_among_children, get_line, get_column
 
 from .problem import Problem
 from .helpers import is_function_public
+from .registry import CheckRegistry
 
 
-def lint(parse_tree: Tree, config: MappingProxyType) -> List[Problem]:
-    disable = config["disable"]
-    checks_to_run_w_ast = [
+def register(registry: CheckRegistry, config: MappingProxyType) -> None:
+    checks_to_register = [
         (
             "class-definitions-order",
             partial(_class_definitions_order_check, config["class-definitions-order"]),
         ),
     ]
-    ast = AbstractSyntaxTree(parse_tree)
-    problem_clusters = (
-        function(ast) if name not in disable else []
-        for name, function in checks_to_run_w_ast
-    )
-    return [problem for cluster in problem_clusters for problem in cluster]
+    for name, check in checks_to_register:
+        registry.register_ast_check(name, check)
 
 
 def _class_definitions_order_check(
@@ -2,18 +2,16 @@ from functools import partial
 from types import MappingProxyType
 from typing import List
 
-from lark import Tree
-
 from ..common.utils import get_line, get_column
 from ..common.ast import AbstractSyntaxTree
 
 from .problem import Problem
 from .helpers import is_function_public
+from .registry import CheckRegistry
 
 
-def lint(parse_tree: Tree, config: MappingProxyType) -> List[Problem]:
-    disable = config["disable"]
-    checks_to_run_w_ast = [
+def register(registry: CheckRegistry, config: MappingProxyType) -> None:
+    checks_to_register = [
         (
             "max-public-methods",
             partial(_max_public_methods_check, config["max-public-methods"]),
@@ -27,12 +25,8 @@ def lint(parse_tree: Tree, config: MappingProxyType) -> List[Problem]:
             partial(_function_args_num_check, config["function-arguments-number"]),
         ),
     ]
-    ast = AbstractSyntaxTree(parse_tree)
-    problem_clusters = (
-        x[1](ast) if x[0] not in disable else [] for x in checks_to_run_w_ast
-    )
-    problems = [problem for cluster in problem_clusters for problem in cluster]
-    return problems
+    for name, check in checks_to_register:
+        registry.register_ast_check(name, check)
 
 
 def _function_args_num_check(threshold: int, ast: AbstractSyntaxTree) -> List[Problem]:
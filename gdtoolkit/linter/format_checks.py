@@ -4,11 +4,11 @@ from types import MappingProxyType
 from typing import Callable, List, Tuple
 
 from .problem import Problem
+from .registry import CheckRegistry
 
 
-def lint(gdscript_code: str, config: MappingProxyType) -> List[Problem]:
-    disable = config["disable"]
-    checks_to_run_w_code = [
+def register(registry: CheckRegistry, config: MappingProxyType) -> None:
+    checks_to_register = [
         (
             "max-line-length",
             partial(
@@ -30,11 +30,8 @@ def lint(gdscript_code: str, config: MappingProxyType) -> List[Problem]:
             _mixed_tabs_and_spaces_check,
         ),
     ]  # type: List[Tuple[str, Callable]]
-    problem_clusters = (
-        x[1](gdscript_code) if x[0] not in disable else [] for x in checks_to_run_w_code
-    )
-    problems = [problem for cluster in problem_clusters for problem in cluster]
-    return problems
+    for name, check in checks_to_register:
+        registry.register_code_check(name, check)
 
 
 def _max_line_length_check(threshold, tab_characters, code: str) -> List[Problem]:
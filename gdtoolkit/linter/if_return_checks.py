@@ -1,4 +1,4 @@
-from typing import List, Optional, Iterator
+from typing import List, Optional
 
 from lark import Tree
 
@@ -6,27 +6,21 @@ from ..common.utils import get_line, get_column
 from .problem import Problem
 
 
-def no_elif_return_check(parse_tree: Tree) -> List[Problem]:
-    problems = []
-    for if_stmt in _find_if_stmts(parse_tree):
-        problems.extend(_check_elif_problems(if_stmt))
-    return problems
+def no_elif_return_check(if_stmt: Tree) -> List[Problem]:
+    return _check_elif_problems(if_stmt)
 
 
-def no_else_return_check(parse_tree: Tree) -> List[Problem]:
+def no_else_return_check(tree: Tree) -> List[Problem]:
+    if_stmts = _find_if_stmts_among_children(tree)
+    if len(if_stmts) == 0:
+        return []
     problems = []
-    trees_with_if_stmts = _find_trees_with_if_stmts(parse_tree)
-    for tree in trees_with_if_stmts:
-        var_names = _find_var_names(tree)
-        for if_stmt in _find_if_stmts_among_children(tree):
-            problems.extend(_check_else_problems(if_stmt, var_names))
+    var_names = _find_var_names(tree)
+    for if_stmt in if_stmts:
+        problems.extend(_check_else_problems(if_stmt, var_names))
     return problems
 
 
-def _find_if_stmts(parse_tree: Tree) -> Iterator[Tree]:
-    return parse_tree.find_pred(_is_if_stmt)
-
-
 def _check_elif_problems(if_stmt: Tree) -> List[Problem]:
     problems = []
     elif_branches = _find_elif_branches_to_remove(if_stmt)
@@ -53,10 +47,6 @@ def _find_elif_branches_to_remove(if_stmt: Tree) -> List[Tree]:
     return elif_branches_to_remove
 
 
-def _find_trees_with_if_stmts(parse_tree: Tree) -> Iterator[Tree]:
-    return parse_tree.find_pred(_has_if_stmt)
-
-
 def _find_var_names(tree: Tree) -> List[str]:
     func_var_stmts = _find_func_var_stmts_among_children(tree)
     return list(map(_find_var_name, func_var_stmts))
@@ -116,10 +106,6 @@ def _has_return_stmt(tree: Tree) -> bool:
     return len(_find_return_stmts_among_children(tree)) > 0
 
 
-def _has_if_stmt(tree: Tree) -> bool:
-    return len(_find_if_stmts_among_children(tree)) > 0
-
-
 def _has_if_stmt_that_always_returns(tree: Tree) -> bool:
     if_stmts = _find_if_stmts_among_children(tree)
     return any(_check_if_if_stmt_always_returns(if_stmt) for if_stmt in if_stmts)
@@ -172,10 +158,6 @@ def _find_stmts_among_children(tree: Tree, suffix: str) -> List[Tree]:
     return stmts
 
 
-def _is_if_stmt(tree: Tree) -> bool:
-    return tree.data == "if_stmt"
-
-
 def _is_elif_branch(if_stmt_branch: Tree) -> bool:
     return if_stmt_branch.data == "elif_branch"
 
@@ -1,26 +1,22 @@
 from types import MappingProxyType
-from typing import List
 
-from lark import Tree
-
-from .problem import Problem
+from .registry import CheckRegistry
 from .if_return_checks import no_elif_return_check, no_else_return_check
 
 
-def lint(parse_tree: Tree, config: MappingProxyType) -> List[Problem]:
-    disable = config["disable"]
-    checks_to_run_w_tree = [
+# pylint: disable-next=unused-argument
+def register(registry: CheckRegistry, config: MappingProxyType) -> None:
+    checks_to_register = [
         (
             "no-elif-return",
             no_elif_return_check,
+            ["if_stmt"],
         ),
         (
             "no-else-return",
             no_else_return_check,
+            None,
         ),
     ]
-    problem_clusters = (
-        x[1](parse_tree) if x[0] not in disable else [] for x in checks_to_run_w_tree
-    )
-    problems = [problem for cluster in problem_clusters for problem in cluster]
-    return problems
+    for name, check, rules in checks_to_register:
+        registry.register_node_check(name, check, rules)
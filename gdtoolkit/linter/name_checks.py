@@ -1,6 +1,6 @@
 import re
 from functools import partial
-from typing import Dict, List
+from typing import Callable, List, Pattern
 from types import MappingProxyType
 
 from lark import Tree
@@ -8,237 +8,143 @@ from lark import Tree
 from ..common.utils import find_name_token_among_children, get_line, get_column
 
 from .problem import Problem
+from .registry import CheckRegistry
 
 
-def lint(parse_tree: Tree, config: MappingProxyType) -> List[Problem]:
-    disable = config["disable"]
-    rule_name_tokens = _gather_rule_name_tokens(
-        parse_tree,
-        [
-            "class_def",
-            "func_def",
-            "classname_stmt",
-            "signal_stmt",
-            "enum_named",
-            "enum_element",
-            "for_stmt",
-            "for_stmt_typed",
-            "func_arg_regular",
-            "func_arg_inf",
-            "func_arg_typed",
-        ],
-    )
-    checks_to_run_wo_tree = [
+def register(registry: CheckRegistry, config: MappingProxyType) -> None:
+    checks_to_register = [
         (
             "function-name",
-            partial(
-                _generic_name_check,
-                config["function-name"],
-                rule_name_tokens["func_def"],
-                "function-name",
-                'Function name "{}" is not valid',
-            ),
+            ["func_def"],
+            _is_any,
+            'Function name "{}" is not valid',
         ),
         (
             "sub-class-name",
-            partial(
-                _generic_name_check,
-                config["sub-class-name"],
-                rule_name_tokens["class_def"],
-                "sub-class-name",
-                'Class name "{}" is not valid',
-            ),
+            ["class_def"],
+            _is_any,
+            'Class name "{}" is not valid',
         ),
         (
             "class-name",
-            partial(
-                _generic_name_check,
-                config["class-name"],
-                rule_name_tokens["classname_stmt"],
-                "class-name",
-                'Class name "{}" is not valid',
-            ),
+            ["classname_stmt"],
+            _is_any,
+            'Class name "{}" is not valid',
         ),
         (
             "signal-name",
-            partial(
-                _generic_name_check,
-                config["signal-name"],
-                rule_name_tokens["signal_stmt"],
-                "signal-name",
-                'Signal name "{}" is not valid',
-            ),
+            ["signal_stmt"],
+            _is_any,
+            'Signal name "{}" is not valid',
         ),
         (
             "enum-name",
-            partial(
-                _generic_name_check,
-                config["enum-name"],
-                rule_name_tokens["enum_named"],
-                "enum-name",
-                'Enum name "{}" is not valid',
-            ),
+            ["enum_named"],
+            _is_any,
+            'Enum name "{}" is not valid',
         ),
         (
             "enum-element-name",
-            partial(
-                _generic_name_check,
-                config["enum-element-name"],
-                rule_name_tokens["enum_element"],
-                "enum-element-name",
-                'Enum element name "{}" is not valid',
-            ),
+            ["enum_element"],
+            _is_any,
+            'Enum element name "{}" is not valid',
         ),
         (
             "loop-variable-name",
-            partial(
-                _generic_name_check,
-                config["loop-variable-name"],
-                rule_name_tokens["for_stmt"] + rule_name_tokens["for_stmt_typed"],
-                "loop-variable-name",
-                'Loop variable name "{}" is not valid',
-            ),
+            ["for_stmt", "for_stmt_typed"],
+            _is_any,
+            'Loop variable name "{}" is not valid',
         ),
         (
             "function-argument-name",
-            partial(
-                _generic_name_check,
-                config["function-argument-name"],
-                rule_name_tokens["func_arg_regular"]
-                + rule_name_tokens["func_arg_inf"]
-                + rule_name_tokens["func_arg_typed"],
-                "function-argument-name",
-                'Function argument name "{}" is not valid',
-            ),
+            ["func_arg_regular", "func_arg_inf", "func_arg_typed"],
+            _is_any,
+            'Function argument name "{}" is not valid',
         ),
         (
             "function-variable-name",
-            partial(
-                _generic_name_check,
-                config["function-variable-name"],
-                _gather_rule_name_tokens(
-                    parse_tree,
-                    ["func_var_stmt"],
-                    lambda x: not _has_load_or_preload_call_expr(x),
-                )["func_var_stmt"],
-                "function-variable-name",
-                'Function-scope variable name "{}" is not valid',
-            ),
+            ["func_var_stmt"],
+            _has_no_load_or_preload_call_expr,
+            'Function-scope variable name "{}" is not valid',
         ),
         (
             "function-preload-variable-name",
-            partial(
-                _generic_name_check,
-                config["function-preload-variable-name"],
-                _gather_rule_name_tokens(
-                    parse_tree,
-                    ["func_var_stmt"],
-                    _has_preload_call_expr,
-                )["func_var_stmt"],
-                "function-preload-variable-name",
-                'Function-scope preload variable name "{}" is not valid',
-            ),
+            ["func_var_stmt"],
+            _has_preload_call_expr,
+            'Function-scope preload variable name "{}" is not valid',
         ),
         (
             "constant-name",
-            partial(
-                _generic_name_check,
-                config["constant-name"],
-                _gather_rule_name_tokens(
-                    parse_tree,
-                    ["const_stmt"],
-                    lambda x: not _has_load_or_preload_call_expr(x),
-                )["const_stmt"],
-                "constant-name",
-                'Constant name "{}" is not valid',
-            ),
+            ["const_stmt"],
+            _has_no_load_or_preload_call_expr,
+            'Constant name "{}" is not valid',
         ),
         (
             "load-constant-name",
-            partial(
-                _generic_name_check,
-                config["load-constant-name"],
-                _gather_rule_name_tokens(
-                    parse_tree,
-                    ["const_stmt"],
-                    _has_load_or_preload_call_expr,
-                )["const_stmt"],
-                "load-constant-name",
-                'Constant (load/preload) name "{}" is not valid',
-            ),
+            ["const_stmt"],
+            _has_load_or_preload_call_expr,
+            'Constant (load/preload) name "{}" is not valid',
         ),
         (
             "class-variable-name",
-            partial(
-                _generic_name_check,
-                config["class-variable-name"],
-                _gather_rule_name_tokens(
-                    parse_tree,
-                    ["class_var_stmt"],
-                    lambda x: not _has_load_or_preload_call_expr(x),
-                )["class_var_stmt"],
-                "class-variable-name",
-                'Class-scope variable name "{}" is not valid',
-            ),
+            ["class_var_stmt"],
+            _has_no_load_or_preload_call_expr,
+            'Class-scope variable name "{}" is not valid',
         ),
         (
             "class-load-variable-name",
+            ["class_var_stmt"],
+            _has_load_or_preload_call_expr,
+            'Class-scope load/preload variable name "{}" is not valid',
+        ),
+    ]
+    for name, rules, predicate, description_template in checks_to_register:
+        registry.register_node_check(
+            name,
             partial(
                 _generic_name_check,
-                config["class-load-variable-name"],
-                _gather_rule_name_tokens(
-                    parse_tree,
-                    ["class_var_stmt"],
-                    _has_load_or_preload_call_expr,
-                )["class_var_stmt"],
-                "class-load-variable-name",
-                'Class-scope load/preload variable name "{}" is not valid',
+                re.compile(config[name]),
+                name,
+                description_template,
+                predicate,
             ),
-        ),
-    ]
-    problem_clusters = (
-        x[1]() if x[0] not in disable else [] for x in checks_to_run_wo_tree
-    )
-    problems = [problem for cluster in problem_clusters for problem in cluster]
-    return problems
+            rules,
+        )
 
 
 def _generic_name_check(
-    name_regex, name_tokens, problem_name, description_template
+    name_regex: Pattern,
+    problem_name: str,
+    description_template: str,
+    predicate: Callable[[Tree], bool],
+    node: Tree,
 ) -> List[Problem]:
-    problems = []
-    name_regex = re.compile(name_regex)
-    for name_token in name_tokens:
-        name = name_token.value
-        if name_regex.fullmatch(name) is None:
-            problems.append(
-                Problem(
-                    name=problem_name,
-                    description=description_template.format(name),
-                    line=get_line(name_token),
-                    column=get_column(name_token),
-                )
-            )
-    return problems
+    name_token = find_name_token_among_children(node)
+    if name_token is None:
+        name_token = find_name_token_among_children(node.children[0])
+        predicate_outcome = predicate(node.children[0])
+    else:
+        predicate_outcome = predicate(node)
+    assert name_token is not None
+    name = name_token.value
+    if not predicate_outcome or name_regex.fullmatch(name) is not None:
+        return []
+    return [
+        Problem(
+            name=problem_name,
+            description=description_template.format(name),
+            line=get_line(name_token),
+            column=get_column(name_token),
+        )
+    ]
+
+
+def _is_any(_tree: Tree) -> bool:
+    return True
 
 
-def _gather_rule_name_tokens(
-    parse_tree: Tree, rules, predicate=lambda _: True
-) -> Dict[str, List[str]]:
-    name_tokens_per_rule = {rule: [] for rule in rules}  # type: Dict[str, List[str]]
-    for node in parse_tree.iter_subtrees():
-        if isinstance(node, Tree) and node.data in rules:
-            rule_name = node.data
-            name_token = find_name_token_among_children(node)
-            if name_token is None:
-                name_token = find_name_token_among_children(node.children[0])
-                predicate_outcome = predicate(node.children[0])
-            else:
-                predicate_outcome = predicate(node)
-            assert name_token is not None
-            if predicate_outcome:
-                name_tokens_per_rule[rule_name].append(name_token)
-    return name_tokens_per_rule
+def _has_no_load_or_preload_call_expr(tree: Tree) -> bool:
+    return not _has_load_or_preload_call_expr(tree)
 
 
 def _has_load_or_preload_call_expr(tree: Tree) -> bool:
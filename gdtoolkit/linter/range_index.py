@@ -0,0 +1,28 @@
+from bisect import bisect_right
+from typing import Iterable, List
+
+from .types import Range
+
+
+# pylint: disable-next=too-few-public-methods
+class RangeIndex:
+    """Set of lines given as inclusive ranges. Overlapping and adjacent ranges
+    are merged upon creation, so checking if a line belongs to the set takes
+    logarithmic time regardless of the ranges lengths.
+    """
+
+    def __init__(self, ranges: Iterable[Range]):
+        self._begins: List[int] = []
+        self._ends: List[int] = []
+        for a_range in sorted(ranges, key=lambda a_range: a_range.begin):
+            if a_range.begin > a_range.end:
+                continue
+            if len(self._ends) > 0 and a_range.begin <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], a_range.end)
+            else:
+                self._begins.append(a_range.begin)
+                self._ends.append(a_range.end)
+
+    def __contains__(self, line: int) -> bool:
+        position = bisect_right(self._begins, line) - 1
+        return position >= 0 and line <= self._ends[position]
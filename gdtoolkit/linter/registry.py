@@ -0,0 +1,90 @@
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lark import Tree
+
+from ..common.ast import AbstractSyntaxTree
+from ..common.parsed_file import ParsedFile
+from .problem import Problem
+
+CodeCheck = Callable[[str], List[Problem]]
+AstCheck = Callable[[AbstractSyntaxTree], List[Problem]]
+NodeCheck = Callable[[Tree], List[Problem]]
+Finalizer = Callable[[], List[Problem]]
+
+
+class CheckRegistry:
+    """Registry of enabled checks. Every check declares the input it needs -
+    either the code, the abstract syntax tree or the parse tree nodes of certain
+    rules - so that only the inputs required by the enabled checks are computed.
+    Checks disabled in the config are not registered at all.
+    Node checks are run during a single traversal of the parse tree which
+    dispatches every subtree to the checks registered for its rule.
+    Problems are returned grouped by check, in the order the checks were
+    registered.
+    """
+
+    def __init__(self, config: MappingProxyType):
+        self._disable = config["disable"]
+        self._code_checks: List[Tuple[int, CodeCheck]] = []
+        self._ast_checks: List[Tuple[int, AstCheck]] = []
+        self._node_checks: Dict[str, List[Tuple[int, NodeCheck]]] = defaultdict(list)
+        self._any_node_checks: List[Tuple[int, NodeCheck]] = []
+        self._finalizers: List[Tuple[int, Finalizer]] = []
+        self._checks_num = 0
+
+    def register_code_check(self, name: str, check: CodeCheck) -> None:
+        check_id = self._next_check_id(name)
+        if check_id is not None:
+            self._code_checks.append((check_id, check))
+
+    def register_ast_check(self, name: str, check: AstCheck) -> None:
+        check_id = self._next_check_id(name)
+        if check_id is not None:
+            self._ast_checks.append((check_id, check))
+
+    def register_node_check(
+        self,
+        name: str,
+        check: NodeCheck,
+        rules: Optional[List[str]] = None,
+        finalizer: Optional[Finalizer] = None,
+    ) -> None:
+        """Registers check to be called for every subtree of given rules
+        (or for every subtree if rules are not specified). Finalizer, if given,
+        is called once the traversal is over and may report problems based on
+        the data gathered by the check"""
+        check_id = self._next_check_id(name)
+        if check_id is None:
+            return
+        if rules is None:
+            self._any_node_checks.append((check_id, check))
+        for rule in rules or []:
+            self._node_checks[rule].append((check_id, check))
+        if finalizer is not None:
+            self._finalizers.append((check_id, finalizer))
+
+    def run(self, parsed_file: ParsedFile) -> List[Problem]:
+        problem_clusters: List[List[Problem]] = [[] for _ in range(self._checks_num)]
+        for check_id, code_check in self._code_checks:
+            problem_clusters[check_id] += code_check(parsed_file.code)
+        if len(self._ast_checks) > 0:
+            ast = parsed_file.ast
+            for check_id, ast_check in self._ast_checks:
+                problem_clusters[check_id] += ast_check(ast)
+        if len(self._node_checks) > 0 or len(self._any_node_checks) > 0:
+            for node in parsed_file.parse_tree.iter_subtrees():
+                for check_id, node_check in self._any_node_checks:
+                    problem_clusters[check_id] += node_check(node)
+                for check_id, node_check in self._node_checks.get(node.data, []):
+                    problem_clusters[check_id] += node_check(node)
+        for check_id, finalizer in self._finalizers:
+            problem_clusters[check_id] += finalizer()
+        return [problem for cluster in problem_clusters for problem in cluster]
+
+    def _next_check_id(self, name: str) -> Optional[int]:
+        if name in self._disable:
+            return None
+        self._checks_num += 1
+        return self._checks_num - 1
@@ -5,16 +5,23 @@ On failure, python exception is shown and exitcode is non-zero.
 
 Usage:
   gdparse <file>... [options]
+  gdparse --warm-cache
 
 Options:
   -p --pretty   Print pretty parse tree
   -v --verbose  Print parse tree
+  -o --outline  Print declarations (classes, functions, variables etc.)
+                without parsing function bodies
+  --json        Print outline as JSON
+  --warm-cache  Build parsing tables and store them in the cache
+                unless they are cached or prebuilt already.
   -h --help     Show this screen.
   --version     Show version.
 """
+import json
 import sys
-from typing import Dict
-from importlib.metadata import version as pkg_version
+from dataclasses import asdict
+from typing import Dict, List, Optional
 
 import lark
 from docopt import docopt
@@ -24,33 +31,38 @@ from gdtoolkit.common.exceptions import (
     lark_unexpected_token_to_str,
     lark_unexpected_input_to_str,
 )
+from gdtoolkit.common.version import ToolVersion
 
 
 def main():
-    arguments = docopt(
-        __doc__,
-        version="gdparse {}".format(pkg_version("gdtoolkit")),
-    )
+    arguments = docopt(__doc__, version=ToolVersion("gdparse"))
+    if arguments["--warm-cache"]:
+        parser.warm_cache()
+        return
     files = arguments["<file>"]
 
     success = True
+    outlines: Dict[str, List[Dict]] = {}
 
     if files == ["-"]:
         file_content = sys.stdin.read()
-        success = _parse_file_content(file_content, arguments)
+        success = _parse_file_content(file_content, arguments, outlines)
     else:
         for file_path in files:
-            success &= _parse_file(file_path, arguments)
+            success &= _parse_file(file_path, arguments, outlines)
+
+    if arguments["--outline"] and arguments["--json"]:
+        print(json.dumps(outlines, indent=2))
 
     if not success:
         sys.exit(1)
 
 
-def _parse_file(file_path: str, arguments: Dict) -> bool:
+def _parse_file(file_path: str, arguments: Dict, outlines: Dict) -> bool:
     try:
         with open(file_path, "r", encoding="utf-8") as handle:
             file_content = handle.read()
-            return _parse_file_content(file_content, arguments, file_path)
+            return _parse_file_content(file_content, arguments, outlines, file_path)
     except OSError as exception:
         print(
             "Cannot open file '{}': {}".format(file_path, exception.strerror),
@@ -59,8 +71,13 @@ def _parse_file(file_path: str, arguments: Dict) -> bool:
     return False
 
 
-def _parse_file_content(content: str, arguments: Dict, file_path: str = None) -> bool:
+def _parse_file_content(
+    content: str, arguments: Dict, outlines: Dict, file_path: Optional[str] = None
+) -> bool:
     actual_file_path = "STDIN" if file_path is None else file_path
+    if arguments["--outline"]:
+        _print_outline(content, arguments, outlines, actual_file_path)
+        return True
     try:
         tree = parser.parse(content)  # TODO: handle exceptions
     except lark.exceptions.UnexpectedToken as exception:
@@ -88,5 +105,16 @@ def _parse_file_content(content: str, arguments: Dict, file_path: str = None) ->
     return True
 
 
+def _print_outline(content: str, arguments: Dict, outlines: Dict, file_path: str):
+    declarations = parser.parse_outline(content)
+    if arguments["--json"]:
+        outlines[file_path] = [asdict(declaration) for declaration in declarations]
+        return
+    print(f"{file_path}:\n")
+    for declaration in declarations:
+        depth = 0 if declaration.scope == "" else declaration.scope.count(".") + 1
+        print("{}: {}{}".format(declaration.line, "  " * depth, declaration.header))
+
+
 if __name__ == "__main__":
     main()
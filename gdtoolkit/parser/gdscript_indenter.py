@@ -1,4 +1,4 @@
-from typing import Iterator
+from typing import Iterator, List
 from collections import defaultdict
 
 from lark.indenter import Indenter
@@ -11,6 +11,8 @@ class GDScriptIndenter(Indenter):
     CLOSE_PAREN_types = ["RPAR", "RSQB", "RBRACE"]
     LAMBDA_LINE_EXTENSION_types = ["IF", "WHILE", "FOR", "MATCH"]
     LAMBDA_SEPARATOR_types = ["COMMA"]
+    # names, dots and brackets make up return type if lexed w/o parser
+    LAMBDA_RETURN_TYPE_types = ["TYPE_HINT", "NAME", "DOT", "LSQB", "RSQB"]
     INDENT_type = "_INDENT"
     DEDENT_type = "_DEDENT"
     # TODO: guess tab length
@@ -18,8 +20,10 @@ class GDScriptIndenter(Indenter):
 
     def __init__(self):
         super().__init__()
-        self.processed_tokens = []
         self.undedented_lambdas_at_paren_level = defaultdict(int)
+        self.after_func = False
+        self.lpar_after_func: List[bool] = []
+        self.lambda_header_state = _NO_LAMBDA_HEADER
 
     def handle_NL(self, token: Token) -> Iterator[Token]:
         if self.paren_level > 0:
@@ -39,12 +43,18 @@ class GDScriptIndenter(Indenter):
                 else:
                     yield produced_token
 
+    def process(self, stream):
+        # the indenter given to lark is shared by all the parses, so the state
+        # is kept in a fresh instance to allow parsing in many threads at once
+        indenter = type(self)()
+        return Indenter.process(indenter, stream)
+
     def _process(self, stream):
-        self.processed_tokens = []
         self.undedented_lambdas_at_paren_level = defaultdict(int)
+        self._reset_lambda_header_tracking()
 
         had_newline = False
-        for produced_token in super()._process(self._record_stream(stream)):
+        for produced_token in super()._process(self._track_stream(stream)):
             if (
                 produced_token.type in self.CLOSE_PAREN_types
                 or produced_token.type in self.LAMBDA_SEPARATOR_types
@@ -56,11 +66,43 @@ class GDScriptIndenter(Indenter):
             had_newline = produced_token.type == self.NL_type
             yield produced_token
 
-    def _record_stream(self, stream):
+    def _track_stream(self, stream):
         for token in stream:
-            self.processed_tokens.append(token)
+            self._track_lambda_header(token)
             yield token
 
+    def _reset_lambda_header_tracking(self):
+        self.after_func = False
+        self.lpar_after_func = []
+        self.lambda_header_state = _NO_LAMBDA_HEADER
+
+    def _track_lambda_header(self, token: Token):
+        # the state of 'func [NAME] (...) [-> TYPE]:' matching is updated token by
+        # token so that no lookback is needed upon NL, newlines are skipped
+        if token.type == self.NL_type:
+            return
+        if token.type == "LPAR":
+            self.lpar_after_func.append(self.after_func)
+        if token.type == "RPAR":
+            lpar_after_func = (
+                self.lpar_after_func.pop() if len(self.lpar_after_func) > 0 else False
+            )
+            self.lambda_header_state = (
+                _AFTER_LAMBDA_ARGUMENTS if lpar_after_func else _NO_LAMBDA_HEADER
+            )
+        elif (
+            self.lambda_header_state == _AFTER_LAMBDA_ARGUMENTS
+            and token.type == "COLON"
+        ):
+            self.lambda_header_state = _AFTER_LAMBDA_HEADER
+        elif self.lambda_header_state != _AFTER_LAMBDA_ARGUMENTS or (
+            token.type not in self.LAMBDA_RETURN_TYPE_types and token.value != "->"
+        ):
+            self.lambda_header_state = _NO_LAMBDA_HEADER
+        self.after_func = token.type == "FUNC" or (
+            self.after_func and token.type == "NAME"
+        )
+
     def _in_multiline_lambda(self):
         return self.undedented_lambdas_at_paren_level[self.paren_level] > 0
 
@@ -100,36 +142,9 @@ class GDScriptIndenter(Indenter):
         yield Token.new_borrow_pos(self.DEDENT_type, "N/A", token)
 
     def _current_token_is_just_after_lambda_header(self):
-        extra_rpars = [0]
-        pattern_functions = [
-            lambda t: t.type == "COLON",
-            lambda t: t.type == "RPAR",
-            lambda t: t.type == "LPAR" and extra_rpars[0] == 0,
-            lambda t: t.type == "FUNC",
-        ]
-
-        def lpar_accept_function(token: Token) -> bool:
-            if token.type == "RPAR":
-                extra_rpars[0] += 1
-            elif token.type == "LPAR":
-                if extra_rpars[0] <= 0:
-                    return False
-                extra_rpars[0] -= 1
-            return True
-
-        accept_functions = [
-            lambda t: t.type == "_NL",
-            lambda t: t.type in ["_NL", "TYPE_HINT"] or t.value == "->",
-            lpar_accept_function,
-            lambda t: t.type in ["_NL", "NAME"],
-        ]
-        i = 0
-        for processed_token in reversed(self.processed_tokens):
-            if i >= len(pattern_functions):
-                return True
-            if pattern_functions[i](processed_token):
-                i += 1
-                continue
-            if not accept_functions[i](processed_token):
-                return False
-        return i >= len(pattern_functions)
+        return self.lambda_header_state == _AFTER_LAMBDA_HEADER
+
+
+_NO_LAMBDA_HEADER = 0
+_AFTER_LAMBDA_ARGUMENTS = 1
+_AFTER_LAMBDA_HEADER = 2
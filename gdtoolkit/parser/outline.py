@@ -0,0 +1,252 @@
+"""
+Fast extraction of GDScript declarations (outline) which does not build parse trees.
+Code is split into logical lines (taking brackets, strings and line continuations
+into account) and only lines on the class level are looked into - indented bodies
+of functions and properties are skipped by indentation.
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+
+@dataclass
+class Declaration:
+    kind: str
+    name: str
+    line: int
+    scope: str
+    header: str
+
+
+@dataclass
+class _Scope:
+    indent: int
+    kind: str
+    name: str
+
+
+_SIGNIFICANT_CHARS = re.compile(r'"""|\'\'\'|"|\'|#|;|[\[({]|[\])}]|\\\r?\n|\n')
+_STRING_ENDS = {
+    '"': re.compile(r'(?:[^"\\\n]|\\.)*"'),
+    "'": re.compile(r"(?:[^'\\\n]|\\.)*'"),
+}
+_ANNOTATION = re.compile(r"@[\w.]+\s*")
+# named enum may have its body in the following line
+_ENUM_HEADER_WO_BODY = re.compile(r"enum\s+\w+")
+_DECLARATIONS = [
+    ("class_name", re.compile(r"class_name\s+(\w+)")),
+    ("extends", re.compile(r"extends\s+(.+?)\s*$")),
+    ("func", re.compile(r"(?:static\s+)?func\s+(\w+)")),
+    ("signal", re.compile(r"signal\s+(\w+)")),
+    ("enum", re.compile(r"enum(?:\s+(\w+))?\s*\{")),
+    ("const", re.compile(r"const\s+(\w+)")),
+    ("var", re.compile(r"(?:static\s+)?var\s+(\w+)")),
+    ("class", re.compile(r"class\s+(\w+)")),
+]
+_CLASS_NAME_EXTENDS = re.compile(r"class_name\s+\w+\s+(extends\s.*)")
+_CLASS_INLINE_BODY = re.compile(
+    r"class\s+\w+(?:\s+extends\s+(?:\"[^\"]*\"|'[^']*'|[^:\"'])+)?\s*:\s*(.*)"
+)
+
+
+def parse_outline(code: str) -> List[Declaration]:
+    """Returns declarations (class_name, extends, signals, enums, consts, vars,
+    functions and classes) of the global scope and inner classes"""
+    declarations: List[Declaration] = []
+    scopes: List[_Scope] = []
+    for line, _, indent, statements in _logical_lines(code):
+        while len(scopes) > 0 and indent <= scopes[-1].indent:
+            scopes.pop()
+        for statement in statements:
+            _outline_statement(statement, line, indent, scopes, declarations)
+    return declarations
+
+
+def find_top_level_statements(code: str) -> List[Tuple[int, int]]:
+    """Returns the first and the last line of every top-level statement
+    (including its body and preceding annotations placed in separate lines)"""
+    statement_lines: List[Tuple[int, int]] = []
+    pending_annotation_lines: Optional[Tuple[int, int]] = None
+    for line, end_line, indent, statements in _logical_lines(code):
+        if indent > 0 and len(statement_lines) > 0:
+            statement_lines[-1] = (statement_lines[-1][0], end_line)
+            continue
+        if pending_annotation_lines is not None:
+            line = pending_annotation_lines[0]
+        if all(_strip_annotations(statement) == "" for statement in statements):
+            pending_annotation_lines = (line, end_line)
+            continue
+        pending_annotation_lines = None
+        statement_lines.append((line, end_line))
+    if pending_annotation_lines is not None:
+        statement_lines.append(pending_annotation_lines)
+    return statement_lines
+
+
+def _outline_statement(
+    statement: str,
+    line: int,
+    indent: int,
+    scopes: List[_Scope],
+    declarations: List[Declaration],
+) -> None:
+    if len(scopes) > 0 and scopes[-1].kind != "class":
+        return
+    declaration = _parse_declaration(
+        statement, line, ".".join(scope.name for scope in scopes)
+    )
+    if declaration is None:
+        return
+    declarations.append(declaration)
+    class_name_extends = (
+        _CLASS_NAME_EXTENDS.match(declaration.header)
+        if declaration.kind == "class_name"
+        else None
+    )
+    if class_name_extends is not None:
+        declaration.header = declaration.header[: class_name_extends.start(1)].rstrip()
+        _outline_statement(
+            class_name_extends.group(1), line, indent, scopes, declarations
+        )
+    elif declaration.kind == "class":
+        scopes.append(_Scope(indent, "class", declaration.name))
+        inline_body = _CLASS_INLINE_BODY.match(declaration.header)
+        if inline_body is not None and inline_body.group(1) != "":
+            declaration.header = declaration.header[: inline_body.start(1)].rstrip(": ")
+            _outline_statement(inline_body.group(1), line, indent, scopes, declarations)
+    elif declaration.kind == "func" or (
+        declaration.kind == "var" and statement.endswith(":")
+    ):
+        # function and property bodies are skipped
+        scopes.append(_Scope(indent, declaration.kind, declaration.name))
+
+
+def _logical_lines(code: str) -> Iterator[Tuple[int, int, int, List[str]]]:
+    """Yields the first and the last line number, indentation and the statements
+    (w/o comments) of every non-empty logical line"""
+    line = 1
+    begin = 0
+    statements: List[List[str]] = []
+    segments: List[str] = []
+    segment_begin = 0
+    depth = 0
+    position = 0
+    while True:
+        match = _SIGNIFICANT_CHARS.search(code, position)
+        if match is None:
+            segments.append(code[segment_begin:])
+            end_line = line + code.count("\n", begin)
+            yield from _logical_line(
+                code, (line, end_line), begin, statements + [segments]
+            )
+            return
+        char = match.group()
+        position = match.end()
+        if char in ['"""', "'''"]:
+            end = code.find(char, position)
+            position = len(code) if end == -1 else end + len(char)
+        elif char in _STRING_ENDS:
+            string_end = _STRING_ENDS[char].match(code, position)
+            position = position if string_end is None else string_end.end()
+        elif char == "#":
+            segments.append(code[segment_begin : match.start()])
+            end = code.find("\n", position)
+            position = len(code) if end == -1 else end
+            segment_begin = position
+        elif char in "[({":
+            depth += 1
+        elif char in "])}":
+            depth = max(depth - 1, 0)
+        elif char.startswith("\\"):
+            # line continuation is replaced with whitespace
+            segments.append(code[segment_begin : match.start()] + " ")
+            segment_begin = position
+        elif char == ";" and depth == 0:
+            segments.append(code[segment_begin : match.start()])
+            statements.append(segments)
+            segments = []
+            segment_begin = position
+        elif char == "\n" and depth == 0:
+            if _is_enum_header_wo_body(
+                segments + [code[segment_begin : match.start()]]
+            ):
+                continue
+            segments.append(code[segment_begin : match.start()])
+            end_line = line + code.count("\n", begin, match.start())
+            yield from _logical_line(
+                code, (line, end_line), begin, statements + [segments]
+            )
+            line = end_line + 1
+            begin = segment_begin = position
+            statements = []
+            segments = []
+
+
+def _is_enum_header_wo_body(segments: List[str]) -> bool:
+    return (
+        _ENUM_HEADER_WO_BODY.fullmatch(_strip_annotations("".join(segments).strip()))
+        is not None
+    )
+
+
+def _logical_line(
+    code: str,
+    lines: Tuple[int, int],
+    begin: int,
+    statements_segments: List[List[str]],
+) -> Iterator[Tuple[int, int, int, List[str]]]:
+    statements = [
+        " ".join("".join(segments).split()) for segments in statements_segments
+    ]
+    statements = [statement for statement in statements if statement != ""]
+    if len(statements) == 0:
+        return
+    indent_end = begin
+    while indent_end < len(code) and code[indent_end] in " \t":
+        indent_end += 1
+    yield lines[0], lines[1], indent_end - begin, statements
+
+
+def _parse_declaration(text: str, line: int, scope: str) -> Optional[Declaration]:
+    text = _strip_annotations(text)
+    for kind, regex in _DECLARATIONS:
+        match = regex.match(text)
+        if match is not None:
+            header = (
+                _function_header(text) if kind == "func" else text.rstrip(":").rstrip()
+            )
+            return Declaration(kind, match.group(1) or "", line, scope, header)
+    return None
+
+
+def _strip_annotations(text: str) -> str:
+    while text.startswith("@"):
+        match = _ANNOTATION.match(text)
+        if match is None:
+            break
+        text = text[match.end() :]
+        if text.startswith("("):
+            text = text[_matching_bracket_position(text, 0) + 1 :].lstrip()
+    return text
+
+
+def _function_header(text: str) -> str:
+    """Returns function header w/o the colon and the body following it"""
+    arguments_begin = text.find("(")
+    if arguments_begin == -1:
+        return text
+    arguments_end = _matching_bracket_position(text, arguments_begin)
+    body_begin = text.find(":", arguments_end)
+    return text if body_begin == -1 else text[:body_begin].rstrip()
+
+
+def _matching_bracket_position(text: str, opening_position: int) -> int:
+    depth = 0
+    for position in range(opening_position, len(text)):
+        if text[position] in "[({":
+            depth += 1
+        elif text[position] in "])}":
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(text)
@@ -4,12 +4,32 @@ Provides a function to parse GDScript code
 and to get an intermediate representation as a Lark Tree.
 """
 import os
+import re
 import sys
-from importlib.metadata import version as pkg_version
+import hashlib
+import tempfile
+import importlib
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextvars import ContextVar
+from copy import copy
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
-from lark import Lark, Tree
+from lark import Lark, Tree, Token, __version__ as lark_version
+from lark.exceptions import LarkError
+from lark.indenter import DedentError
+from lark.grammar import Rule
+from lark.lexer import BasicLexer, LexerThread, TerminalDef
+from lark.tree import Meta
 
 from .gdscript_indenter import GDScriptIndenter
+from .outline import Declaration, parse_outline
+
+CACHE_DIRECTORY_ENV_VAR = "GDTOOLKIT_CACHE_DIR"
+GRAMMAR_FILENAMES = ["gdscript.lark", "comments.lark"]
+PREBUILT_GRAMMAR_CACHE_DIRPATH = os.path.join(
+    os.path.dirname(__file__), "grammar_caches"
+)
 
 
 # TODO: when upgrading to Python 3.8, replace with functools.cached_property
@@ -39,7 +59,6 @@ class Parser:
     def __init__(self):
         self._directory = os.path.dirname(__file__)
         self._use_grammar_cache = True
-        self._cache_dirpath: str = os.path.join(get_cache_directory(), "gdtoolkit")
 
     def parse(self, code: str, gather_metadata: bool = False) -> Tree:
         """Parses GDScript code and returns intermediate representation as a Lark Tree.
@@ -56,56 +75,547 @@ class Parser:
             else self._parser.parse(adjusted_code)
         )
 
+    def parse_with_comments(self, code: str) -> Tuple[Tree, Tree]:
+        """Parses GDScript code gathering metadata and returns intermediate
+        representation as a Lark Tree along with comments - both standalone, and inline.
+        Comments are gathered during the same lexing pass, the returned comment Tree
+        is equivalent to the outcome of parse_comments.
+        """
+        comments: List[Token] = []
+        reset_token = _GATHERED_COMMENTS.set(comments)
+        try:
+            # pylint: disable=no-member
+            tree = self._parser_with_metadata.parse(code + "\n")
+        finally:
+            _GATHERED_COMMENTS.reset(reset_token)
+        return tree, Tree("start", comments)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def reparse(
+        self,
+        previous_tree: Tree,
+        code: str,
+        first_changed_line: int,
+        last_changed_line: int,
+        lines_delta: int = 0,
+    ) -> Tree:
+        """Parses GDScript code after an edit, reusing the parse tree of the code from
+        before the edit (parsed with gather_metadata=True). The edit replaced lines
+        from first_changed_line to last_changed_line (inclusive, numbered as in the
+        code before the edit) and changed the number of lines by lines_delta.
+        Only the top-level statements affected by the edit are re-parsed, the others
+        are reused with their positions shifted. The previous tree is updated
+        in place. If the affected statements cannot be parsed on their own,
+        the whole code is parsed.
+        """
+        statements = previous_tree.children
+        if len(statements) == 0:
+            return self.parse(code, gather_metadata=True)
+        first, last = _find_statements_to_reparse(
+            statements, first_changed_line, last_changed_line
+        )
+        code_lines = code.split("\n")
+        begin_line = 1 if first == 0 else statements[first].meta.line
+        end_line = (
+            statements[last].meta.line + lines_delta - 1
+            if last < len(statements)
+            else len(code_lines)
+        )
+        fragment_lines = code_lines[begin_line - 1 : end_line]
+        fragment_tree = self._parse_fragment(fragment_lines)
+        if fragment_tree is None:
+            return self.parse(code, gather_metadata=True)
+        begin_pos = sum(len(line) + 1 for line in code_lines[: begin_line - 1])
+        _shift_positions(fragment_tree, begin_line - 1, begin_pos)
+        _splice_statements(
+            previous_tree,
+            fragment_tree,
+            (first, last),
+            lines_delta,
+            begin_pos + sum(len(line) + 1 for line in fragment_lines),
+        )
+        return previous_tree
+
     def parse_comments(self, code: str) -> Tree:
         """Parses GDScript code and returns comments - both standalone, and inline."""
         # pylint: disable=no-member
         return self._comment_parser.parse(code)
 
+    def tokenize(self, code: str) -> Iterator[Token]:
+        """Lexes GDScript code and yields tokens along with their positions
+        - including comments and the _INDENT/_DEDENT tokens produced by the indenter.
+        The LALR parser is not run, so unlike while parsing, tokens are not typed
+        depending on the context e.g. type hints are lexed as NAME tokens.
+        Comments are yielded in the order of positions, indenter tokens
+        come right after the newlines they originate from.
+        """
+        pending_comments: Deque[Token] = deque()
+        tokens = LexerThread.from_text(self._tokenizer_lexer, code + "\n").lex(None)
+        for token in GDScriptIndenter().process(
+            _split_signs(_extract_comments(tokens, pending_comments))
+        ):
+            if token.start_pos is not None:
+                while (
+                    len(pending_comments) > 0
+                    and pending_comments[0].start_pos <= token.start_pos
+                ):
+                    yield pending_comments.popleft()
+            yield token
+        yield from pending_comments
+
+    def parse_outline(self, code: str) -> List[Declaration]:
+        """Returns declarations of the global scope and inner classes along with
+        their line numbers. Lark parsers are not used and function bodies are
+        skipped, so this is much faster than parsing the whole code.
+        """
+        return parse_outline(code)
+
     def disable_grammar_caching(self) -> None:
+        """Makes parsers created from now on being built from grammars
+        without reading or writing the cache"""
         self._use_grammar_cache = False
 
+    def warm_cache(self, cache_dirpath: Optional[str] = None) -> None:
+        """Builds parsing tables of all grammars and stores them in the user cache
+        (or given directory) unless they are available there or prebuilt already.
+        Useful for preparing e.g. CI containers upfront.
+        """
+        for grammar_filename in GRAMMAR_FILENAMES:
+            grammar_filepath = os.path.join(self._directory, grammar_filename)
+            cache_filename = _grammar_cache_filename(grammar_filepath)
+            target_filepath = os.path.join(
+                cache_dirpath or _grammar_cache_dirpath(), cache_filename
+            )
+            source_filepaths = (
+                [target_filepath]
+                if cache_dirpath is not None
+                else [
+                    os.path.join(PREBUILT_GRAMMAR_CACHE_DIRPATH, cache_filename),
+                    target_filepath,
+                ]
+            )
+            if not any(os.path.isfile(path) for path in source_filepaths):
+                a_parser = Lark.open(
+                    grammar_filepath, postlex=GDScriptIndenter(), **_GRAMMAR_OPTIONS
+                )
+                _save_parser(a_parser, target_filepath)
+
+    def generate_standalone_parsers(self, dirpath: Optional[str] = None) -> None:
+        """Generates Python modules containing parsing tables of all grammars
+        (in this package's directory by default). When present and generated
+        for the current grammar and lark version, they are preferred over
+        the grammar caches as byte-compiled modules load faster than pickles.
+        """
+        # pylint: disable=import-outside-toplevel
+        import pprint
+        import py_compile
+
+        for grammar_filename in GRAMMAR_FILENAMES:
+            grammar_filepath = os.path.join(self._directory, grammar_filename)
+            a_parser = Lark.open(
+                grammar_filepath, postlex=GDScriptIndenter(), **_GRAMMAR_OPTIONS
+            )
+            data, memo = a_parser.memo_serialize([TerminalDef, Rule])
+            data["options"] = {
+                name: value
+                for name, value in data["options"].items()
+                if name not in _NON_CACHED_OPTIONS
+            }
+            module_filepath = os.path.join(
+                dirpath or self._directory,
+                _standalone_module_name(grammar_filename) + ".py",
+            )
+            with open(module_filepath, "w", encoding="utf-8") as handle:
+                handle.write(
+                    _STANDALONE_MODULE_TEMPLATE.format(
+                        grammar_filename=grammar_filename,
+                        grammar_cache_key=_grammar_cache_key(grammar_filepath),
+                        data=pprint.pformat(data),
+                        memo=pprint.pformat(memo),
+                    )
+                )
+            py_compile.compile(module_filepath, doraise=True)
+
     def _get_parser(
         self,
-        name: str,
         add_metadata: bool = False,
         grammar_filename: str = "gdscript.lark",
     ) -> Lark:
-        version: str = pkg_version("gdtoolkit")
-        cache_dirpath: str = os.path.join(self._cache_dirpath, version)
-        cache_filepath: str = os.path.join(cache_dirpath, name) + ".pickle"
+        """Creates parser by loading parsing tables from generated standalone module,
+        prebuilt grammar cache or the user cache. If neither is available,
+        the parser is built from the grammar and stored in the user cache."""
         grammar_filepath: str = os.path.join(self._directory, grammar_filename)
-
-        # TODO: catch IO exception
-        if not os.path.exists(cache_dirpath):
-            os.makedirs(cache_dirpath)
-
-        # TODO: catch IO exception
-        a_parser = Lark.open(
-            grammar_filepath,
-            parser="lalr",
-            start="start",
-            postlex=GDScriptIndenter(),  # type: ignore
-            propagate_positions=add_metadata,
-            maybe_placeholders=False,
-            cache=cache_filepath,
-            regex=True,
+        lexer_callbacks = (
+            {
+                "COMMENT": _gather_comment,
+                "_NL": _gather_comments_from_newline,
+            }
+            if add_metadata and grammar_filename == "gdscript.lark"
+            else {}
         )
+        load_options: Dict[str, Any] = {
+            "postlex": GDScriptIndenter(),
+            "propagate_positions": add_metadata,
+            "lexer_callbacks": lexer_callbacks,
+        }
+        if not self._use_grammar_cache:
+            return Lark.open(grammar_filepath, **_GRAMMAR_OPTIONS, **load_options)
 
+        grammar_cache_key = _grammar_cache_key(grammar_filepath)
+        a_parser = _load_standalone_parser(
+            grammar_filename, grammar_cache_key, load_options
+        )
+        if a_parser is not None:
+            return a_parser
+        cache_filename = grammar_cache_key + ".pickle"
+        a_parser = _load_parser(
+            os.path.join(PREBUILT_GRAMMAR_CACHE_DIRPATH, cache_filename), load_options
+        )
+        if a_parser is not None:
+            return a_parser
+        user_cache_filepath = os.path.join(_grammar_cache_dirpath(), cache_filename)
+        a_parser = _load_parser(user_cache_filepath, load_options)
+        if a_parser is not None:
+            return a_parser
+        a_parser = Lark.open(grammar_filepath, **_GRAMMAR_OPTIONS, **load_options)
+        _save_parser(a_parser, user_cache_filepath)
         return a_parser
 
+    def _parse_fragment(self, fragment_lines: List[str]) -> Optional[Tree]:
+        fragment = "\n".join(fragment_lines)
+        if fragment.endswith("\\"):
+            # line continuation would join the fragment with the following statement
+            return None
+        try:
+            # pylint: disable=no-member
+            return self._parser_with_metadata.parse(fragment + "\n")
+        except (LarkError, DedentError):
+            return None
+
     @CachedProperty
     def _parser(self) -> Lark:
-        return self._get_parser("parser")
+        return self._get_parser()
 
     @CachedProperty
     def _parser_with_metadata(self) -> Lark:
-        return self._get_parser("parser_with_metadata", add_metadata=True)
+        return self._get_parser(add_metadata=True)
+
+    @CachedProperty
+    def _tokenizer_lexer(self) -> BasicLexer:
+        # lexer of all terminals (w/o the context of parser) is used so
+        # type hint terminals would take precedence over names and are skipped
+        lexer_conf = copy(self._parser.lexer_conf)  # pylint: disable=no-member
+        lexer_conf.terminals = [
+            terminal
+            for terminal in lexer_conf.terminals
+            if terminal.name != "TYPE_HINT"
+        ]
+        lexer_conf.ignore = tuple(
+            terminal for terminal in lexer_conf.ignore if terminal != "COMMENT"
+        )
+        lexer_conf.callbacks = {}
+        return BasicLexer(lexer_conf)
 
     @CachedProperty
     def _comment_parser(self) -> Lark:
-        return self._get_parser(
-            "parser_comments", add_metadata=True, grammar_filename="comments.lark"
+        return self._get_parser(add_metadata=True, grammar_filename="comments.lark")
+
+
+# options which are not stored in the cache but provided upon loading
+_NON_CACHED_OPTIONS = ["postlex", "propagate_positions", "lexer_callbacks"]
+_GRAMMAR_OPTIONS: Dict[str, Any] = {
+    "parser": "lalr",
+    "start": "start",
+    "maybe_placeholders": False,
+    "regex": True,
+}
+_STANDALONE_MODULE_TEMPLATE = '''"""
+Parsing tables of {grammar_filename} generated by 'make standalone-parsers'.
+Do not edit, regenerate upon changing the grammar or the lark version instead.
+"""
+# pylint: skip-file
+# fmt: off
+from lark import Token
+
+GRAMMAR_CACHE_KEY = "{grammar_cache_key}"
+DATA = {data}
+MEMO = {memo}
+'''
+_COMMENT_REGEX = re.compile(r"#[^\n]*")
+# comments gathered by the ongoing parse_with_comments call (per thread/task)
+_GATHERED_COMMENTS: ContextVar[Optional[List[Token]]] = ContextVar(
+    "gathered_comments", default=None
+)
+_SIGNED_NUMBER_TYPES = ["NUMBER", "HEX", "BIN"]
+_OPERAND_TYPES = [
+    "NAME",
+    "NUMBER",
+    "HEX",
+    "BIN",
+    "LONG_STRING",
+    "LONG_RSTRING",
+    "REGULAR_STRING",
+    "REGULAR_RSTRING",
+    "RPAR",
+    "RSQB",
+    "RBRACE",
+]
+
+_BEGIN_POSITIONS = [
+    ("line", "start_pos"),
+    ("container_line", "container_start_pos"),
+]
+_END_POSITIONS = [
+    ("end_line", "end_pos"),
+    ("container_end_line", "container_end_pos"),
+]
+
+
+def _grammar_cache_key(grammar_filepath: str) -> str:
+    """Returns the key specific to the grammar, the lark version
+    and the options parsing tables are built with"""
+    digest = hashlib.sha256(repr(sorted(_GRAMMAR_OPTIONS.items())).encode("utf-8"))
+    digest.update(lark_version.encode("utf-8"))
+    with open(grammar_filepath, "rb") as handle:
+        digest.update(handle.read())
+    grammar_name = os.path.splitext(os.path.basename(grammar_filepath))[0]
+    return "{}-{}".format(grammar_name, digest.hexdigest()[:16])
+
+
+def _grammar_cache_filename(grammar_filepath: str) -> str:
+    return _grammar_cache_key(grammar_filepath) + ".pickle"
+
+
+def _standalone_module_name(grammar_filename: str) -> str:
+    return "standalone_" + os.path.splitext(grammar_filename)[0]
+
+
+def _grammar_cache_dirpath() -> str:
+    # importing importlib.metadata is slow, it is not needed if caches are prebuilt
+    # pylint: disable-next=import-outside-toplevel
+    from importlib.metadata import version as pkg_version
+
+    return os.path.join(get_gdtoolkit_cache_directory(), pkg_version("gdtoolkit"))
+
+
+def _load_parser(cache_filepath: str, load_options: Dict[str, Any]) -> Optional[Lark]:
+    try:
+        with open(cache_filepath, "rb") as handle:
+            # pylint: disable-next=protected-access
+            return Lark.__new__(Lark)._load(handle, **load_options)
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-exception-caught
+        # corrupted or incompatible cache is ignored and overwritten eventually
+        return None
+
+
+def _load_standalone_parser(
+    grammar_filename: str, grammar_cache_key: str, load_options: Dict[str, Any]
+) -> Optional[Lark]:
+    try:
+        module = importlib.import_module(
+            "{}.{}".format(__package__, _standalone_module_name(grammar_filename))
+        )
+        if module.GRAMMAR_CACHE_KEY != grammar_cache_key:
+            # generated for different grammar or lark version
+            return None
+        # pylint: disable-next=protected-access
+        return Lark._load_from_dict(module.DATA, module.MEMO, **load_options)
+    except ImportError:
+        return None
+    except Exception:  # pylint: disable=broad-exception-caught
+        # broken module is ignored, parsing tables are taken from the caches then
+        return None
+
+
+def _save_parser(a_parser: Lark, cache_filepath: str) -> None:
+    """Stores parsing tables in the cache file which is replaced atomically,
+    so concurrent processes never read partially written file"""
+    try:
+        os.makedirs(os.path.dirname(cache_filepath), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(cache_filepath), suffix=".tmp", delete=False
+        ) as handle:
+            a_parser.save(handle, _NON_CACHED_OPTIONS)
+        os.replace(handle.name, cache_filepath)
+    except OSError:
+        pass
+
+
+def _gather_comment(token: Token) -> Token:
+    comments = _GATHERED_COMMENTS.get()
+    if comments is not None:
+        comments.append(token)
+    return token
+
+
+def _gather_comments_from_newline(token: Token) -> Token:
+    comments = _GATHERED_COMMENTS.get()
+    if comments is not None:
+        comments += _comments_from_newline(token)
+    return token
+
+
+def _comments_from_newline(token: Token) -> List[Token]:
+    # comments following the newline are consumed by _NL token
+    if "#" not in token:
+        return []
+    comments = []
+    for match in _COMMENT_REGEX.finditer(token):
+        offset = match.start()
+        newlines = token.count("\n", 0, offset)
+        column = (
+            token.column + offset
+            if newlines == 0
+            else offset - token.rfind("\n", 0, offset)
+        )
+        comments.append(
+            Token(
+                "COMMENT",
+                match.group(0),
+                token.start_pos + offset,
+                token.line + newlines,
+                column,
+            )
+        )
+    return comments
+
+
+def _extract_comments(
+    tokens: Iterator[Token], comments: Deque[Token]
+) -> Iterator[Token]:
+    """Moves comments from the stream to the queue as the indenter
+    does not expect them"""
+    for token in tokens:
+        if token.type == "COMMENT":
+            comments.append(token)
+            continue
+        if token.type == "_NL":
+            comments += _comments_from_newline(token)
+        yield token
+
+
+def _split_signs(tokens: Iterator[Token]) -> Iterator[Token]:
+    """Splits signs from numbers following operands as otherwise e.g. 'a -1'
+    would be lexed as 2 consecutive operands"""
+    previous_type = None
+    for token in tokens:
+        if (
+            token.type in _SIGNED_NUMBER_TYPES
+            and token[0] in "+-"
+            and previous_type in _OPERAND_TYPES
+        ):
+            yield Token(
+                "PLUS" if token[0] == "+" else "MINUS",
+                token[0],
+                token.start_pos,
+                token.line,
+                token.column,
+                token.line,
+                token.column + 1,
+                token.start_pos + 1,
+            )
+            yield Token(
+                token.type,
+                token[1:],
+                token.start_pos + 1,
+                token.line,
+                token.column + 1,
+                token.end_line,
+                token.end_column,
+                token.end_pos,
+            )
+        else:
+            yield token
+        previous_type = token.type
+
+
+def _find_statements_to_reparse(
+    statements: List[Tree], first_changed_line: int, last_changed_line: int
+) -> Tuple[int, int]:
+    """Returns the range of top-level statements affected by the edit. The statement
+    preceding the edit is included as the edit may extend its body. The range
+    starts and ends at column 0 i.e. not in the middle of the line containing
+    multiple statements"""
+    statement_lines = [statement.meta.line for statement in statements]
+    first = max(bisect_left(statement_lines, first_changed_line) - 1, 0)
+    while first > 0 and statements[first].meta.column > 1:
+        first -= 1
+    last = max(bisect_right(statement_lines, last_changed_line), first + 1)
+    while last < len(statements) and statements[last].meta.column > 1:
+        last += 1
+    return first, last
+
+
+def _splice_statements(
+    tree: Tree,
+    fragment_tree: Tree,
+    replaced_statements: Tuple[int, int],
+    lines_delta: int,
+    remainder_pos: int,
+) -> None:
+    """Replaces the range of top-level statements of the tree with the statements
+    of the fragment and shifts the positions of statements following the range"""
+    first, last = replaced_statements
+    statements = tree.children
+    if first == 0:
+        _copy_positions(fragment_tree.meta, tree.meta, _BEGIN_POSITIONS)
+    if last < len(statements):
+        pos_delta = (
+            remainder_pos
+            + statements[last].meta.column
+            - 1
+            - statements[last].meta.start_pos
+        )
+        for statement in statements[last:]:
+            _shift_positions(statement, lines_delta, pos_delta)
+        _shift_meta(tree.meta, lines_delta, pos_delta, _END_POSITIONS)
+    else:
+        _copy_positions(fragment_tree.meta, tree.meta, _END_POSITIONS)
+    tree.children = statements[:first] + fragment_tree.children + statements[last:]
+
+
+def _shift_positions(tree: Tree, lines_delta: int, pos_delta: int) -> None:
+    for subtree in tree.iter_subtrees():
+        _shift_meta(
+            subtree.meta, lines_delta, pos_delta, _BEGIN_POSITIONS + _END_POSITIONS
         )
+        for child in subtree.children:
+            if isinstance(child, Token):
+                _shift_attribute(child, "line", lines_delta)
+                _shift_attribute(child, "end_line", lines_delta)
+                _shift_attribute(child, "start_pos", pos_delta)
+                _shift_attribute(child, "end_pos", pos_delta)
+
+
+def _shift_meta(
+    meta: Meta, lines_delta: int, pos_delta: int, positions: List[Tuple[str, str]]
+) -> None:
+    if meta.empty:
+        return
+    for line_attribute, pos_attribute in positions:
+        _shift_attribute(meta, line_attribute, lines_delta)
+        _shift_attribute(meta, pos_attribute, pos_delta)
+
+
+def _shift_attribute(an_object: object, attribute: str, delta: int) -> None:
+    # tokens made up by the indenter may lack some positions
+    value = getattr(an_object, attribute, None)
+    if value is not None:
+        setattr(an_object, attribute, value + delta)
+
+
+def _copy_positions(
+    source: Meta, destination: Meta, positions: List[Tuple[str, str]]
+) -> None:
+    if source.empty:
+        return
+    destination.empty = False
+    for line_attribute, pos_attribute in positions:
+        column_attribute = line_attribute.replace("line", "column")
+        for attribute in [line_attribute, column_attribute, pos_attribute]:
+            setattr(destination, attribute, getattr(source, attribute))
 
 
 def get_cache_directory() -> str:
@@ -120,4 +630,13 @@ def get_cache_directory() -> str:
     return directory
 
 
+def get_gdtoolkit_cache_directory() -> str:
+    """Returns the directory gdtoolkit caches are stored in - either the one
+    given in GDTOOLKIT_CACHE_DIR environment variable or the 'gdtoolkit'
+    subdirectory of the user's cache directory"""
+    return os.environ.get(CACHE_DIRECTORY_ENV_VAR) or os.path.join(
+        get_cache_directory(), "gdtoolkit"
+    )
+
+
 parser = Parser()
@@ -18,8 +18,15 @@ setup(
         "gdtoolkit.common",
         "gdtoolkit.gd2py",
         "gdtoolkit.gdradon",
+        "gdtoolkit.gdformatd",
     ],
-    package_data={"gdtoolkit.parser": ["gdscript.lark", "comments.lark"]},
+    package_data={
+        "gdtoolkit.parser": [
+            "gdscript.lark",
+            "comments.lark",
+            "grammar_caches/*.pickle",
+        ]
+    },
     entry_points={
         "console_scripts": [
             "gdparse = gdtoolkit.parser.__main__:main",
@@ -27,6 +34,8 @@ setup(
             "gdformat = gdtoolkit.formatter.__main__:main",
             "gd2py = gdtoolkit.gd2py.__main__:main",
             "gdradon = gdtoolkit.gdradon.__main__:main",
+            "gdformatd = gdtoolkit.gdformatd.__main__:main",
+            "gdtoolkit = gdtoolkit.__main__:main",
         ]
     },
     include_package_data=True,
@@ -1,4 +1,4 @@
-from typing import Any, List, Optional, Union, Iterator, Callable
+from typing import Any, Collection, List, Optional, Union, Iterator, Callable
 from lark.tree import Meta
 
 Node = Any  # TODO: use one from gdtoolkit and fix accordingly
@@ -7,19 +7,23 @@ Discard: Exception
 
 class Token(str):
     type: str
+    start_pos: int
     line: int
     value: Any  # TODO: remove and fix accordingly
     column: int
     end_line: int
     end_column: int
+    end_pos: int
     def __init__(
         self,
         type_: str,
         value: str,
+        start_pos: int = ...,
         line: int = ...,
         column: int = ...,
         end_line: int = ...,
         end_column: int = ...,
+        end_pos: int = ...,
     ): ...
 
 class Tree:
@@ -44,6 +48,11 @@ class Lark:
     def open(
         cls: Any, grammar_filename: str, rel_to: Optional[str] = ..., **options
     ) -> Lark: ...
+    def save(self, f: Any, exclude_options: Collection[str] = ...) -> None: ...
+    def _load(self, f: Any, **kwargs) -> Lark: ...
+    @classmethod
+    def _load_from_dict(cls: Any, data: Any, memo: Any, **kwargs) -> Lark: ...
+    def memo_serialize(self, types_to_memoize: List) -> Any: ...
 
 class UnexpectedInput: ...
 
@@ -1,4 +1,8 @@
 class Meta:
+    empty: bool
     line: int
     column: int
+    start_pos: int
     end_line: int
+    end_column: int
+    end_pos: int
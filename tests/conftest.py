@@ -1,6 +1,7 @@
 import pytest
 
 from gdtoolkit.parser import parser
+from gdtoolkit.parser.parser import CACHE_DIRECTORY_ENV_VAR
 
 
 def pytest_configure(config):
@@ -16,3 +17,11 @@ def pytest_configure(config):
 @pytest.fixture(scope="session", autouse=True)
 def disable_parser_caching():
     parser.disable_grammar_caching()
+
+
+@pytest.fixture(name="gdtoolkit_cache_dirpath", autouse=True)
+def fixture_gdtoolkit_cache_dirpath(monkeypatch, tmp_path_factory):
+    """Keeps executables run by tests away from the user cache"""
+    cache_dirpath = tmp_path_factory.mktemp("gdtoolkit-cache")
+    monkeypatch.setenv(CACHE_DIRECTORY_ENV_VAR, str(cache_dirpath))
+    return cache_dirpath
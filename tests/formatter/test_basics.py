@@ -73,3 +73,13 @@ def test_indentation_using_spaces():
         ]
     )
     format_and_compare(input_code, expected_output_code, spaces_for_indent=3)
+
+
+def test_comments_reattachment_to_many_lines():
+    input_code = "func f():\n" + "".join(
+        f"\tvar a{i}=[1,2] # inline {i}\n\t# standalone {i}\n" for i in range(100)
+    )
+    expected_output_code = "func f():\n" + "".join(
+        f"\tvar a{i} = [1, 2]  # inline {i}\n\t# standalone {i}\n" for i in range(100)
+    )
+    format_and_compare(input_code, expected_output_code)
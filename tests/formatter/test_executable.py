@@ -1,5 +1,10 @@
 import subprocess
 
+import pytest
+
+from gdtoolkit.common.cache import ResultCache
+from gdtoolkit.formatter import DEFAULT_CONFIG
+
 from ..common import write_file
 
 
@@ -201,3 +206,146 @@ def test_formatting_with_line_length_passed_as_argument(tmp_path):
         capture_output=True,
     )
     assert outcome.returncode == 1
+
+
+def test_valid_files_formatting_in_parallel(tmp_path):
+    dummy_files = [
+        write_file(tmp_path, f"script{i}.gd", "pass" if i % 2 == 0 else "pass;pass")
+        for i in range(6)
+    ]
+    outcome = subprocess.run(
+        ["gdformat", "--jobs=3", *dummy_files], check=False, capture_output=True
+    )
+    assert outcome.returncode == 0
+    assert outcome.stdout.decode().splitlines() == [
+        f"reformatted {dummy_file}" for dummy_file in dummy_files
+    ] + ["6 files reformatted, 0 files left unchanged."]
+    assert len(outcome.stderr.decode().splitlines()) == 0
+
+
+@pytest.mark.parametrize("jobs", ["abc", "0", "-1"])
+def test_invalid_jobs_num(tmp_path, jobs):
+    dummy_file = write_file(tmp_path, "script.gd", "pass")
+    outcome = subprocess.run(
+        ["gdformat", f"--jobs={jobs}", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 1
+    assert len(outcome.stderr.decode().splitlines()) == 1
+
+
+def test_valid_unformatted_files_checking_in_parallel_with_invalid_one_keepgoing(
+    tmp_path,
+):
+    dummy_file = write_file(tmp_path, "script.gd", "pass\n")
+    dummy_file_2 = write_file(tmp_path, "script2.gd", "pass x")  # invalid
+    dummy_file_3 = write_file(tmp_path, "script3.gd", "pass;pass")
+    dummy_file_4 = write_file(tmp_path, "script4.gd", "var x")
+    outcome = subprocess.run(
+        [
+            "gdformat",
+            "--check",
+            "-j",
+            "2",
+            dummy_file,
+            dummy_file_2,
+            dummy_file_3,
+            dummy_file_4,
+        ],
+        check=False,
+        capture_output=True,
+    )
+    assert outcome.returncode == 1
+    stderr_lines = outcome.stderr.decode().splitlines()
+    assert stderr_lines[0] == f"{dummy_file_2}:"
+    assert stderr_lines[-3:] == [
+        f"would reformat {dummy_file_3}",
+        f"would reformat {dummy_file_4}",
+        "2 files would be reformatted, 2 files would be left unchanged.",
+    ]
+    assert "Traceback" not in outcome.stderr.decode()
+
+
+def test_valid_unformatted_file_checking_wo_cache(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "pass;var x")
+    for _ in range(2):
+        outcome = subprocess.run(
+            ["gdformat", "--check", "--no-cache", dummy_file],
+            check=False,
+            capture_output=True,
+        )
+        assert outcome.returncode != 0
+        assert len(outcome.stderr.decode().splitlines()) == 2
+
+
+def test_formatting_verdicts_are_cached(tmp_path, gdtoolkit_cache_dirpath):
+    dummy_file = write_file(tmp_path, "script.gd", "pass\n")
+    assert _formatter_cache(gdtoolkit_cache_dirpath).get("pass\n") is None
+    outcome = subprocess.run(
+        ["gdformat", "--check", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 0
+    assert _formatter_cache(gdtoolkit_cache_dirpath).get("pass\n") == ""
+
+
+def test_cached_formatting_verdicts_are_honored(tmp_path, gdtoolkit_cache_dirpath):
+    dummy_file = write_file(tmp_path, "script.gd", "pass;pass")
+    _formatter_cache(gdtoolkit_cache_dirpath).put("pass;pass")
+    outcome = subprocess.run(
+        ["gdformat", "--check", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 0
+    assert outcome.stdout.decode().splitlines() == ["1 file would be left unchanged"]
+    outcome = subprocess.run(
+        ["gdformat", "--check", "--no-cache", dummy_file],
+        check=False,
+        capture_output=True,
+    )
+    assert outcome.returncode == 1
+
+
+def _formatter_cache(cache_dirpath):
+    # the config gdformat keys its verdicts with when run w/o options
+    return ResultCache(
+        "gdformat",
+        {
+            "line_length": DEFAULT_CONFIG["line_length"],
+            "use_spaces": DEFAULT_CONFIG["use_spaces"],
+            "safety_checks": DEFAULT_CONFIG["safety_checks"],
+        },
+        cache_dirpath=str(cache_dirpath),
+    )
+
+
+def test_formatting_of_line_range(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "var a=1\nvar b=2\n")
+    outcome = subprocess.run(
+        ["gdformat", "--lines=2:2", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 0
+    with open(dummy_file, "r", encoding="utf-8") as handle:
+        assert handle.read() == "var a=1\nvar b = 2\n"
+
+
+def test_line_range_with_many_files(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "var a=1\n")
+    other_dummy_file = write_file(tmp_path, "other.gd", "var a=1\n")
+    for paths in [[dummy_file, other_dummy_file], [str(tmp_path)]]:
+        outcome = subprocess.run(
+            ["gdformat", "--lines=1:1", *paths], check=False, capture_output=True
+        )
+        assert outcome.returncode == 1
+        assert len(outcome.stderr.decode().splitlines()) > 0
+    with open(dummy_file, "r", encoding="utf-8") as handle:
+        assert handle.read() == "var a=1\n"
+
+
+@pytest.mark.parametrize("line_range", ["2", "3:2", "0:1", "0:0"])
+def test_invalid_line_range(tmp_path, line_range):
+    dummy_file = write_file(tmp_path, "script.gd", "pass")
+    outcome = subprocess.run(
+        ["gdformat", f"--lines={line_range}", dummy_file],
+        check=False,
+        capture_output=True,
+    )
+    assert outcome.returncode == 1
+    assert len(outcome.stderr.decode().splitlines()) > 0
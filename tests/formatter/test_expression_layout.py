@@ -0,0 +1,39 @@
+from lark import Token
+
+from gdtoolkit.common.utils import get_line
+from gdtoolkit.formatter.comments import gather_standalone_comments
+from gdtoolkit.formatter.expression_layout import ExpressionLayout
+from gdtoolkit.formatter.expression_to_str import (
+    expression_to_str,
+    expression_to_str_cache,
+    text_width,
+)
+from gdtoolkit.parser import parser
+
+
+def test_flat_forms_of_nested_expressions_are_converted_once():
+    code = "var x = [[1, [2, 3]], {'a': f(4, -5)}]\n"
+    expression = next(parser.parse(code, gather_metadata=True).find_data("expr"))
+    nodes_num = sum(
+        1 + sum(isinstance(child, Token) for child in subtree.children)
+        for subtree in expression.iter_subtrees()
+    )
+    layout = ExpressionLayout([])
+    with expression_to_str_cache() as cache:
+        for node in expression.iter_subtrees_topdown():
+            assert layout.flat_width(node) == text_width(expression_to_str(node))
+        for node in expression.iter_subtrees_topdown():
+            assert layout.flat_string(node) == expression_to_str(node)
+    assert cache.misses == nodes_num
+
+
+def test_standalone_comments_force_multiple_lines_of_enclosing_expressions():
+    code = "var x = [\n\t[1],\n\t# comment\n\t[2, 3]\n]\n"
+    parse_tree, comment_parse_tree = parser.parse_with_comments(code)
+    layout = ExpressionLayout(gather_standalone_comments(code, comment_parse_tree))
+    outer_array, first_array, second_array = sorted(
+        parse_tree.find_data("array"), key=get_line
+    )
+    assert layout.forces_multiple_lines(outer_array)
+    assert not layout.forces_multiple_lines(first_array)
+    assert not layout.forces_multiple_lines(second_array)
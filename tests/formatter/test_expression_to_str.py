@@ -0,0 +1,73 @@
+import importlib
+from collections import Counter
+
+from gdtoolkit.formatter import (
+    format_code,
+    check_formatting_safety,
+    expression_to_str_cache,
+)
+from gdtoolkit.formatter.expression_to_str import expression_to_str, expression_width
+from gdtoolkit.parser import parser
+
+CODE = """class X:
+	var a = foo.bar(1, 2).baz[3].qux(func(x): return '\t' + x)
+	func f():
+		if a.b.c(d, e) and (f or g):
+			return {'a': [1, 2, 3], 'b': $Node/path}
+"""
+
+
+def test_every_node_is_converted_to_string_at_most_once(monkeypatch):
+    module = importlib.import_module("gdtoolkit.formatter.expression_to_str")
+    conversions = Counter()
+    # pylint: disable-next=protected-access
+    original_expression_to_str = module._expression_to_str
+
+    def counting_expression_to_str(expression):
+        conversions[id(expression)] += 1
+        return original_expression_to_str(expression)
+
+    monkeypatch.setattr(module, "_expression_to_str", counting_expression_to_str)
+    code_parse_tree, comment_parse_tree = parser.parse_with_comments(CODE)
+    with expression_to_str_cache() as cache:
+        formatted_code = format_code(
+            CODE,
+            30,
+            parse_tree=code_parse_tree,
+            comment_parse_tree=comment_parse_tree,
+        )
+        check_formatting_safety(
+            CODE,
+            formatted_code,
+            30,
+            given_code_parse_tree=code_parse_tree,
+            given_code_comment_parse_tree=comment_parse_tree,
+        )
+    assert max(conversions.values()) == 1
+    assert cache.misses == len(conversions)
+    assert 0.0 < cache.hit_rate < 1.0
+
+
+def test_nested_caches_are_shared():
+    with expression_to_str_cache() as outer_cache:
+        with expression_to_str_cache() as inner_cache:
+            assert inner_cache is outer_cache
+
+
+def test_cached_results_are_the_same_as_uncached():
+    parse_tree = parser.parse(CODE)
+    expressions = list(parse_tree.find_data("expr"))
+    expected = [(expression_to_str(e), expression_width(e)) for e in expressions]
+    with expression_to_str_cache() as cache:
+        assert [
+            (expression_to_str(e), expression_width(e)) for e in expressions
+        ] == expected
+        misses = cache.misses
+        assert [
+            (expression_to_str(e), expression_width(e)) for e in expressions
+        ] == expected
+    assert cache.misses == misses
+    assert ('"\t"', 6) in [
+        (expression_to_str(s), expression_width(s))
+        for s in parse_tree.find_data("string")
+    ]
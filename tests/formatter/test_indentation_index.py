@@ -0,0 +1,43 @@
+import pytest
+
+from gdtoolkit.formatter.indentation_index import IndentationIndex
+
+CODE_LINES = [
+    "",
+    "func foo():",
+    "\tif x:",
+    "\t\tpass",
+    "",
+    "\t\t# comment",
+    "\t# comment",
+    "\tpass",
+    "",
+    "",
+    "func bar():",
+    "    pass",
+    "  ",
+    "",
+]
+
+
+@pytest.mark.parametrize(
+    "previously_processed_line_number,indent,expected_dedent_line_number",
+    [
+        (3, 8, 6),
+        (3, 4, 8),
+        (7, 4, 8),
+        (11, 4, 12),
+        (11, 0, 14),
+        (13, 4, 14),
+    ],
+)
+def test_dedent_line_number(
+    previously_processed_line_number, indent, expected_dedent_line_number
+):
+    indentation_index = IndentationIndex(CODE_LINES)
+    assert (
+        indentation_index.find_dedent_line_number(
+            previously_processed_line_number, indent
+        )
+        == expected_dedent_line_number
+    )
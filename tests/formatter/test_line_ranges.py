@@ -0,0 +1,116 @@
+import pytest
+
+import gdtoolkit.formatter
+from gdtoolkit.formatter import (
+    format_code,
+    format_code_in_line_ranges,
+    check_formatting_safety,
+)
+from gdtoolkit.formatter.exceptions import FormattingStabilityViolation
+from gdtoolkit.formatter.line_ranges import find_statements_in_line_ranges
+
+CODE = """extends Node
+var a=1
+var b   =  2
+@export
+var c=[1,2]
+# comment
+func f():
+	var x=[1,2]
+
+	return x
+func g( ):
+	pass
+"""
+
+
+def test_statements_intersecting_line_ranges_are_merged_when_adjacent():
+    assert find_statements_in_line_ranges(CODE, [(3, 3)]) == [(3, 3)]
+    assert find_statements_in_line_ranges(CODE, [(5, 5)]) == [(4, 5)]
+    assert find_statements_in_line_ranges(CODE, [(9, 9)]) == [(7, 10)]
+    assert len(find_statements_in_line_ranges(CODE, [(6, 6)])) == 0
+    assert find_statements_in_line_ranges(CODE, [(2, 3), (10, 11)]) == [
+        (2, 3),
+        (7, 12),
+    ]
+
+
+@pytest.mark.parametrize(
+    "line_ranges,expected_output_code",
+    [
+        (
+            [(3, 3)],
+            CODE.replace("var b   =  2", "var b = 2"),
+        ),
+        (
+            [(4, 4)],
+            CODE.replace("@export\nvar c=[1,2]", "@export var c = [1, 2]"),
+        ),
+        (
+            [(8, 8), (12, 12)],
+            CODE.replace("\tvar x=[1,2]", "\tvar x = [1, 2]").replace(
+                "\treturn x\nfunc g( ):", "\treturn x\n\n\nfunc g():"
+            ),
+        ),
+    ],
+)
+def test_only_statements_in_line_ranges_are_formatted(
+    line_ranges, expected_output_code
+):
+    formatted_code = format_code(CODE, 100, line_ranges=line_ranges)
+    assert formatted_code == expected_output_code
+    check_formatting_safety(CODE, formatted_code, 100, line_ranges=line_ranges)
+
+
+def test_formatting_outside_of_line_ranges_is_detected():
+    formatted_code = format_code(CODE, 100)
+    with pytest.raises(FormattingStabilityViolation):
+        check_formatting_safety(CODE, formatted_code, 100, line_ranges=[(3, 3)])
+
+
+def test_formatted_fragments_are_checked_without_formatting_them_again(monkeypatch):
+    formatted_code, formatted_fragments = format_code_in_line_ranges(
+        CODE, 100, [(3, 3), (8, 8)]
+    )
+    assert formatted_fragments == [
+        ("var b   =  2\n", "var b = 2\n"),
+        (
+            "func f():\n\tvar x=[1,2]\n\n\treturn x\n",
+            "func f():\n\tvar x = [1, 2]\n\n\treturn x\n",
+        ),
+    ]
+
+    def format_again(*_):
+        raise AssertionError("fragments formatted again")
+
+    monkeypatch.setattr(gdtoolkit.formatter, "format_code_in_line_ranges", format_again)
+    check_formatting_safety(
+        CODE,
+        formatted_code,
+        100,
+        line_ranges=[(3, 3), (8, 8)],
+        formatted_fragments=formatted_fragments,
+    )
+    with pytest.raises(FormattingStabilityViolation):
+        check_formatting_safety(
+            CODE,
+            format_code(CODE, 100),
+            100,
+            line_ranges=[(3, 3), (8, 8)],
+            formatted_fragments=formatted_fragments,
+        )
+
+
+def test_enum_with_body_in_next_line_is_formatted_as_a_whole():
+    code = "enum Foo\n{A,B}\nvar x=1\n"
+    assert find_statements_in_line_ranges(code, [(1, 1)]) == [(1, 2)]
+    formatted_code = format_code(code, 100, line_ranges=[(1, 1)])
+    assert formatted_code == "enum Foo { A, B }\nvar x=1\n"
+    check_formatting_safety(code, formatted_code, 100, line_ranges=[(1, 1)])
+
+
+def test_line_endings_are_normalized_outside_of_line_ranges():
+    code = CODE.replace("\n", "\r\n")
+    formatted_code = format_code(code, 100, line_ranges=[(3, 3)])
+    assert formatted_code == CODE.replace("var b   =  2", "var b = 2")
+    check_formatting_safety(code, formatted_code, 100, line_ranges=[(3, 3)])
@@ -0,0 +1,68 @@
+import pytest
+
+from gdtoolkit.formatter import check_tree_invariant, check_comment_persistence
+from gdtoolkit.formatter.exceptions import (
+    TreeInvariantViolation,
+    CommentPersistenceViolation,
+)
+
+
+# fmt: off
+@pytest.mark.parametrize("given_code,formatted_code", [
+("var x = (1)", "var x = 1"),
+("var x = -(1)", "var x = -1"),
+("var x = 'a'", 'var x = "a"'),
+("signal s()", "signal s"),
+("@tool\nvar x", "var x"),
+("func f():\n    return (1 + 2) * 3", "func f():\n\treturn (1 + 2) * 3"),
+])
+# fmt: on
+def test_tree_invariant_holds(given_code, formatted_code):
+    check_tree_invariant(given_code, formatted_code)
+
+
+# fmt: off
+@pytest.mark.parametrize("given_code,formatted_code", [
+("var x = 1", "var x = 2"),
+("var x = 1 + 2 * 3", "var x = (1 + 2) * 3"),
+("func f():\n\tpass", "func f():\n\tpass\n\tpass"),
+("var x = 'a'", 'var x = "b"'),
+])
+# fmt: on
+def test_tree_invariant_violation(given_code, formatted_code):
+    with pytest.raises(TreeInvariantViolation):
+        check_tree_invariant(given_code, formatted_code)
+
+
+def test_tree_invariant_violation_diff_is_localized():
+    body = "\n".join(f"var x{i} = {i}" for i in range(100))
+    given_code = body + "\nvar y = [1, 2, 3]\n" + body
+    formatted_code = body + "\nvar y = [1, 2, 4]\n" + body
+    with pytest.raises(TreeInvariantViolation) as exception_info:
+        check_tree_invariant(given_code, formatted_code)
+    diff_lines = exception_info.value.diff.splitlines()
+    assert "-3" in diff_lines
+    assert "+4" in diff_lines
+    assert not any("x0" in line or "x99" in line for line in diff_lines)
+
+
+# fmt: off
+@pytest.mark.parametrize("given_code,formatted_code", [
+("var x = 1 # a", "var x = 1  # a"),
+("# a\n# a\nvar x", "# a\n# a\nvar x\n"),
+("var x = [ # a\n  1, # b\n]", "var x = [1]  # a  # b"),
+("var x = [ # a # b\n  1, # c\n]", "var x = [1]  # a # b  # c"),
+("var x = [ # a  # b\n  1, # b\n]", "var x = [1]  # a  # b  # b"),
+("var x # a#b", "var x  # a#b"),
+])
+# fmt: on
+def test_comment_persistence_holds(given_code, formatted_code):
+    check_comment_persistence(given_code, formatted_code)
+
+
+def test_comment_persistence_violation_reports_all_missing_comments():
+    given_code = "# a\n# b\nvar x # c\nvar y # d"
+    formatted_code = "# b\nvar x\nvar y  # d"
+    with pytest.raises(CommentPersistenceViolation) as exception_info:
+        check_comment_persistence(given_code, formatted_code)
+    assert exception_info.value.missing_comments == ["# a", "# c"]
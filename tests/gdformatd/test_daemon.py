@@ -0,0 +1,155 @@
+import json
+import socket
+import threading
+import http.client
+import urllib.request
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+
+import gdtoolkit.gdformatd
+from gdtoolkit.gdformatd import create_executor, create_server, format_request
+
+
+@pytest.fixture(name="server_url", scope="module")
+def fixture_server_url():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        server = create_server(executor, host="localhost", port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield "http://{}:{}/".format(*server.server_address[:2])
+        server.shutdown()
+        server.server_close()
+
+
+def _post(url, code, headers=None):
+    request = urllib.request.Request(
+        url, data=code.encode("utf-8"), headers=headers or {}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as error:
+        return error.code, error.read().decode("utf-8")
+
+
+def test_formatting(server_url):
+    assert _post(server_url, "pass;pass") == (200, "pass\npass\n")
+
+
+def test_formatting_already_formatted_code(server_url):
+    assert _post(server_url, "pass\n") == (204, "")
+
+
+def test_formatting_with_options(server_url):
+    code = "func foo():\n\tvar x = [1, 2, 3]\n"
+    status, formatted_code = _post(
+        server_url,
+        code,
+        {"X-Line-Length": "15", "X-Use-Spaces": "2", "X-Safety-Checks": "1"},
+    )
+    assert status == 200
+    assert formatted_code == "func foo():\n  var x = [\n    1, 2, 3\n  ]\n"
+
+
+def test_formatting_with_config_of_given_directory(server_url, tmp_path):
+    (tmp_path / "gdformatrc").write_text("line_length: 15\nuse_spaces: 4\n")
+    directory_path = tmp_path / "sub dir ż"
+    directory_path.mkdir()
+    code = "func foo():\n\tvar x = [1, 2, 3]\n"
+    status, formatted_code = _post(
+        server_url,
+        code,
+        {
+            "X-Config-Directory": urllib.parse.quote(str(directory_path)),
+            "X-Use-Spaces": "2",
+        },
+    )
+    assert status == 200
+    assert formatted_code == "func foo():\n  var x = [\n    1, 2, 3\n  ]\n"
+
+
+def test_formatting_with_invalid_config_of_given_directory(server_url, tmp_path):
+    (tmp_path / "gdformatrc").write_text("line_length: [\n")
+    status, body = _post(
+        server_url, "pass", {"X-Config-Directory": urllib.parse.quote(str(tmp_path))}
+    )
+    assert status == 400
+    assert json.loads(body)["error"] == "InvalidRequest"
+
+
+def test_formatting_invalid_code(server_url):
+    status, body = _post(server_url, "pass x")
+    assert status == 400
+    error = json.loads(body)
+    assert error["error"] == "UnexpectedToken"
+    assert error["line"] == 1
+
+
+def test_formatting_w_invalid_options(server_url):
+    status, body = _post(server_url, "pass", {"X-Line-Length": "x"})
+    assert status == 400
+    assert json.loads(body)["error"] == "InvalidRequest"
+
+
+def test_formatting_w_unsupported_protocol_version(server_url):
+    status, _ = _post(server_url, "pass", {"X-Protocol-Version": "2"})
+    assert status == 501
+
+
+def test_formatting_many_requests_at_once(server_url):
+    codes = [
+        "".join(f"var x{j} = [ # c{j}\n\t{i}\n]\n" for j in range(20)) for i in range(8)
+    ]
+    with ThreadPoolExecutor(max_workers=len(codes)) as executor:
+        responses = list(executor.map(partial(_post, server_url), codes))
+    assert responses == [
+        (200, "".join(f"var x{j} = [{i}]  # c{j}\n" for j in range(20)))
+        for i in range(len(codes))
+    ]
+
+
+def test_formatting_failure_is_reported(monkeypatch):
+    def failing_format_code(*_args, **_kwargs):
+        raise RuntimeError("failure")
+
+    monkeypatch.setattr(gdtoolkit.gdformatd, "format_code", failing_format_code)
+    status, body = format_request("pass\n", 100, None, False)
+    assert status == 500
+    assert json.loads(body)["error"] == "RuntimeError"
+
+
+def test_unix_socket_path_of_regular_file_is_left_intact(tmp_path):
+    file_path = tmp_path / "script.gd"
+    file_path.write_text("pass\n")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(FileExistsError):
+            create_server(executor, unix_socket_path=str(file_path))
+    assert file_path.read_text() == "pass\n"
+
+
+def test_formatting_using_unix_socket_and_worker_processes(tmp_path):
+    socket_path = str(tmp_path / "gdformatd.sock")
+    with create_executor(1) as executor:
+        server = create_server(executor, unix_socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+
+            class UnixHTTPConnection(http.client.HTTPConnection):
+                def connect(self):
+                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self.sock.connect(socket_path)
+
+            connection = UnixHTTPConnection("localhost")
+            connection.request("POST", "/", body=b"pass;pass")
+            response = connection.getresponse()
+            assert response.status == 200
+            assert response.read() == b"pass\npass\n"
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -1,4 +1,5 @@
-from gdtoolkit.linter import lint_code
+from gdtoolkit.linter import lint_code, lint_parsed_file, DEFAULT_CONFIG
+from gdtoolkit.common.parsed_file import ParsedFile
 
 
 def test_empty_code_linting():
@@ -23,3 +24,17 @@ def test_trailing_comma_in_params_list():
     existing_units,
     navigation_map_rid,):pass"""
     lint_code(code)
+
+
+def test_ast_is_not_built_when_checks_using_it_are_disabled():
+    code = "func foo(a, b, c):\n\treturn a\n"
+    config = DEFAULT_CONFIG.copy()
+    config["disable"] = [
+        "max-public-methods",
+        "max-returns",
+        "function-arguments-number",
+        "class-definitions-order",
+    ]
+    parsed_file = ParsedFile(code)
+    assert len(lint_parsed_file(parsed_file, config)) == 2
+    assert "ast" not in vars(parsed_file)
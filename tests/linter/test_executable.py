@@ -1,4 +1,10 @@
+import json
 import subprocess
+from dataclasses import asdict
+
+from gdtoolkit.common.cache import ResultCache
+from gdtoolkit.linter import DEFAULT_CONFIG
+from gdtoolkit.linter.problem import Problem
 
 from ..common import write_file
 
@@ -57,3 +63,67 @@ def test_linter_problem_report_in_global_scope(tmp_path):
     assert len(outcome.stdout.decode().splitlines()) == 0
     assert len(outcome.stderr.decode().splitlines()) >= 0
     assert "Definition out of order in global scope" in outcome.stderr.decode()
+
+
+def test_linting_in_parallel_keeps_file_order(tmp_path):
+    dummy_files = [
+        write_file(tmp_path, f"script{i}.gd", "var Xx = 1\n" if i % 2 == 0 else "pass")
+        for i in range(6)
+    ]
+    outcome = subprocess.run(
+        ["gdlint", "--jobs=3", *dummy_files], check=False, capture_output=True
+    )
+    assert outcome.returncode == 1
+    assert outcome.stderr.decode().splitlines() == [
+        f'{dummy_file}:1: Error: Class-scope variable name "Xx" is not valid'
+        " (class-variable-name)"
+        for dummy_file in dummy_files[::2]
+    ] + ["Failure: 3 problems found"]
+
+
+def test_linting_problems_are_cached(tmp_path, gdtoolkit_cache_dirpath):
+    code = "var Xx = 1\nvar Yy = 1\n"
+    dummy_file = write_file(tmp_path, "script.gd", code)
+    outcome = subprocess.run(["gdlint", dummy_file], check=False, capture_output=True)
+    assert outcome.returncode == 1
+    assert "Failure: 2 problems found" in outcome.stderr.decode()
+    cached_problems = json.loads(_linter_cache(gdtoolkit_cache_dirpath).get(code))
+    assert [problem["name"] for problem in cached_problems] == [
+        "class-variable-name",
+        "class-variable-name",
+    ]
+
+
+def test_cached_linting_problems_are_reported(tmp_path, gdtoolkit_cache_dirpath):
+    dummy_file = write_file(tmp_path, "script.gd", "pass\n")
+    _linter_cache(gdtoolkit_cache_dirpath).put(
+        "pass\n",
+        json.dumps(
+            [asdict(Problem("seeded-problem", "Seeded problem", line=1, column=0))]
+        ),
+    )
+    outcome = subprocess.run(["gdlint", dummy_file], check=False, capture_output=True)
+    assert outcome.returncode == 1
+    assert outcome.stderr.decode().splitlines() == [
+        f"{dummy_file}:1: Error: Seeded problem (seeded-problem)",
+        "Failure: 1 problem found",
+    ]
+    outcome = subprocess.run(
+        ["gdlint", "--no-cache", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 0
+
+
+def _linter_cache(cache_dirpath):
+    # the config gdlint keys its problems with when there is no gdlintrc
+    return ResultCache("gdlint", dict(DEFAULT_CONFIG), cache_dirpath=str(cache_dirpath))
+
+
+def test_linting_cache_accounts_for_config_changes(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "var Xx = 1\n")
+    assert subprocess.run(["gdlint", dummy_file], check=False).returncode == 1
+    write_file(tmp_path, "gdlintrc", "disable: [class-variable-name]\n")
+    assert (
+        subprocess.run(["gdlint", dummy_file], cwd=tmp_path, check=False).returncode
+        == 0
+    )
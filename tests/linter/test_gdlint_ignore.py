@@ -81,3 +81,69 @@ func some_Button_pressed():
 ])
 def test_linting_nok_when_problem_enabled_again(code):
     simple_nok_check(code, check_name='function-name', line=6)
+
+
+@pytest.mark.parametrize('code', [
+"""
+# gdlint: enable=function-name
+func some_button_pressed():
+    pass
+# gdlint: disable=function-name
+func some_Button_pressed():
+    pass
+""",
+"""
+# gdlint: disable=function-name
+func some_Button_pressed():
+    pass
+# gdlint: enable=function-name
+func some_button_pressed():
+    pass
+# gdlint: disable=function-name
+func some_Button_pressed():
+    pass
+""",
+"""
+# gdlint: disable=function-name
+# gdlint: disable=function-name
+func some_Button_pressed():
+    pass
+""",
+])
+def test_linting_ok_when_problem_disabled_after_enabling(code):
+    simple_ok_check(code)
+
+
+@pytest.mark.parametrize('code', [
+"""
+# gdlint: disable=function-name
+func some_Button_pressed():
+    pass
+# gdlint: disable=function-name
+func some_Button_pressed():
+    pass
+# gdlint: enable=function-name
+func some_Button_pressed():
+    pass
+""",
+])
+def test_linting_nok_when_overlapping_disables_enabled_again(code):
+    simple_nok_check(code, check_name='function-name', line=9)
+
+
+@pytest.mark.parametrize('code,line', [
+("""
+var s = "# gdlint: disable=function-name"
+func some_Button_pressed():
+    pass
+""", 3),
+("""
+var s = \"\"\"
+# gdlint: ignore=function-name
+\"\"\"
+func some_Button_pressed():
+    pass
+""", 5),
+])
+def test_linting_nok_when_directive_is_in_string(code, line):
+    simple_nok_check(code, check_name='function-name', line=line)
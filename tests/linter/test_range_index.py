@@ -0,0 +1,15 @@
+from gdtoolkit.linter.range_index import RangeIndex
+from gdtoolkit.linter.types import Range
+
+
+def test_lines_within_ranges_are_contained():
+    index = RangeIndex([Range(10, 20), Range(1, 3), Range(15, 25), Range(4, 4)])
+    assert [line for line in range(0, 30) if line in index] == list(range(1, 5)) + list(
+        range(10, 26)
+    )
+
+
+def test_empty_ranges_are_skipped():
+    index = RangeIndex([Range(5, 4)])
+    assert 4 not in index
+    assert 5 not in index
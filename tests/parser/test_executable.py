@@ -1,3 +1,4 @@
+import json
 import subprocess
 
 from ..common import write_file
@@ -67,3 +68,23 @@ func test():
     assert outcome.returncode == 1
     assert len(outcome.stdout.decode().splitlines()) == 0
     assert len(outcome.stderr.decode().splitlines()) > 0
+
+
+def test_printing_outline_as_json():
+    code = b"class_name X\nfunc foo():\n\tvar a\nclass Y:\n\tconst B = 1\n"
+    outcome = subprocess.run(
+        ["gdparse", "--outline", "--json", "-"],
+        input=code,
+        check=False,
+        capture_output=True,
+    )
+    assert outcome.returncode == 0
+    assert [
+        (declaration["kind"], declaration["name"], declaration["line"])
+        for declaration in json.loads(outcome.stdout.decode())["STDIN"]
+    ] == [
+        ("class_name", "X", 1),
+        ("func", "foo", 2),
+        ("class", "Y", 4),
+        ("const", "B", 5),
+    ]
@@ -0,0 +1,149 @@
+import os
+import sys
+import importlib
+import subprocess
+
+import pytest
+
+from gdtoolkit.parser.parser import (
+    Parser,
+    PREBUILT_GRAMMAR_CACHE_DIRPATH,
+    CACHE_DIRECTORY_ENV_VAR,
+)
+
+CODE = "class X:\n\tvar a = func(): return 1 # comment\n"
+
+
+@pytest.fixture(name="cache_dirpath")
+def fixture_cache_dirpath(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        importlib.import_module("gdtoolkit.parser.parser"),
+        "PREBUILT_GRAMMAR_CACHE_DIRPATH",
+        str(tmp_path / "prebuilt"),
+    )
+    monkeypatch.setenv(CACHE_DIRECTORY_ENV_VAR, str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture(name="expected_outcome", scope="module")
+def fixture_expected_outcome():
+    a_parser = Parser()
+    a_parser.disable_grammar_caching()
+    return _parse_all(a_parser)
+
+
+def _parse_all(a_parser):
+    return (
+        a_parser.parse(CODE),
+        a_parser.parse_with_comments(CODE),
+        a_parser.parse_comments(CODE),
+    )
+
+
+def _cache_filepaths(dirpath):
+    return [
+        os.path.join(root, file_name)
+        for root, _, file_names in os.walk(dirpath)
+        for file_name in file_names
+    ]
+
+
+def test_prebuilt_grammar_caches_are_up_to_date(tmp_path):
+    # run 'make grammar-caches' if this fails after changing the grammar
+    Parser().warm_cache(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.listdir(PREBUILT_GRAMMAR_CACHE_DIRPATH)
+    )
+
+
+def test_parsers_loaded_from_prebuilt_caches_parse_the_same_way(expected_outcome):
+    assert _parse_all(Parser()) == expected_outcome
+
+
+def test_user_cache_is_written_and_reused(cache_dirpath, expected_outcome):
+    _parse_all(Parser())
+    cache_filepaths = _cache_filepaths(cache_dirpath)
+    assert len(cache_filepaths) == 2
+    assert not any(path.endswith(".tmp") for path in cache_filepaths)
+    assert _parse_all(Parser()) == expected_outcome
+    assert _cache_filepaths(cache_dirpath) == cache_filepaths
+
+
+def test_disabled_grammar_caching_does_not_write_cache(cache_dirpath):
+    a_parser = Parser()
+    a_parser.disable_grammar_caching()
+    _parse_all(a_parser)
+    assert not os.path.exists(cache_dirpath)
+
+
+def test_corrupted_cache_is_overwritten(cache_dirpath, expected_outcome):
+    _parse_all(Parser())
+    for cache_filepath in _cache_filepaths(cache_dirpath):
+        with open(cache_filepath, "wb") as handle:
+            handle.write(b"corrupted")
+    assert _parse_all(Parser()) == expected_outcome
+    for cache_filepath in _cache_filepaths(cache_dirpath):
+        assert os.path.getsize(cache_filepath) > len(b"corrupted")
+
+
+@pytest.fixture(name="standalone_modules_dirpath", scope="module")
+def fixture_standalone_modules_dirpath(tmp_path_factory):
+    dirpath = tmp_path_factory.mktemp("standalone")
+    Parser().generate_standalone_parsers(str(dirpath))
+    return dirpath
+
+
+@pytest.fixture(name="standalone_modules")
+def fixture_standalone_modules(monkeypatch, standalone_modules_dirpath):
+    """Makes generated standalone parser modules importable from the parser
+    package"""
+    modules = []
+    for module_filename in os.listdir(standalone_modules_dirpath):
+        if not module_filename.endswith(".py"):
+            continue
+        module_name = "gdtoolkit.parser.{}".format(module_filename[:-3])
+        spec = importlib.util.spec_from_file_location(
+            module_name, standalone_modules_dirpath / module_filename
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        monkeypatch.setitem(sys.modules, module_name, module)
+        modules.append(module)
+    assert len(modules) == 2
+    return modules
+
+
+@pytest.mark.usefixtures("standalone_modules")
+def test_standalone_parsers_are_preferred(cache_dirpath, expected_outcome):
+    assert _parse_all(Parser()) == expected_outcome
+    assert not os.path.exists(cache_dirpath)
+
+
+def test_stale_standalone_parsers_are_ignored(
+    monkeypatch, standalone_modules, cache_dirpath, expected_outcome
+):
+    for module in standalone_modules:
+        monkeypatch.setattr(module, "GRAMMAR_CACHE_KEY", "stale")
+    assert _parse_all(Parser()) == expected_outcome
+    assert len(_cache_filepaths(cache_dirpath)) == 2
+
+
+def test_broken_standalone_parsers_are_ignored(
+    monkeypatch, standalone_modules, cache_dirpath, expected_outcome
+):
+    for module in standalone_modules:
+        monkeypatch.setattr(module, "DATA", {})
+    assert _parse_all(Parser()) == expected_outcome
+    assert len(_cache_filepaths(cache_dirpath)) == 2
+
+
+def test_warming_cache_from_command_line(tmp_path):
+    outcome = subprocess.run(
+        ["gdparse", "--warm-cache"],
+        env={**os.environ, CACHE_DIRECTORY_ENV_VAR: str(tmp_path)},
+        check=False,
+        capture_output=True,
+    )
+    assert outcome.returncode == 0
+    # grammar caches are prebuilt already
+    assert len(_cache_filepaths(tmp_path)) == 0
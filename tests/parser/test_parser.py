@@ -1,7 +1,11 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
+from lark import Token, Tree
+
 from gdtoolkit.parser import parser
+from gdtoolkit.parser.outline import find_top_level_statements
 
 
 OK_DATA_DIRS = [
@@ -48,3 +52,361 @@ def test_parsing_failure(gdscript_nok_path):
         except:  # pylint: disable=bare-except
             return
         assert True, "shall fail"
+
+
+@pytest.mark.parser
+def test_parsing_with_comments_gathers_same_comments(gdscript_ok_path):
+    # TODO: fix lexer
+    if "bug_326_multistatement_lambda_corner_case" in gdscript_ok_path:
+        return
+    with open(gdscript_ok_path, "r", encoding="utf-8") as handle:
+        code = handle.read()
+        parse_tree, comment_parse_tree = parser.parse_with_comments(code)
+        assert parse_tree == parser.parse(code, gather_metadata=True)
+        assert [
+            (comment.value, comment.line, comment.column)
+            for comment in comment_parse_tree.children
+        ] == [
+            (comment.value, comment.line, comment.column)
+            for comment in parser.parse_comments(code).children
+        ]
+
+
+def test_parsing_with_comments_in_many_threads_at_once():
+    scripts = [
+        "".join(
+            "var v{0}_{1} = [\n\t{0}, # c{0}_{1}\n\t(func(): return {1})\n]\n".format(
+                i, j
+            )
+            for j in range(30)
+        )
+        for i in range(4)
+    ]
+    expected = [parser.parse_with_comments(script) for script in scripts]
+    with ThreadPoolExecutor(max_workers=len(scripts)) as executor:
+        assert list(executor.map(parser.parse_with_comments, scripts)) == expected
+
+
+def _positions(tree):
+    positions = []
+    for subtree in tree.iter_subtrees_topdown():
+        meta = subtree.meta
+        positions.append(
+            (subtree.data, meta.line, meta.column, meta.end_line, meta.end_pos)
+        )
+        positions += [
+            (child, child.line, child.column, child.end_line, child.end_pos)
+            for child in subtree.children
+            if isinstance(child, Token)
+        ]
+    return positions
+
+
+@pytest.mark.parser
+def test_reparsing_gives_same_outcome_as_parsing(gdscript_ok_path):
+    # TODO: fix lexer
+    if "bug_326_multistatement_lambda_corner_case" in gdscript_ok_path:
+        return
+    with open(gdscript_ok_path, "r", encoding="utf-8") as handle:
+        code = handle.read()
+    lines = code.split("\n")
+    line = len(lines) // 2
+    indent = lines[line][: len(lines[line]) - len(lines[line].lstrip())]
+    lines.insert(line, indent + "var zz = 1")
+    lines_delta = 1
+    edited_code = "\n".join(lines)
+    try:
+        expected_tree = parser.parse(edited_code, gather_metadata=True)
+    except Exception:  # pylint: disable=broad-exception-caught
+        with pytest.raises(Exception):
+            parser.reparse(
+                parser.parse(code, gather_metadata=True),
+                edited_code,
+                line + 1,
+                line + 1,
+                lines_delta,
+            )
+        return
+    tree = parser.reparse(
+        parser.parse(code, gather_metadata=True),
+        edited_code,
+        line + 1,
+        line + 1,
+        lines_delta,
+    )
+    assert tree == expected_tree
+    assert _positions(tree) == _positions(expected_tree)
+
+
+@pytest.mark.parser
+@pytest.mark.parametrize(
+    "code,edited_code,first_changed_line,last_changed_line,lines_delta",
+    [
+        (
+            "var a\nfunc foo():\n\tpass\nvar b\n",
+            "var a\nfunc foo():\n\tpass\n\tpass\nvar b\n",
+            3,
+            3,
+            1,
+        ),
+        (
+            "var a\nfunc foo():\n\tpass\nvar b; var c\nvar d\n",
+            "var a\nvar b; var c\nvar d\n",
+            2,
+            3,
+            -2,
+        ),
+        (
+            "var a\n\n# comment\nvar b\n",
+            "var a = 1\nvar b\n",
+            1,
+            3,
+            -2,
+        ),
+        (
+            "var a\nvar b\n",
+            "var a = (\nvar b\n",
+            1,
+            1,
+            0,
+        ),
+    ],
+)
+def test_reparsing_edits(
+    code, edited_code, first_changed_line, last_changed_line, lines_delta
+):
+    try:
+        expected_tree = parser.parse(edited_code, gather_metadata=True)
+    except Exception:  # pylint: disable=broad-exception-caught
+        expected_tree = None
+    try:
+        tree = parser.reparse(
+            parser.parse(code, gather_metadata=True),
+            edited_code,
+            first_changed_line,
+            last_changed_line,
+            lines_delta,
+        )
+    except Exception:  # pylint: disable=broad-exception-caught
+        tree = None
+    assert tree == expected_tree
+    if tree is not None:
+        assert _positions(tree) == _positions(expected_tree)
+
+
+_OUTLINE_KINDS = {
+    "classname_stmt": "class_name",
+    "classname_extends_stmt": "class_name",
+    "extends_stmt": "extends",
+    "signal_stmt": "signal",
+    "enum_stmt": "enum",
+    "const_stmt": "const",
+    "class_var_stmt": "var",
+    "static_class_var_stmt": "var",
+    "func_def": "func",
+    "static_func_def": "func",
+    "abstract_func_def": "func",
+    "class_def": "class",
+}
+
+
+def _declarations(tree, scope=""):
+    declarations = []
+    for statement in tree.children:
+        if not isinstance(statement, Tree) or statement.data not in _OUTLINE_KINDS:
+            continue
+        # extends being part of class header
+        if (
+            statement.data == "extends_stmt"
+            and tree.data == "class_def"
+            and statement.meta.line == tree.meta.line
+        ):
+            continue
+        declarations.append(
+            (_OUTLINE_KINDS[statement.data], statement.meta.line, scope)
+        )
+        if statement.data == "classname_extends_stmt":
+            declarations.append(("extends", statement.meta.line, scope))
+        if statement.data == "class_def":
+            name = statement.children[0]
+            declarations += _declarations(
+                statement, name if scope == "" else "{}.{}".format(scope, name)
+            )
+    return declarations
+
+
+@pytest.mark.parser
+def test_outline_gives_same_declarations_as_parsing(gdscript_ok_path):
+    with open(gdscript_ok_path, "r", encoding="utf-8") as handle:
+        code = handle.read()
+        try:
+            tree = parser.parse(code, gather_metadata=True)
+        except Exception:  # pylint: disable=broad-exception-caught
+            return
+        outline = [
+            (declaration.kind, declaration.line, declaration.scope)
+            for declaration in parser.parse_outline(code)
+        ]
+        assert sorted(outline) == sorted(_declarations(tree))
+
+
+def test_outline_of_multiline_declaration_headers():
+    code = """class_name X extends Y
+enum E
+{
+	A
+}
+var x = 1 \\
+	+ 2
+"""
+    assert [
+        (declaration.kind, declaration.line, declaration.header)
+        for declaration in parser.parse_outline(code)
+    ] == [
+        ("class_name", 1, "class_name X"),
+        ("extends", 1, "extends Y"),
+        ("enum", 2, "enum E { A }"),
+        ("var", 6, "var x = 1 + 2"),
+    ]
+
+
+@pytest.mark.parser
+def test_top_level_statements_enclose_parsed_statements(gdscript_ok_path):
+    with open(gdscript_ok_path, "r", encoding="utf-8") as handle:
+        code = handle.read()
+        try:
+            tree = parser.parse(code, gather_metadata=True)
+        except Exception:  # pylint: disable=broad-exception-caught
+            return
+        statement_lines = find_top_level_statements(code)
+        for statement in tree.children:
+            if not isinstance(statement, Tree):
+                continue
+            # meta.end_line of a statement may point past the trailing newlines
+            end_line = max(
+                (
+                    token.end_line
+                    for token in statement.scan_values(lambda v: isinstance(v, Token))
+                ),
+                default=statement.meta.line,
+            )
+            assert (
+                len(
+                    [
+                        (begin, end)
+                        for begin, end in statement_lines
+                        if begin <= statement.meta.line and end_line <= end
+                    ]
+                )
+                == 1
+            )
+
+
+def test_outline_skips_bodies_strings_and_comments():
+    code = """@export_range(1, 2) var x := 3 # var y
+static func f(a: int = (1
+		+ 2)) -> int: return 1
+\"\"\"
+var z
+\"\"\"
+signal s(a)
+class K extends "res://a.gd": var p; func g(): var q
+var r:
+	get:
+		var t = 1
+		return t
+"""
+    assert [
+        (declaration.kind, declaration.name, declaration.line, declaration.scope)
+        for declaration in parser.parse_outline(code)
+    ] == [
+        ("var", "x", 1, ""),
+        ("func", "f", 2, ""),
+        ("signal", "s", 7, ""),
+        ("class", "K", 8, ""),
+        ("var", "p", 8, "K"),
+        ("func", "g", 8, "K"),
+        ("var", "r", 9, ""),
+    ]
+    assert [declaration.header for declaration in parser.parse_outline(code)][1] == (
+        "static func f(a: int = (1 + 2)) -> int"
+    )
+
+
+@pytest.mark.parser
+def test_tokenizing_gives_same_comments_as_parsing(gdscript_ok_path):
+    with open(gdscript_ok_path, "r", encoding="utf-8") as handle:
+        code = handle.read()
+        try:
+            expected_comments = parser.parse_comments(code).children
+        except Exception:  # pylint: disable=broad-exception-caught
+            return
+        try:
+            tokens = list(parser.tokenize(code))
+        except Exception:  # pylint: disable=broad-exception-caught
+            return
+        comments = [token for token in tokens if token.type == "COMMENT"]
+        assert [(c, c.line, c.column) for c in comments] == [
+            (c, c.line, c.column) for c in expected_comments
+        ]
+
+
+def test_tokenizing_produces_indenter_tokens_and_splits_signs():
+    code = """var f = foo(func(x) -> Array[int]:
+	var y = x -1 # c
+	return [y]
+, -2)
+"""
+    assert [(token.type, token.value) for token in parser.tokenize(code)] == [
+        ("VAR", "var"),
+        ("NAME", "f"),
+        ("EQUAL", "="),
+        ("NAME", "foo"),
+        ("LPAR", "("),
+        ("FUNC", "func"),
+        ("LPAR", "("),
+        ("NAME", "x"),
+        ("RPAR", ")"),
+        ("__ANON_0", "->"),
+        ("NAME", "Array"),
+        ("LSQB", "["),
+        ("NAME", "int"),
+        ("RSQB", "]"),
+        ("COLON", ":"),
+        ("_NL", "\n\t"),
+        ("_INDENT", "\t"),
+        ("VAR", "var"),
+        ("NAME", "y"),
+        ("EQUAL", "="),
+        ("NAME", "x"),
+        ("MINUS", "-"),
+        ("NUMBER", "1"),
+        ("COMMENT", "# c"),
+        ("_NL", "# c\n\t"),
+        ("RETURN", "return"),
+        ("LSQB", "["),
+        ("NAME", "y"),
+        ("RSQB", "]"),
+        ("_NL", "\n"),
+        ("_DEDENT", None),
+        ("COMMA", ","),
+        ("NUMBER", "-2"),
+        ("RPAR", ")"),
+        ("_NL", "\n\n"),
+    ]
+
+
+@pytest.mark.parser
+def test_lambda_detection_in_deeply_nested_parentheses():
+    code = (
+        "var x = [\n"
+        + "\t(\n" * 100
+        + "\t):\n" * 100
+        + "\tfunc(a) -> int:\n\t\treturn a\n]\n"
+    )
+    indenter_tokens = [
+        token.type
+        for token in parser.tokenize(code)
+        if token.type in ["_INDENT", "_DEDENT"]
+    ]
+    assert indenter_tokens == ["_INDENT", "_DEDENT"]
@@ -0,0 +1,44 @@
+import os
+
+from gdtoolkit.common.cache import ResultCache
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = ResultCache("test", {"line_length": 100}, cache_dirpath=str(tmp_path))
+    assert cache.get("pass\n") is None
+    cache.put("pass\n", "some value")
+    assert cache.get("pass\n") == "some value"
+    assert cache.get("pass\npass\n") is None
+
+
+def test_cache_is_keyed_by_config(tmp_path):
+    cache = ResultCache("test", {"line_length": 100}, cache_dirpath=str(tmp_path))
+    other_cache = ResultCache("test", {"line_length": 80}, cache_dirpath=str(tmp_path))
+    cache.put("pass\n")
+    assert cache.get("pass\n") == ""
+    assert other_cache.get("pass\n") is None
+
+
+def test_cache_is_keyed_by_config_regardless_of_set_ordering(tmp_path):
+    cache = ResultCache("test", {"x": {"a", "b", "c"}}, cache_dirpath=str(tmp_path))
+    other_cache = ResultCache(
+        "test", {"x": {"c", "b", "a"}}, cache_dirpath=str(tmp_path)
+    )
+    cache.put("pass\n")
+    assert other_cache.get("pass\n") == ""
+
+
+def test_cache_pruning_evicts_least_recently_used_entries(tmp_path):
+    cache = ResultCache("test", {}, max_entries=2, cache_dirpath=str(tmp_path))
+    for i in range(3):
+        cache.put(f"var x = {i}\n")
+    entry_filepaths = [
+        os.path.join(dirpath, f) for dirpath, _, fs in os.walk(tmp_path) for f in fs
+    ]
+    for i, entry_filepath in enumerate(sorted(entry_filepaths)):
+        os.utime(entry_filepath, (i, i))
+    cache.get("var x = 0\n")
+    cache.prune()
+    remaining_entries = [f for _, _, fs in os.walk(tmp_path) for f in fs]
+    assert len(remaining_entries) == 2
+    assert cache.get("var x = 0\n") == ""
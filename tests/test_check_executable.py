@@ -0,0 +1,82 @@
+import subprocess
+
+from lark.indenter import DedentError
+
+import gdtoolkit.formatter
+import gdtoolkit.linter
+from gdtoolkit.__main__ import _check_file
+from gdtoolkit.common.parsed_file import ParsedFile
+from gdtoolkit.linter import lint_code, lint_parsed_file
+
+from .common import write_file
+
+
+def test_linting_parsed_file_gives_same_problems():
+    code = "var Xx = 1\nfunc foo(a):\n\tpass\n"
+    assert lint_parsed_file(ParsedFile(code)) == lint_code(code)
+
+
+def test_check_on_valid_formatted_file_succeeds(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "pass\n")
+    outcome = subprocess.run(
+        ["gdtoolkit", "check", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 0
+    assert len(outcome.stderr.decode().splitlines()) == 0
+
+
+def test_check_reports_both_problems_and_formatting(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "var Xx=1\n")
+    outcome = subprocess.run(
+        ["gdtoolkit", "check", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 1
+    stderr = outcome.stderr.decode()
+    assert "(class-variable-name)" in stderr
+    assert "would reformat {}".format(dummy_file) in stderr
+    assert "1 problem found, 1 file would be reformatted" in stderr
+
+
+def test_check_on_unparsable_file_fails_gracefully(tmp_path):
+    dummy_file = write_file(tmp_path, "script.gd", "pass x")
+    outcome = subprocess.run(
+        ["gdtoolkit", "check", dummy_file], check=False, capture_output=True
+    )
+    assert outcome.returncode == 1
+    assert "Traceback" not in outcome.stderr.decode()
+
+
+def test_check_in_parallel_reports_all_files(tmp_path):
+    files = [
+        write_file(tmp_path, "script{}.gd".format(i), "var Xx=1\n") for i in range(4)
+    ]
+    outcome = subprocess.run(
+        ["gdtoolkit", "check", "-j", "2", *files], check=False, capture_output=True
+    )
+    assert outcome.returncode == 1
+    assert "4 problems found, 4 files would be reformatted" in outcome.stderr.decode()
+
+
+def test_check_reports_formatted_code_dedent_error_as_failed_file(
+    tmp_path, monkeypatch, capsys
+):
+    dummy_file = write_file(tmp_path, "script.gd", "var x=1\n")
+
+    def check_formatting_safety(*_, **__):
+        raise DedentError("Unexpected dedent to column 1")
+
+    monkeypatch.setattr(
+        gdtoolkit.formatter, "check_formatting_safety", check_formatting_safety
+    )
+    outcome = _check_file(
+        dummy_file,
+        dict(gdtoolkit.linter.DEFAULT_CONFIG),
+        line_length=100,
+        spaces_for_indent=None,
+        print_diff=False,
+        safety_checks=True,
+    )
+    assert outcome == (1, False)
+    stderr = capsys.readouterr().err
+    assert f"{dummy_file}: Failed to format" in stderr
+    assert "Unexpected dedent to column 1" in stderr
@@ -0,0 +1,31 @@
+from types import MappingProxyType
+
+from gdtoolkit.common.config import find_config_file, load_config
+
+DEFAULT_CONFIG = MappingProxyType({"line_length": 100, "use_spaces": None})
+
+
+def test_config_is_found_in_parent_directory(tmp_path, monkeypatch):
+    (tmp_path / ".gdformatrc").write_text("line_length: 80\n")
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path / "sub")
+    assert find_config_file("gdformatrc") == str(tmp_path / ".gdformatrc")
+    assert load_config("gdformatrc", DEFAULT_CONFIG) == {
+        "line_length": 80,
+        "use_spaces": None,
+    }
+
+
+def test_default_config_is_used_if_none_is_found(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert find_config_file("gdformatrc") is None
+    assert load_config("gdformatrc", DEFAULT_CONFIG) == dict(DEFAULT_CONFIG)
+
+
+def test_config_is_found_from_given_directory(tmp_path):
+    (tmp_path / "gdformatrc").write_text("use_spaces: 2\n")
+    (tmp_path / "sub").mkdir()
+    assert load_config("gdformatrc", DEFAULT_CONFIG, str(tmp_path / "sub")) == {
+        "line_length": 100,
+        "use_spaces": 2,
+    }
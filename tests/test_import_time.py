@@ -0,0 +1,46 @@
+import os
+import re
+import sys
+import subprocess
+
+import pytest
+
+SETUP_PY_FILEPATH = os.path.join(os.path.dirname(__file__), "..", "setup.py")
+# modules needed only by some code paths of the tools
+LAZILY_IMPORTED_MODULES = ["yaml", "radon", "importlib.metadata"]
+# tools whose packages do not depend on the parser
+PARSER_INDEPENDENT_SCRIPTS = {
+    "gdradon": ["lark", "difflib"],
+    "gdtoolkit": ["lark"],
+}
+
+
+def _console_scripts():
+    with open(SETUP_PY_FILEPATH, "r", encoding="utf-8") as handle:
+        return re.findall(r'"([\w-]+) = ([\w.]+):\w+"', handle.read())
+
+
+def _imported_modules(module_name):
+    outcome = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, {}; print('\\n'.join(sys.modules))".format(module_name),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return set(outcome.stdout.decode().splitlines())
+
+
+def test_console_scripts_are_found():
+    assert len(_console_scripts()) > 0
+
+
+@pytest.mark.parametrize("script_name,module_name", _console_scripts())
+def test_console_script_imports_heavy_modules_lazily(script_name, module_name):
+    imported_modules = _imported_modules(module_name)
+    for lazily_imported_module in LAZILY_IMPORTED_MODULES + (
+        PARSER_INDEPENDENT_SCRIPTS.get(script_name, [])
+    ):
+        assert lazily_imported_module not in imported_modules
@@ -0,0 +1,20 @@
+enum Named
+{
+	A,
+	B,
+}
+
+enum Spaced # comment
+
+{ C }
+
+var x = 1 \
+	+ 2
+
+
+class Inner:
+	enum InnerNamed
+	{ D }
+
+	const Y = \
+		3